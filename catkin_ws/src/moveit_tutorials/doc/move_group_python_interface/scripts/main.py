@@ -371,6 +371,7 @@ def main():
         obj.save("welcome.mp3")
         # obtain audio from the microphone
         r = sr.Recognizer()
+        r.transcript_cache = sr.TranscriptCache()  # the transcript is requested twice below, only send it once
         with sr.Microphone() as source:
             # playsound("welcome.mp3")
             print("Say something!")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+"""
+Measures how long ``import speech_recognition`` takes in a fresh interpreter, which is part of the startup time of every program using the library, and lists the modules that take the most time to import.
+
+Example: ``python benchmarks/import_time.py --runs 20 --top 10``
+
+To compare against an earlier version of the package, pass its git revision with ``--baseline``; for example, ``--baseline 6f226cb~1`` times the import as it was before the engines were loaded lazily.
+"""
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _environment(root=PACKAGE_ROOT):
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+
+
+def extract_revision(revision, directory):
+    """
+    Extracts the package as it was at the git revision ``revision`` into ``directory``.
+    """
+    archive = subprocess.run(["git", "-C", PACKAGE_ROOT, "archive", "--format=tar", revision], stdout=subprocess.PIPE, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+
+
+def import_profile(statement, package="speech_recognition", root=PACKAGE_ROOT):
+    """
+    Runs ``statement`` in a fresh interpreter with ``-X importtime``, with the package at ``root`` on the path, and returns a dictionary mapping ``package`` and each module imported while importing it to its cumulative import time in microseconds.
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], env=_environment(root), stderr=subprocess.PIPE, check=True, universal_newlines=True).stderr
+    entries = []  # ``(module name, nesting depth, cumulative microseconds)``, with each module listed after the modules it imported
+    for line in output.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2: continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit(): continue  # the header line
+        entries.append((module.strip(), (len(module) - len(module.lstrip()) - 1) // 2, int(cumulative)))
+
+    profile = {}
+    for index, (module, depth, cumulative) in enumerate(entries):
+        if module != package or depth != 0: continue
+        profile[module] = cumulative
+        for child, child_depth, child_cumulative in reversed(entries[:index]):
+            if child_depth == 0: break  # imported before ``package``, for example by ``site``
+            profile[child] = child_cumulative
+    return profile
+
+
+def loaded_modules(statement):
+    """
+    Returns the ``speech_recognition`` modules loaded after running ``statement`` in a fresh interpreter.
+    """
+    code = "{}\nimport sys\nprint('\\n'.join(sorted(m for m in sys.modules if m.startswith('speech_recognition'))))".format(statement)
+    return subprocess.run([sys.executable, "-c", code], env=_environment(), stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="number of fresh interpreters to time (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=8, help="number of slowest modules to list (default: %(default)s)")
+    parser.add_argument("--baseline", metavar="REVISION", help="git revision of the package to time as well, for comparison")
+    args = parser.parse_args()
+
+    if args.baseline is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            extract_revision(args.baseline, directory)
+            totals = sorted(import_profile("import speech_recognition", root=directory)["speech_recognition"] / 1000 for _ in range(args.runs))
+        print("import speech_recognition at {}: median {:.1f} ms, min {:.1f} ms, max {:.1f} ms over {} runs".format(args.baseline, statistics.median(totals), totals[0], totals[-1], args.runs))
+
+    profiles = [import_profile("import speech_recognition") for _ in range(args.runs)]
+    totals = sorted(profile["speech_recognition"] / 1000 for profile in profiles)
+    print("import speech_recognition: median {:.1f} ms, min {:.1f} ms, max {:.1f} ms over {} runs".format(statistics.median(totals), totals[0], totals[-1], args.runs))
+
+    print("\nslowest modules (median cumulative time):")
+    medians = {module: statistics.median(profile.get(module, 0) for profile in profiles) / 1000 for module in profiles[0]}
+    for module, milliseconds in sorted(medians.items(), key=lambda item: -item[1])[1:args.top + 1]:  # skip speech_recognition itself
+        print("  {:8.1f} ms  {}".format(milliseconds, module))
+
+    print("\nloaded after the import:")
+    for module in loaded_modules("import speech_recognition"): print("  " + module)
+    print("\nloaded after the first use of recognize_google:")
+    for module in loaded_modules("import speech_recognition as sr\nsr.Recognizer.recognize_google"): print("  " + module)
+
+
+if __name__ == "__main__":
+    main()
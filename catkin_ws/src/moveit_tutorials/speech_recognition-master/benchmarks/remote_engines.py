@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+Load test for the HTTP recognizers against ``speech_recognition.fake_server.FakeSpeechServer``, measuring the overhead of our own request path (conversion, encoding, HTTP) under concurrency without touching the real services.
+
+Example: ``python benchmarks/remote_engines.py --engine wit --concurrency 16 --requests 500 --latency 0.05``
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import speech_recognition as sr
+from speech_recognition.fake_server import ENGINES, FakeSpeechServer
+
+AUDIO_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "tests", "english.wav")
+
+CALLS = {  # how to call each recognizer with dummy credentials
+    "google": lambda r, audio: r.recognize_google(audio),
+    "wit": lambda r, audio: r.recognize_wit(audio, key="FAKEKEY"),
+    "azure": lambda r, audio: r.recognize_azure(audio, key="fakekey"),
+    "bing": lambda r, audio: r.recognize_bing(audio, key="fakekey"),
+    "houndify": lambda r, audio: r.recognize_houndify(audio, client_id="ZmFrZQ==", client_key="ZmFrZWtleQ=="),
+    "ibm": lambda r, audio: r.recognize_ibm(audio, key="fakekey"),
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values: return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run(engine_name, audio, server, concurrency, requests, client_rate=None):
+    recognizer = sr.Recognizer()
+    server.configure(recognizer)
+    if client_rate is not None:
+        recognizer.rate_limiter = sr.RateLimiter({engine_name: client_rate})
+    call = CALLS[engine_name]
+    latencies, errors, lock = [], [0], threading.Lock()
+
+    def one_request(_):
+        start = time.perf_counter()
+        try:
+            call(recognizer, audio)
+        except (sr.RequestError, sr.UnknownValueError):
+            with lock: errors[0] += 1
+            return
+        elapsed = time.perf_counter() - start
+        with lock: latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one_request, range(requests)))
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "engine": engine_name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors[0],
+        "throughput": requests / total,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.mean(latencies) if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--engine", choices=ENGINES + ("all",), default="all")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="numbers of concurrent callers to measure")
+    parser.add_argument("--requests", type=int, default=200, help="requests per measurement")
+    parser.add_argument("--latency", type=float, default=0.0, help="server-side delay per request, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum extra random server-side delay, in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests the server fails")
+    parser.add_argument("--quota", type=float, default=None, help="requests per second the server accepts per engine before answering with HTTP 429")
+    parser.add_argument("--client-rate", type=float, default=None, help="requests per second allowed by a client-side rate limiter")
+    parser.add_argument("--audio", default=AUDIO_FILE, help="audio file to send")
+    args = parser.parse_args()
+
+    with sr.AudioFile(args.audio) as source:
+        audio = sr.Recognizer().record(source)
+
+    print("{:<10} {:>5} {:>8} {:>7} {:>10} {:>9} {:>9}".format("engine", "conc", "requests", "errors", "req/s", "p50 ms", "p99 ms"))
+    with FakeSpeechServer(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate, seed=0, quota=args.quota) as server:
+        for engine_name in (ENGINES if args.engine == "all" else (args.engine,)):
+            for concurrency in args.concurrency:
+                result = run(engine_name, audio, server, concurrency, args.requests, args.client_rate)
+                print("{engine:<10} {concurrency:>5} {requests:>8} {errors:>7} {throughput:>10.1f} {p50_ms:>9.1f} {p99_ms:>9.1f}".format(
+                    p50_ms=result["p50"] * 1000, p99_ms=result["p99"] * 1000, **result
+                ))
+
+
+if __name__ == "__main__":
+    main()
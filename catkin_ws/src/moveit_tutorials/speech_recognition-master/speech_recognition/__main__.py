@@ -1,24 +1,37 @@
+import sys
+
 import speech_recognition as sr
 
-r = sr.Recognizer()
-m = sr.Microphone()
 
-try:
-    print("A moment of silence, please...")
-    with m as source: r.adjust_for_ambient_noise(source)
-    print("Set minimum energy threshold to {}".format(r.energy_threshold))
-    while True:
-        print("Say something!")
-        with m as source: audio = r.listen(source)
-        print("Got it! Now to recognize it...")
-        try:
-            # recognize speech using Google Speech Recognition
-            value = r.recognize_google(audio)
+def main():
+    r = sr.Recognizer()
+    m = sr.Microphone(keep_open=True)  # keep recording between phrases, instead of reopening the device for each one
+
+    try:
+        print("A moment of silence, please...")
+        with m as source: r.adjust_for_ambient_noise(source)
+        print("Set minimum energy threshold to {}".format(r.energy_threshold))
+        while True:
+            print("Say something!")
+            with m as source: audio = r.listen(source)
+            print("Got it! Now to recognize it...")
+            try:
+                # recognize speech using Google Speech Recognition
+                value = r.recognize_google(audio)
+
+                print("You said {}".format(value))
+            except sr.UnknownValueError:
+                print("Oops! Didn't catch that")
+            except sr.RequestError as e:
+                print("Uh oh! Couldn't request results from Google Speech Recognition service; {0}".format(e))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        m.close()
+
 
-            print("You said {}".format(value))
-        except sr.UnknownValueError:
-            print("Oops! Didn't catch that")
-        except sr.RequestError as e:
-            print("Uh oh! Couldn't request results from Google Speech Recognition service; {0}".format(e))
-except KeyboardInterrupt:
-    pass
+if __name__ == "__main__":  # worker processes of the batch mode may import this module again
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":  # ``python -m speech_recognition batch --help``
+        from speech_recognition.batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    main()
@@ -0,0 +1,172 @@
+"""
+Transcribes many audio files with one engine across a pool of worker processes, writing a JSON line per file.
+
+Example: ``python -m speech_recognition batch logs/commands "archive/**/*.flac" --engine sphinx --output transcripts.jsonl --workers 4``
+
+Files that already have a line in the output are skipped, so an interrupted run picks up where it stopped when run again with the same output.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .engines import ENGINE_MODULES
+
+AUDIO_EXTENSIONS = (".wav", ".aif", ".aiff", ".flac")
+
+_worker_recognizer = None  # the ``Recognizer`` of the current worker process, which keeps the models it loads
+
+
+def find_audio_files(paths):
+    """
+    Returns the audio files (WAV, AIFF and FLAC) named by ``paths``, sorted and without duplicates. Each path can be a file, a directory (searched recursively), or a glob pattern, in which ``**`` matches any number of directories.
+    """
+    found = set()
+    for path in paths:
+        matches = [path] if os.path.exists(path) else glob.glob(path, recursive=True)
+        for match in matches:
+            if os.path.isdir(match):
+                for directory, _, file_names in os.walk(match):
+                    found.update(os.path.join(directory, file_name) for file_name in file_names if file_name.lower().endswith(AUDIO_EXTENSIONS))
+            elif match.lower().endswith(AUDIO_EXTENSIONS):
+                found.add(match)
+    return sorted(os.path.normpath(path) for path in found)
+
+
+def completed_files(output_path, retry_failed=False):
+    """
+    Returns the set of files that already have a result in the JSON lines file ``output_path``. If ``retry_failed`` is true, files whose result is an error don't count.
+    """
+    completed = set()
+    if not os.path.exists(output_path): return completed
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:  # a line cut short by an interrupted run
+                continue
+            if retry_failed and "error" in record: continue
+            completed.add(record["file"])
+    return completed
+
+
+def _initialize_worker():
+    global _worker_recognizer
+    from . import Recognizer
+    _worker_recognizer = Recognizer()
+
+
+def transcribe_file(path, engine_name, options):
+    """
+    Transcribes the audio file ``path`` with ``recognizer_instance.recognize_<engine_name>(audio_data, **options)``, and returns its result record: the file, the audio duration and processing time in seconds, and either the ``transcript`` or the ``error``.
+    """
+    from . import AudioFile, Recognizer
+    recognizer = _worker_recognizer or Recognizer()
+    start_time = time.monotonic()
+    record = {"file": path}
+    try:
+        with AudioFile(path) as source:
+            audio_data = recognizer.record(source)
+        record["duration"] = len(audio_data.frame_data) / float(audio_data.sample_rate * audio_data.sample_width)
+        record["transcript"] = getattr(recognizer, "recognize_" + engine_name)(audio_data, **options)
+    except Exception as exc:
+        record["error"] = type(exc).__name__
+        record["message"] = str(exc)
+    record["seconds"] = time.monotonic() - start_time
+    return record
+
+
+def transcribe_files(paths, engine_name, output_path, options=None, workers=None, retry_failed=False, progress=None):
+    """
+    Transcribes every file in ``paths`` that doesn't have a result in ``output_path`` yet, with ``workers`` worker processes (by default, one per CPU), and appends a JSON line with each file's result record (see ``transcribe_file``) to ``output_path`` as soon as it's done. ``progress``, if given, is called with each record.
+
+    A file whose result can't be sent back from its worker (for example, because it can't be pickled) gets an error record instead. If a worker process dies, the files it and the other workers were transcribing get ``BrokenProcessPool`` error records, and the remaining files are transcribed by new worker processes.
+
+    Returns a summary dictionary: the numbers of files transcribed, failed and skipped, the wall-clock seconds taken, the seconds of audio transcribed, files per second, and the real-time factor (seconds taken per second of audio; below 1 is faster than real time).
+    """
+    assert engine_name in ENGINE_MODULES, "unknown engine {!r}".format(engine_name)
+    completed = completed_files(output_path, retry_failed)
+    pending = [path for path in paths if path not in completed]
+    summary = {"transcribed": 0, "failed": 0, "skipped": len(paths) - len(pending), "seconds": 0.0, "audio_seconds": 0.0}
+
+    workers = workers or os.cpu_count() or 1
+    start_time = time.monotonic()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker)
+    try:
+        with open(output_path, "a") as output:
+            if output.tell() > 0:
+                with open(output_path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n": output.write("\n")  # end the line cut short by an interrupted run, rather than appending to it
+            max_in_flight = 4 * workers  # keep the workers busy without queueing every file at once
+            remaining, in_flight, future_paths = iter(pending), set(), {}
+            while True:
+                for path in remaining:
+                    try:
+                        future = executor.submit(transcribe_file, path, engine_name, options or {})
+                    except BrokenProcessPool:  # a worker died, so start over with new ones
+                        executor.shutdown(wait=False)
+                        executor = ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker)
+                        future = executor.submit(transcribe_file, path, engine_name, options or {})
+                    in_flight.add(future)
+                    future_paths[future] = path
+                    if len(in_flight) >= max_in_flight: break
+                if not in_flight: break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = future_paths.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as exc:  # the worker died, or the result couldn't be sent back from it
+                        record = {"file": path, "error": type(exc).__name__, "message": str(exc)}
+                    output.write(json.dumps(record, default=repr) + "\n")  # engine-specific result objects are written as their repr
+                    output.flush()  # so that an interrupted run keeps every finished result
+                    summary["failed" if "error" in record else "transcribed"] += 1
+                    summary["audio_seconds"] += record.get("duration", 0)
+                    if progress is not None: progress(record)
+    finally:
+        executor.shutdown()
+
+    summary["seconds"] = time.monotonic() - start_time
+    done_count = summary["transcribed"] + summary["failed"]
+    summary["files_per_second"] = done_count / summary["seconds"] if summary["seconds"] > 0 else 0.0
+    summary["real_time_factor"] = summary["seconds"] / summary["audio_seconds"] if summary["audio_seconds"] > 0 else None
+    return summary
+
+
+def _option(text):
+    name, separator, value = text.partition("=")
+    if not separator: raise argparse.ArgumentTypeError("options must look like NAME=VALUE")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value  # a plain string
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m speech_recognition batch", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="audio files, directories or glob patterns")
+    parser.add_argument("--engine", required=True, choices=sorted(ENGINE_MODULES), help="engine to transcribe with")
+    parser.add_argument("--option", type=_option, action="append", default=[], metavar="NAME=VALUE", help="argument for the engine, such as language=en-US; VALUE is parsed as JSON if possible (repeatable)")
+    parser.add_argument("--output", required=True, help="JSON lines file to append the results to")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--retry-failed", action="store_true", help="transcribe files whose earlier result was an error again")
+    parser.add_argument("--quiet", action="store_true", help="don't print each file's result")
+    args = parser.parse_args(argv)
+
+    paths = find_audio_files(args.paths)
+    if not paths: parser.error("no audio files found")
+
+    def progress(record):
+        if not args.quiet:
+            print("{}: {}".format(record["file"], record["transcript"] if "error" not in record else "{} {}".format(record["error"], record["message"]).strip()), file=sys.stderr)
+
+    summary = transcribe_files(paths, args.engine, args.output, dict(args.option), args.workers, args.retry_failed, progress)
+    real_time_factor = "n/a" if summary["real_time_factor"] is None else "{:.3f}".format(summary["real_time_factor"])
+    print("{transcribed} transcribed, {failed} failed, {skipped} skipped in {seconds:.1f} s: {files_per_second:.2f} files/s, {audio_seconds:.1f} s of audio".format(**summary) + ", real-time factor " + real_time_factor, file=sys.stderr)
+    return 0
@@ -0,0 +1,161 @@
+"""Content-addressed cache of recognition results, with single-flight deduplication of concurrent requests."""
+
+import collections
+import functools
+import hashlib
+import json
+import os
+import threading
+
+from .exceptions import DeadlineExceeded
+
+
+@functools.lru_cache(maxsize=None)
+def _signature(method):
+    import inspect
+    return inspect.signature(method)
+
+
+def _bound_arguments(method, audio_data, args, kwargs):
+    # the arguments of a ``method(recognizer, audio_data, *args, **kwargs)`` call by parameter name, with defaults filled in
+    import inspect
+    bound = _signature(method).bind(None, audio_data, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = {}
+    for name, parameter in list(_signature(method).parameters.items())[2:]:  # skip ``self`` and ``audio_data``
+        if parameter.kind == inspect.Parameter.VAR_KEYWORD:
+            arguments.update(bound.arguments[name])
+        else:
+            arguments[name] = bound.arguments[name]
+    return arguments
+
+
+class _InFlight(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class TranscriptCache(object):
+    """
+    Caches the results of ``recognizer_instance.recognize_*`` calls, keyed by a hash of the audio samples together with the engine name and every option passed to it. Enable it by setting ``recognizer_instance.transcript_cache`` to an instance of this class.
+
+    Results are kept in memory for the ``max_entries`` most recently used keys. If ``directory`` is given, results that can be represented as JSON are also stored there, one file per key, so that they survive restarts and can be shared by several processes.
+
+    If a result for some key is already being computed on another thread, callers asking for the same key wait for that request to finish (until their own deadline, if they have one) instead of sending their own. Failed requests (including ``speech_recognition.UnknownValueError``) are never cached.
+    """
+
+    def __init__(self, max_entries=256, directory=None):
+        assert isinstance(max_entries, int) and max_entries >= 0, "``max_entries`` must be a non-negative integer"
+        self.max_entries = max_entries
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        self.hits = 0  # requests answered from the cache
+        self.misses = 0  # requests that had to be sent to the engine
+        self.deduplicated = 0  # requests that waited for an identical request that was already in flight
+        self._entries = collections.OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(engine, audio_data, args=(), kwargs=None, method=None):
+        """
+        Returns the cache key for recognizing ``audio_data`` (an ``AudioData`` instance) with ``engine``, given the remaining positional and keyword arguments of the call.
+
+        If ``method`` (the ``recognize_*`` method being called) is given, the arguments are first matched to its parameters, so that passing an option by position or by keyword, or leaving it at its default value, gives the same key.
+        """
+        if method is not None:
+            try:
+                args, kwargs = (), _bound_arguments(method, audio_data, args, kwargs or {})
+            except TypeError:  # the call doesn't match the method, and will fail anyway
+                pass
+        digest = hashlib.sha256()
+        digest.update(repr((engine, audio_data.sample_rate, audio_data.sample_width, args, sorted((kwargs or {}).items()))).encode("utf-8"))
+        digest.update(audio_data.frame_data)
+        return digest.hexdigest()
+
+    def get_or_compute(self, key, compute, timeout=None):
+        """
+        Returns the cached result for ``key``, or calls ``compute()`` to obtain it (unless another thread is already doing so) and caches its return value.
+
+        Waiting for a request made by another thread gives up after ``timeout`` seconds (such as the time left until the caller's deadline), raising a ``speech_recognition.DeadlineExceeded`` exception.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = _InFlight()
+            else:
+                self.deduplicated += 1
+
+        if not leader:  # another thread is already looking up or requesting this result
+            if not in_flight.done.wait(timeout):
+                raise DeadlineExceeded("recognition deadline exceeded while waiting for an identical request")
+            if in_flight.exception is not None: raise in_flight.exception
+            return in_flight.result
+
+        try:
+            found, in_flight.result = self._load(key)  # outside the lock, so that a slow disk doesn't hold up requests for other keys
+            with self._lock:
+                if found:
+                    self.hits += 1
+                    self._remember(key, in_flight.result)
+                else:
+                    self.misses += 1
+            if not found:
+                in_flight.result = compute()
+                self._store(key, in_flight.result)
+            return in_flight.result
+        except BaseException as exc:
+            in_flight.exception = exc
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+
+    def clear(self):
+        """
+        Removes every entry from the in-memory tier (entries on disk are kept).
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _load(self, key):
+        if self.directory is None: return False, None
+        try:
+            with open(self._path(key), "r") as f:
+                entry = json.load(f)
+            return True, tuple(entry["result"]) if entry.get("tuple") else entry["result"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False, None
+
+    def _store(self, key, result):
+        with self._lock:
+            self._remember(key, result)
+        if self.directory is not None:
+            try:
+                serialized = json.dumps({"result": result, "tuple": isinstance(result, tuple)})  # several engines return ``(transcript, confidence)`` pairs
+            except (TypeError, ValueError):  # not representable as JSON (for example, a Sphinx decoder object), so only keep it in memory
+                return
+            temporary_path = "{}.{}.tmp".format(self._path(key), threading.get_ident())
+            with open(temporary_path, "w") as f:
+                f.write(serialized)
+            os.replace(temporary_path, self._path(key))
+
+    def _remember(self, key, result):
+        if self.max_entries == 0: return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
@@ -0,0 +1,103 @@
+"""Choosing how much audio ``listen`` reads at a time, separately from the frames it detects speech in."""
+
+import threading
+import time
+import weakref
+
+
+class AdaptiveChunking(object):
+    """
+    Settings for adaptive read sizes in ``recognizer_instance.listen``, used by setting ``recognizer_instance.chunking`` to an instance of this class.
+
+    Without it, ``listen`` reads ``source.CHUNK`` frames at a time and decides whether each whole chunk is speech, so ``pause_threshold``, ``phrase_threshold`` and timeouts are rounded to whole chunks (64 ms for a 1024 frame chunk at 16 kHz). With it, speech is detected in frames of ``frame_duration`` seconds no matter how much is read at once, and the read size is adjusted as ``listen`` runs:
+
+    * A phrase's end can only be noticed once the read containing it completes and has been processed, so the endpoint latency is about one read plus its processing time. Reads are kept short enough for that to stay within ``target_latency`` seconds.
+    * Every read costs some fixed Python overhead, so reads are kept long enough for processing to take at most ``max_load`` of the audio's duration. Otherwise the capture would fall behind the device. This takes precedence over ``target_latency``.
+
+    ``effective_latency`` and ``read_duration`` report the endpoint latency and read size currently achieved, in seconds.
+    """
+
+    def __init__(self, target_latency=0.05, frame_duration=0.01, max_load=0.5):
+        assert target_latency > 0, "``target_latency`` must be a positive number"
+        assert 0 < frame_duration <= target_latency, "``frame_duration`` must be a positive number no larger than ``target_latency``"
+        assert 0 < max_load < 1, "``max_load`` must be between 0 and 1"
+        self.target_latency = target_latency
+        self.frame_duration = frame_duration
+        self.max_load = max_load
+        self.read_duration = target_latency  # seconds of audio per read, adjusted as reads are measured
+        self.processing_time = 0.0  # moving average of the seconds spent processing each read
+        self._lock = threading.Lock()
+        self._unread = weakref.WeakKeyDictionary()  # audio stream to audio read from it but not yet used by ``listen``
+
+    @property
+    def effective_latency(self):
+        return self.read_duration + self.processing_time
+
+    def frame_size(self, sample_rate):
+        """
+        Returns the number of audio frames in each speech detection frame, at ``sample_rate``.
+        """
+        return max(1, int(round(self.frame_duration * sample_rate)))
+
+    def read_size(self, sample_rate):
+        """
+        Returns the number of audio frames to read next, at ``sample_rate``: a whole number of speech detection frames.
+        """
+        frame_size = self.frame_size(sample_rate)
+        return frame_size * max(1, int(self.read_duration * sample_rate) // frame_size)
+
+    def record(self, read_duration, processing_time):
+        """
+        Adjusts the read size, after a read of ``read_duration`` seconds of audio took ``processing_time`` seconds to process.
+        """
+        with self._lock:
+            self.processing_time = processing_time if self.processing_time == 0 else 0.8 * self.processing_time + 0.2 * processing_time
+            load = self.processing_time / read_duration
+            # shortest read that meets the target if processing time grows with the read size, but long enough to keep up even if it doesn't
+            self.read_duration = max(self.frame_duration, self.target_latency / (1 + load), self.processing_time / self.max_load)
+
+    def reader(self, source):
+        """
+        Returns a ``FrameReader`` for ``source``, which must be entered.
+        """
+        return FrameReader(self, source)
+
+
+class FrameReader(object):
+    """
+    Reads audio from ``source`` in reads sized by ``chunking``, and hands it out in speech detection frames. Audio that was read but not handed out is kept for the next reader of the same stream.
+    """
+
+    def __init__(self, chunking, source):
+        self.chunking = chunking
+        self.source = source
+        self.frame_size = chunking.frame_size(source.SAMPLE_RATE)
+        self._frame_bytes = self.frame_size * source.SAMPLE_WIDTH
+        with chunking._lock:
+            self._pending = chunking._unread.pop(source.stream, b"")
+        self._ended = False
+        self._last_read = None  # when the previous read returned, for measuring how long its audio took to process
+        self._last_read_size = None
+
+    def read(self):
+        """
+        Returns the next speech detection frame. The last frame of the stream can be shorter, and an empty result means the stream ended.
+        """
+        while len(self._pending) < self._frame_bytes and not self._ended:
+            if self._last_read is not None:
+                self.chunking.record(float(self._last_read_size) / self.source.SAMPLE_RATE, time.monotonic() - self._last_read)
+            self._last_read_size = self.chunking.read_size(self.source.SAMPLE_RATE)
+            buffer = self.source.stream.read(self._last_read_size)
+            self._last_read = time.monotonic()
+            if len(buffer) == 0: self._ended = True
+            self._pending += buffer
+        frame, self._pending = self._pending[:self._frame_bytes], self._pending[self._frame_bytes:]
+        return frame
+
+    def close(self):
+        """
+        Keeps the audio that was read but not handed out yet, for the next reader of the stream.
+        """
+        if self._pending:
+            with self.chunking._lock:
+                self.chunking._unread[self.source.stream] = self._pending
@@ -0,0 +1,133 @@
+"""Thread-safe registry of SDK clients shared between calls to the cloud recognizers."""
+
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+from .exceptions import RequestError
+
+
+def credential_digest(secret):
+    """
+    Returns a SHA-256 digest of ``secret`` (a string, or ``None``) to use in registry keys, so that the keys tell credentials apart without holding the secrets themselves.
+    """
+    return None if secret is None else hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+
+class EngineClientRegistry(object):
+    """
+    Builds the SDK clients used by ``recognize_google_cloud``, ``recognize_lex`` and ``recognize_amazon`` once per credential set, region and endpoint, and hands the same client back on every later call.
+
+    Creating these clients involves credential discovery and channel/connection pool setup, which is far more expensive than the request itself for short utterances. Clients are built lazily on first use; concurrent first uses of the same key only build the client once, while different keys can be built in parallel.
+
+    ``endpoint_urls`` maps a service name (``"google-cloud-speech"``, ``"lex-runtime"``, ``"transcribe"``, ``"s3"``) to an alternative endpoint, which is useful for pointing the recognizers at local stand-in services. For boto3 services this is passed as ``endpoint_url``. For Google Cloud Speech, an endpoint of the form ``"http://HOST:PORT"`` opens a plaintext gRPC channel with anonymous credentials, while ``"HOST:PORT"`` is passed on as the ``api_endpoint`` client option.
+
+    The HTTP recognizers look up their endpoints here too, under the names ``"google"``, ``"wit"``, ``"azure"``, ``"bing"``, ``"houndify"`` and ``"ibm"`` (see ``url``). ``speech_recognition.fake_server.FakeSpeechServer`` provides a local stand-in for all of them.
+    """
+
+    def __init__(self, endpoint_urls=None):
+        self.endpoint_urls = dict(endpoint_urls or {})
+        self._clients = {}
+        self._closers = {}  # key to the function that releases its client, for clients that hold resources such as threads
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._aws_session_lock = threading.Lock()
+
+    def get(self, key, factory, close=None):
+        """
+        Returns the client stored under ``key`` (any hashable value, which shouldn't contain secrets; see ``credential_digest``), calling ``factory()`` to build it if it doesn't exist yet. If ``close`` is given, ``clear`` calls ``close(client)`` once it has forgotten the client.
+
+        A client that was being built while ``clear`` ran is closed right away, and built again.
+        """
+        while True:
+            try:
+                return self._clients[key]
+            except KeyError:
+                pass
+            with self._lock:
+                clients = self._clients  # replaced by ``clear``
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+            with key_lock:  # only one thread builds any given client, the others wait for it
+                client = clients.get(key)
+                built = client is None
+                if built: client = factory()
+                with self._lock:
+                    if clients is self._clients:
+                        if built:
+                            clients[key] = client
+                            if close is not None: self._closers[key] = close
+                        return client
+            if built and close is not None: close(client)  # nobody else has it, since it was never stored
+
+    def clear(self):
+        """
+        Forgets every cached client, so that the next call builds fresh ones (for example, after rotating credentials), and closes the ones that were stored with a ``close`` function.
+        """
+        with self._lock:
+            clients, closers = self._clients, self._closers
+            self._clients, self._closers, self._key_locks = {}, {}, {}
+        for key, close in closers.items(): close(clients[key])
+
+    def url(self, service_name, default_url):
+        """
+        Returns ``default_url`` with its scheme and host replaced by those of the endpoint configured for ``service_name``, or ``default_url`` unchanged if no endpoint is configured. The path and query string are kept, so one endpoint covers every URL a service uses (such as the token and recognition URLs for Azure).
+        """
+        endpoint = self.endpoint_urls.get(service_name)
+        if endpoint is None: return default_url
+        endpoint, default = urlsplit(endpoint), urlsplit(default_url)
+        return urlunsplit((endpoint.scheme, endpoint.netloc, endpoint.path.rstrip("/") + default.path, default.query, default.fragment))
+
+    def google_speech_client(self, credentials_json=None):
+        """
+        Returns a ``google.cloud.speech.SpeechClient`` for the service account JSON file ``credentials_json``, or for the application default credentials if ``credentials_json`` is ``None``.
+        """
+        try:
+            from google.cloud import speech
+        except ImportError:
+            raise RequestError("missing google-cloud-speech module: ensure that google-cloud-speech is set up correctly.")
+
+        endpoint = self.endpoint_urls.get("google-cloud-speech")
+
+        def build():
+            if endpoint is not None and endpoint.startswith("http://"):  # local stand-in service without TLS
+                import grpc
+                from google.auth.credentials import AnonymousCredentials
+                from google.cloud.speech_v1.services.speech.transports import SpeechGrpcTransport
+                channel = grpc.insecure_channel(endpoint[len("http://"):])
+                return speech.SpeechClient(transport=SpeechGrpcTransport(channel=channel, credentials=AnonymousCredentials()))
+            client_options = {"api_endpoint": endpoint} if endpoint is not None else None
+            if credentials_json is not None:
+                return speech.SpeechClient.from_service_account_json(credentials_json, client_options=client_options)
+            return speech.SpeechClient(client_options=client_options)
+
+        return self.get(("google-cloud-speech", credentials_json, endpoint), build)
+
+    def aws_session(self, access_key_id=None, secret_access_key=None, region=None):
+        """
+        Returns a ``boto3.session.Session`` for the given credentials and region. If ``access_key_id`` or ``secret_access_key`` is ``None``, boto3 goes through its usual `credential lookup <http://boto3.readthedocs.io/en/latest/guide/configuration.html#configuring-credentials>`__.
+
+        A dedicated session is used instead of the boto3 default session, since sessions are not safe to share between threads while clients are being created from them.
+        """
+        try:
+            import boto3
+        except ImportError:
+            raise RequestError("missing boto3 module: ensure that boto3 is set up correctly.")
+
+        return self.get(("aws-session", access_key_id, credential_digest(secret_access_key), region), lambda: boto3.session.Session(
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            region_name=region,
+        ))
+
+    def aws_client(self, service_name, access_key_id=None, secret_access_key=None, region=None):
+        """
+        Returns a boto3 client for ``service_name`` (such as ``"lex-runtime"``, ``"transcribe"`` or ``"s3"``), for the given credentials and region. boto3 clients are thread-safe, so the same client is shared by every caller.
+        """
+        endpoint_url = self.endpoint_urls.get(service_name)
+        session = self.aws_session(access_key_id, secret_access_key, region)
+
+        def build():
+            with self._aws_session_lock:
+                return session.client(service_name, endpoint_url=endpoint_url)
+
+        return self.get(("aws-client", service_name, access_key_id, credential_digest(secret_access_key), region, endpoint_url), build)
@@ -0,0 +1,332 @@
+"""Recognition daemon that keeps the offline models loaded in one process and serves several programs over a Unix domain socket.
+
+Run it with ``python -m speech_recognition.daemon --socket /tmp/speech_recognition.sock``, and use ``RecognitionClient`` in each program in place of a ``Recognizer``.
+"""
+
+import argparse
+import errno
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from . import exceptions
+from .audio import AudioData
+from .engines import ENGINE_MODULES
+from .exceptions import RequestError
+
+# every message is a fixed-size header followed by its variable-size parts
+_REQUEST_HEADER = struct.Struct(">IIIBI")  # request ID, options length, sample rate, sample width, audio length; followed by the options (JSON) and the raw audio
+_RESPONSE_HEADER = struct.Struct(">II")  # request ID, body length; followed by the body (JSON)
+
+
+def _receive_exactly(connection, size):
+    # returns ``size`` bytes from ``connection``, or ``None`` if it was closed before the first byte
+    parts, remaining = [], size
+    while remaining > 0:
+        part = connection.recv(min(remaining, 1 << 20))
+        if not part:
+            if remaining == size: return None
+            raise EOFError("connection closed in the middle of a message")
+        parts.append(part)
+        remaining -= len(part)
+    return b"".join(parts)
+
+
+def encode_request(request_id, engine_name, args, kwargs, audio_data):
+    options = json.dumps({"engine": engine_name, "args": list(args), "kwargs": kwargs}).encode("utf-8")
+    return _REQUEST_HEADER.pack(request_id, len(options), audio_data.sample_rate, audio_data.sample_width, len(audio_data.frame_data)) + options + audio_data.frame_data
+
+
+def read_request(connection):
+    """
+    Reads a request from ``connection``, and returns ``(request ID, engine name, args, kwargs, audio data)``, or ``None`` if the connection was closed.
+    """
+    header = _receive_exactly(connection, _REQUEST_HEADER.size)
+    if header is None: return None
+    request_id, options_length, sample_rate, sample_width, audio_length = _REQUEST_HEADER.unpack(header)
+    options = json.loads(_receive_exactly(connection, options_length).decode("utf-8"))
+    frame_data = _receive_exactly(connection, audio_length) if audio_length else b""
+    return request_id, options["engine"], options["args"], options["kwargs"], AudioData(frame_data, sample_rate, sample_width)
+
+
+def encode_response(request_id, body):
+    body = json.dumps(body).encode("utf-8")
+    return _RESPONSE_HEADER.pack(request_id, len(body)) + body
+
+
+def read_response(connection):
+    """
+    Reads a response from ``connection``, and returns ``(request ID, body)``, or ``None`` if the connection was closed.
+    """
+    header = _receive_exactly(connection, _RESPONSE_HEADER.size)
+    if header is None: return None
+    request_id, body_length = _RESPONSE_HEADER.unpack(header)
+    return request_id, json.loads(_receive_exactly(connection, body_length).decode("utf-8"))
+
+
+class _Request(object):
+    def __init__(self, connection, request_id, engine_name, args, kwargs, audio_data):
+        self.connection = connection
+        self.request_id = request_id
+        self.engine_name = engine_name
+        self.args = args
+        self.kwargs = kwargs
+        self.audio_data = audio_data
+        self.batch_key = json.dumps([engine_name, args, kwargs], sort_keys=True)  # requests that use the same model and settings
+
+
+class _Connection(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.send_lock = threading.Lock()  # responses are sent from the daemon's worker thread
+
+    def handle(self):
+        while True:
+            try:
+                message = read_request(self.request)
+            except (OSError, EOFError, ValueError, KeyError):
+                return
+            if message is None: return
+            self.server.recognition_daemon.submit(_Request(self, *message))
+
+    def send(self, data):
+        with self.send_lock:
+            try:
+                self.request.sendall(data)
+            except OSError:
+                pass  # the client went away, nobody is waiting for the result
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class RecognitionDaemon(object):
+    """
+    Serves ``recognize_*`` calls from ``RecognitionClient`` instances over a Unix domain socket at ``path``, running them all on one ``Recognizer`` (``recognizer``, or a new one). Models that the offline engines load (Whisper, Vosk, Sphinx and so on) are kept on that recognizer, so they're loaded once for every program on the machine rather than once per program.
+
+    The socket can only be used by the user running the daemon. Starting a daemon at the path of one that is still listening raises an ``OSError``, while a socket left over from one that didn't shut down cleanly is replaced.
+
+    Requests are batched across clients: once a request arrives, the daemon waits up to ``batch_window`` seconds for more (at most ``max_batch`` in total), then runs requests for the same engine and settings back to back, so the model stays warm and isn't swapped for another in between. ``batches`` and ``requests`` count the batches and requests handled so far.
+    """
+
+    def __init__(self, path, recognizer=None, batch_window=0.01, max_batch=16):
+        if recognizer is None:
+            from . import Recognizer
+            recognizer = Recognizer()
+        self.path = path
+        self.recognizer = recognizer
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._pending = []
+        self._condition = threading.Condition()
+        self._running = False
+        self._server = None
+        self._threads = []
+
+    def start(self):
+        assert self._server is None, "daemon is already running"
+        if os.path.exists(self.path) and stat.S_ISSOCK(os.stat(self.path).st_mode):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except ConnectionRefusedError:  # left over from a daemon that didn't shut down cleanly
+                os.unlink(self.path)
+            else:
+                raise OSError(errno.EADDRINUSE, "a recognition daemon is already listening at {}".format(self.path))
+            finally:
+                probe.close()
+        server = _Server(self.path, _Connection, bind_and_activate=False)
+        try:
+            server.server_bind()
+            os.chmod(self.path, 0o600)  # other users could otherwise make this process run engines; done before listening, so nobody can connect in between
+            server.server_activate()
+        except BaseException:
+            server.server_close()
+            raise
+        self._server = server
+        self._server.recognition_daemon = self
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="recognition-daemon-server"),
+            threading.Thread(target=self._work, name="recognition-daemon-worker"),
+        ]
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def stop(self):
+        if self._server is None: return
+        self._server.shutdown()
+        self._server.server_close()
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        for thread in self._threads: thread.join()
+        self._server = None
+        if os.path.exists(self.path): os.unlink(self.path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while True: time.sleep(3600)
+        finally:
+            self.stop()
+
+    def submit(self, request):
+        with self._condition:
+            self._pending.append(request)
+            self._condition.notify_all()
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._pending and self._running:
+                self._condition.wait()
+            if not self._running: return None
+            give_up_at = time.monotonic() + self.batch_window
+            while len(self._pending) < self.max_batch and self._running:  # give other clients a moment to join the batch
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0: break
+                self._condition.wait(remaining)
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None: return
+            self.batches += 1
+            self.requests += len(batch)
+            groups = {}
+            for request in batch: groups.setdefault(request.batch_key, []).append(request)
+            for group in groups.values():
+                for request in group: request.connection.send(encode_response(request.request_id, self._run(request)))
+
+    def _run(self, request):
+        if request.engine_name not in ENGINE_MODULES: return {"error": "RequestError", "message": "unknown engine {!r}".format(request.engine_name)}
+        try:
+            result = getattr(self.recognizer, "recognize_" + request.engine_name)(request.audio_data, *request.args, **request.kwargs)
+            json.dumps(result)
+        except (TypeError, ValueError) as exc:
+            return {"error": "RequestError", "message": "invalid request or result: {}".format(exc)}
+        except Exception as exc:
+            return {"error": type(exc).__name__, "message": str(exc)}
+        return {"result": result}
+
+
+class RecognitionClient(object):
+    """
+    Stands in for a ``Recognizer`` in programs that use a ``RecognitionDaemon`` listening at ``path``: it has the same ``recognize_*`` methods, with the same parameters, but they're run by the daemon. The audio data, other arguments and results must be representable as JSON, so options such as ``show_all`` that return engine-specific objects don't work with every engine.
+
+    Exceptions raised by the engine (``speech_recognition.UnknownValueError``, ``speech_recognition.RequestError`` and so on) are raised by the client as well. A ``speech_recognition.RequestError`` exception is raised if the daemon can't be reached, or takes longer than ``operation_timeout`` seconds (if not ``None``).
+
+    One client can be used from several threads at once; their requests share one connection.
+    """
+
+    def __init__(self, path, operation_timeout=None):
+        self.path = path
+        self.operation_timeout = operation_timeout
+        self._connection = None
+        self._lock = threading.Lock()
+        self._waiting = {}  # request ID to the ``Future`` for its response
+        self._next_id = 0
+
+    def close(self):
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.shutdown(socket.SHUT_RDWR)
+            connection.close()
+
+    def _connect(self):
+        # called with ``self._lock`` held
+        if self._connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(self.path)
+            self._connection = connection
+            thread = threading.Thread(target=self._receive, args=(connection,), name="recognition-client")
+            thread.daemon = True
+            thread.start()
+        return self._connection
+
+    def _receive(self, connection):
+        error = RequestError("recognition daemon closed the connection")
+        try:
+            while True:
+                message = read_response(connection)
+                if message is None: break
+                request_id, body = message
+                with self._lock:
+                    future = self._waiting.pop(request_id, None)
+                if future is not None: future.set_result(body)
+        except (OSError, EOFError, ValueError) as exc:
+            error = RequestError("recognition connection failed: {}".format(exc))
+        with self._lock:  # fail everything still waiting on this connection
+            if self._connection is connection: self._connection = None
+            waiting, self._waiting = self._waiting, {}
+        for future in waiting.values(): future.set_exception(error)
+
+    def call(self, engine_name, audio_data, args=(), kwargs=None):
+        """
+        Runs ``recognizer_instance.recognize_<engine_name>(audio_data, *args, **kwargs)`` in the daemon, and returns its result.
+        """
+        assert isinstance(audio_data, AudioData), "``audio_data`` must be audio data"
+        future = Future()
+        try:
+            with self._lock:
+                request_id, self._next_id = self._next_id, (self._next_id + 1) % (1 << 32)
+                self._waiting[request_id] = future
+                connection = self._connect()
+                connection.sendall(encode_request(request_id, engine_name, args, kwargs or {}, audio_data))
+        except OSError as exc:
+            with self._lock: self._waiting.pop(request_id, None)
+            raise RequestError("recognition connection failed: {}".format(exc))
+
+        try:
+            body = future.result(self.operation_timeout)
+        except FutureTimeoutError:
+            with self._lock: self._waiting.pop(request_id, None)
+            raise RequestError("recognition daemon timed out")
+        if "error" in body:
+            exception_class = getattr(exceptions, body["error"], None)
+            if not (isinstance(exception_class, type) and issubclass(exception_class, Exception)): exception_class = RequestError
+            raise exception_class(body["message"])
+        return body["result"]
+
+
+def _client_method(engine_name):
+    def method(self, audio_data, *args, **kwargs):
+        return self.call(engine_name, audio_data, args, kwargs)
+    method.__name__ = "recognize_" + engine_name
+    method.__doc__ = "Runs ``recognizer_instance.recognize_{}`` in the recognition daemon, with the same arguments.".format(engine_name)
+    return method
+
+
+for _engine_name in ENGINE_MODULES: setattr(RecognitionClient, "recognize_" + _engine_name, _client_method(_engine_name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", default="/tmp/speech_recognition.sock", help="path of the Unix domain socket to listen on")
+    parser.add_argument("--batch-window", type=float, default=0.01, help="seconds to wait for more requests to batch with the first one")
+    parser.add_argument("--max-batch", type=int, default=16, help="most requests in a batch")
+    args = parser.parse_args()
+    RecognitionDaemon(args.socket, batch_window=args.batch_window, max_batch=args.max_batch).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
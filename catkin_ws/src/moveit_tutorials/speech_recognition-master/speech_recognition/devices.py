@@ -0,0 +1,129 @@
+"""Shared PyAudio instance and microphone discovery, so that finding and opening microphones doesn't initialize PortAudio over and over."""
+
+import audioop
+import contextlib
+import threading
+import time
+
+
+class PyAudioHost(object):
+    """
+    A ``pyaudio.PyAudio`` instance shared by everything in the process that uses PyAudio, with a reference count. PortAudio is initialized when the first reference is acquired, and terminated once the last one is released, rather than once for every ``Microphone`` and every device query.
+
+    PortAudio only looks for devices when it's initialized, so devices plugged in while a reference is held only show up after every reference was released.
+
+    PortAudio isn't thread-safe, so ``portaudio_lock`` must be held while calling into it from any thread that shares the instance: when opening, stopping or closing streams, and when querying devices. It doesn't need to be held while reading from an open stream.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._audio = None
+        self._references = 0
+        self.portaudio_lock = threading.RLock()
+
+    @property
+    def references(self):
+        return self._references
+
+    def acquire(self, pyaudio_module):
+        """
+        Returns the shared ``pyaudio_module.PyAudio`` instance, creating it if there isn't one. Every call must be matched by a call to ``release``.
+        """
+        with self._lock:
+            if self._audio is None:
+                with self.portaudio_lock: self._audio = pyaudio_module.PyAudio()
+            self._references += 1
+            return self._audio
+
+    def release(self):
+        with self._lock:
+            assert self._references > 0, "PyAudio instance was released more times than it was acquired"
+            self._references -= 1
+            if self._references > 0: return
+            audio, self._audio = self._audio, None
+        with self.portaudio_lock: audio.terminate()
+
+    @contextlib.contextmanager
+    def borrow(self, pyaudio_module):
+        """
+        Context manager that holds a reference to the shared PyAudio instance while inside it.
+        """
+        audio = self.acquire(pyaudio_module)
+        try:
+            yield audio
+        finally:
+            self.release()
+
+
+pyaudio_host = PyAudioHost()
+
+_working_microphones = None  # ``(device count, result)`` of the last search for working microphones
+_working_microphones_lock = threading.Lock()
+
+
+def debiased_energy(buffer):
+    """
+    Returns the RMS of the 16-bit audio in ``buffer``, after removing its DC offset.
+    """
+    energy = -audioop.rms(buffer, 2)
+    energy_bytes = bytes([energy & 0xFF, (energy >> 8) & 0xFF])
+    return audioop.rms(audioop.add(buffer, energy_bytes * (len(buffer) // 2), 2), 2)
+
+
+def _probe(pyaudio_module, device_index, sample_rate, give_up_at, results, results_lock):
+    # holds its own reference, so that PortAudio isn't terminated under a probe that outlived its timeout; the stream is only read once audio is waiting in it, so the probe always ends (and releases its reference) by ``give_up_at``
+    audio = pyaudio_host.acquire(pyaudio_module)
+    try:
+        with pyaudio_host.portaudio_lock:
+            pyaudio_stream = audio.open(input_device_index=device_index, channels=1, format=pyaudio_module.paInt16, rate=sample_rate, input=True)
+        try:
+            while pyaudio_stream.get_read_available() < 1024:
+                if time.monotonic() >= give_up_at: return
+                time.sleep(0.01)
+            buffer = pyaudio_stream.read(1024, exception_on_overflow=False)
+        finally:
+            with pyaudio_host.portaudio_lock:
+                try:
+                    if not pyaudio_stream.is_stopped(): pyaudio_stream.stop_stream()
+                finally:
+                    pyaudio_stream.close()
+    except Exception:
+        return
+    finally:
+        pyaudio_host.release()
+    with results_lock:
+        results[device_index] = debiased_energy(buffer)
+
+
+def find_working_microphones(pyaudio_module, timeout=1.0, refresh=False):
+    """
+    Returns a dictionary mapping the device indices of microphones that are currently hearing sounds to their names. This is what ``Microphone.list_working_microphones`` returns.
+
+    All devices are tried at the same time, and devices that don't deliver audio within ``timeout`` seconds are left out. The result is reused by later calls until the number of devices changes, unless ``refresh`` is true.
+    """
+    global _working_microphones
+    with pyaudio_host.borrow(pyaudio_module) as audio:
+        with pyaudio_host.portaudio_lock: device_count = audio.get_device_count()
+        with _working_microphones_lock:
+            if not refresh and _working_microphones is not None and _working_microphones[0] == device_count:
+                return dict(_working_microphones[1])
+
+        names, energies, energies_lock, threads = {}, {}, threading.Lock(), []
+        give_up_at = time.monotonic() + timeout
+        for device_index in range(device_count):
+            with pyaudio_host.portaudio_lock: device_info = audio.get_device_info_by_index(device_index)
+            assert isinstance(device_info.get("defaultSampleRate"), (float, int)) and device_info["defaultSampleRate"] > 0, "Invalid device info returned from PyAudio: {}".format(device_info)
+            if device_info.get("maxInputChannels", 1) < 1: continue  # output-only device
+            names[device_index] = device_info.get("name")
+            thread = threading.Thread(target=_probe, args=(pyaudio_module, device_index, int(device_info["defaultSampleRate"]), give_up_at, energies, energies_lock), name="probe-microphone-{}".format(device_index))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join(max(0, give_up_at - time.monotonic()))
+        with energies_lock:
+            result = {device_index: names[device_index] for device_index, energy in sorted(energies.items()) if energy > 30}  # above 30 is probably actually audio
+        with _working_microphones_lock:
+            _working_microphones = (device_count, result)
+        return dict(result)
@@ -0,0 +1,310 @@
+"""Common entry point for the ``recognize_*`` methods, where behaviour shared by every engine is applied."""
+
+import collections
+import contextlib
+import functools
+import importlib
+import threading
+import time
+
+from .audio import AudioData
+from .exceptions import DeadlineExceeded
+from .ratelimit import current_priority, priority
+
+CREDENTIAL_PARAMETERS = ("key", "api_key", "api_token", "client_access_token", "client_id", "credentials_json", "access_key_id")  # the argument that identifies whose quota a call counts against
+
+_state = threading.local()  # ``deadline`` (monotonic time or ``None``) and ``attempt`` (the ``_Attempt`` running on this thread, if any)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+ENGINE_MODULES = {  # engine name to the module in ``speech_recognition.recognizers`` that defines its ``recognize_<name>`` function
+    "sphinx": "sphinx",
+    "google": "google",
+    "google_cloud": "google_cloud",
+    "wit": "wit",
+    "azure": "azure",
+    "bing": "bing",
+    "lex": "lex",
+    "houndify": "houndify",
+    "amazon": "amazon",
+    "assemblyai": "assemblyai",
+    "ibm": "ibm",
+    "tensorflow": "tensorflow",
+    "whisper": "whisper",
+    "whisper_api": "whisper",
+    "vosk": "vosk",
+    "keywords": "keywords",
+    "api": "api_ai",
+}
+
+
+def load_engine(name):
+    """
+    Imports the module of engine ``name`` (see ``ENGINE_MODULES``), and returns its ``recognize_<name>`` function, wrapped with ``engine``.
+    """
+    module = importlib.import_module("speech_recognition.recognizers." + ENGINE_MODULES[name])
+    return engine(name)(getattr(module, "recognize_" + name))
+
+
+class LazyEngine(object):
+    """
+    Class attribute standing in for a ``recognize_*`` method until it's first used. Looking it up imports the engine's module, and replaces this attribute on the class with the actual method, so later lookups cost nothing extra.
+
+    This keeps ``import speech_recognition`` from loading the code (and the dependencies) of every engine, when most programs use only one of them.
+    """
+
+    def __init__(self, name):
+        assert name in ENGINE_MODULES, "unknown engine {!r}".format(name)
+        self.name = name
+        self.owner = self.attribute = None
+
+    def __set_name__(self, owner, attribute):
+        self.owner, self.attribute = owner, attribute
+
+    def __get__(self, instance, owner=None):
+        method = load_engine(self.name)
+        setattr(self.owner, self.attribute, method)  # concurrent first uses just load the same method twice
+        return method.__get__(instance, owner) if instance is not None else method
+
+
+def engine(name):
+    """
+    Decorator for ``recognize_*`` methods (and functions that are attached to ``Recognizer`` as methods), which routes each call through ``call_engine`` under the engine name ``name``.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(recognizer, audio_data, *args, **kwargs):
+            return call_engine(recognizer, name, method, audio_data, args, kwargs)
+        wrapper.engine_name = name
+        return wrapper
+    return decorator
+
+
+def call_engine(recognizer, name, method, audio_data, args, kwargs):
+    """
+    Calls ``method(recognizer, audio_data, *args, **kwargs)``, answering it from ``recognizer.transcript_cache`` instead if the cache is enabled and already has the result, and applying the recognizer's deadline and hedging settings.
+    """
+    with recognizer.instrumentation.span("recognize", engine=name) as span:
+        def compute():
+            span.set(cache="miss")
+            return _run(recognizer, name, lambda: method(recognizer, audio_data, *args, **kwargs), audio_data, _credential(method, args, kwargs))
+
+        cache = getattr(recognizer, "transcript_cache", None)
+        if cache is None or not isinstance(audio_data, AudioData):  # only complete audio can be hashed
+            return compute()
+        key = cache.make_key(name, audio_data, args, kwargs, method)
+        span.set(cache="hit")
+        timeout = remaining_time()
+        if timeout is None: timeout = getattr(recognizer, "deadline", None)
+        return cache.get_or_compute(key, compute, timeout)
+
+
+@contextlib.contextmanager
+def deadline(seconds):
+    """
+    Context manager that limits every ``recognize_*`` call made inside it on the current thread to finish within ``seconds`` seconds from entering it, including audio conversion, encoding and network requests. Calls that run out of time raise ``speech_recognition.DeadlineExceeded``.
+
+    Nested deadlines can only make the limit tighter. This takes precedence over ``recognizer_instance.deadline``.
+    """
+    previous = getattr(_state, "deadline", None)
+    until = time.monotonic() + seconds
+    _state.deadline = until if previous is None else min(previous, until)
+    try:
+        yield
+    finally:
+        _state.deadline = previous
+
+
+def remaining_time():
+    """
+    Returns the number of seconds left until the deadline of the ``recognize_*`` call running on the current thread, or ``None`` if it has no deadline.
+    """
+    until = getattr(_state, "deadline", None)
+    return None if until is None else until - time.monotonic()
+
+
+def request_timeout(timeout=None):
+    """
+    Returns the timeout to use for a network request made by a ``recognize_*`` method: ``timeout`` (such as ``recognizer_instance.operation_timeout``), shortened to the time left until the deadline of the current call.
+
+    Raises ``speech_recognition.DeadlineExceeded`` if the deadline has already passed, or if this attempt lost a hedged race and the request shouldn't be sent anymore.
+    """
+    attempt = getattr(_state, "attempt", None)
+    if attempt is not None and attempt.cancelled:
+        raise DeadlineExceeded("request was cancelled, since another attempt already finished")
+    remaining = remaining_time()
+    if remaining is None: return timeout
+    if remaining <= 0: raise DeadlineExceeded("recognition deadline exceeded")
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+class LatencyTracker(object):
+    """
+    Keeps the latencies of the last ``window`` successful calls of each engine, for estimating latency percentiles.
+    """
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = collections.deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, name, fraction):
+        """
+        Returns the ``fraction`` quantile (for example, ``0.95`` for the 95th percentile) of the recorded latencies of engine ``name``, in seconds, or ``None`` if none were recorded.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if not samples: return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def count(self, name):
+        with self._lock:
+            return len(self._samples.get(name, ()))
+
+
+class HedgePolicy(object):
+    """
+    Settings for hedged requests, used by setting ``recognizer_instance.hedging`` to an instance of this class.
+
+    If a ``recognize_*`` call hasn't finished after the ``percentile`` latency quantile of its engine (measured over recent calls, once at least ``min_samples`` calls were measured) or after ``delay`` seconds if given, a second attempt is started. The first attempt to succeed is returned, and the other one is cancelled: if it hasn't sent its request yet it never does, otherwise its result is discarded.
+
+    By default, the second attempt repeats the same call. If ``fallback`` is given, it is called as ``fallback(recognizer, audio_data)`` instead, which allows falling back to a different engine, for example ``lambda r, audio: r.recognize_sphinx(audio)``.
+
+    Only calls with ``AudioData`` input are hedged, since a live audio stream can only be read once.
+    """
+
+    def __init__(self, delay=None, percentile=0.95, min_samples=20, fallback=None):
+        assert delay is None or delay >= 0, "``delay`` must be ``None`` or a non-negative number"
+        assert 0 < percentile < 1, "``percentile`` must be between 0 and 1"
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.fallback = fallback
+
+    def hedge_delay(self, latencies, name):
+        """
+        Returns the number of seconds to wait before starting the second attempt for engine ``name``, or ``None`` if there isn't enough data to tell yet.
+        """
+        if self.delay is not None: return self.delay
+        if latencies.count(name) < self.min_samples: return None
+        return latencies.percentile(name, self.percentile)
+
+
+class _Attempt(object):
+    def __init__(self):
+        self.cancelled = False
+
+
+@functools.lru_cache(maxsize=None)
+def _credential_parameter(method):
+    import inspect
+    parameters = list(inspect.signature(method).parameters)[2:]  # skip ``self`` and ``audio_data``
+    for parameter in CREDENTIAL_PARAMETERS:
+        if parameter in parameters: return parameter, parameters.index(parameter)
+    return None, None
+
+
+def _credential(method, args, kwargs):
+    parameter, index = _credential_parameter(method)
+    if parameter is None: return None
+    if parameter in kwargs: return kwargs[parameter]
+    return args[index] if index < len(args) else None
+
+
+def _acquire(recognizer, name, credential, until):
+    limiter = getattr(recognizer, "rate_limiter", None)
+    if limiter is None: return
+    with recognizer.instrumentation.span("queue", engine=name):
+        acquired = limiter.acquire(name, credential, timeout=None if until is None else max(0, until - time.monotonic()))
+    if not acquired:
+        raise DeadlineExceeded("recognition deadline exceeded while waiting for the rate limiter")
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="recognize")
+        return _executor
+
+
+def _timed(recognizer, name, call):
+    start = time.monotonic()
+    result = call()
+    latencies = getattr(recognizer, "engine_latencies", None)
+    if latencies is not None and name is not None: latencies.record(name, time.monotonic() - start)
+    return result
+
+
+def _run(recognizer, name, call, audio_data, credential):
+    until = getattr(_state, "deadline", None)
+    if getattr(_state, "attempt", None) is not None:  # already running inside a deadline or hedge, for example as a fallback
+        _acquire(recognizer, name, credential, until)
+        return _timed(recognizer, name, call)
+
+    if until is None and getattr(recognizer, "deadline", None) is not None:
+        until = time.monotonic() + recognizer.deadline
+    _acquire(recognizer, name, credential, until)
+    hedging = getattr(recognizer, "hedging", None) if isinstance(audio_data, AudioData) else None
+    hedge_delay = None if hedging is None else hedging.hedge_delay(recognizer.engine_latencies, name)
+    if until is None and hedge_delay is None:
+        return _timed(recognizer, name, call)
+
+    level = current_priority()
+    parent_span_id = recognizer.instrumentation.current_span_id()  # attempts run on other threads, so link their spans explicitly
+
+    def run_attempt(attempt, attempt_call, attempt_name):
+        _state.attempt, _state.deadline = attempt, until
+        try:
+            with priority(level), recognizer.instrumentation.span("attempt", parent=parent_span_id, engine=attempt_name or "fallback"):
+                return _timed(recognizer, attempt_name, attempt_call)
+        finally:
+            _state.attempt, _state.deadline = None, None
+
+    from concurrent.futures import FIRST_COMPLETED, wait
+    executor = _get_executor()
+    attempts = {}
+
+    def start_attempt(attempt_call, attempt_name):
+        attempt = _Attempt()
+        future = executor.submit(run_attempt, attempt, attempt_call, attempt_name)
+        attempts[future] = attempt
+        return future
+
+    pending, first_error = {start_attempt(call, name)}, None
+    hedge_at = None if hedge_delay is None else time.monotonic() + hedge_delay
+    try:
+        while True:
+            now = time.monotonic()
+            if until is not None and now >= until:
+                raise DeadlineExceeded("recognition deadline exceeded")
+            if hedge_at is not None and now >= hedge_at:  # the first attempt is slower than usual, start another one
+                hedge_at = None
+                limiter = getattr(recognizer, "rate_limiter", None)
+                if hedging.fallback is None:
+                    if limiter is None or limiter.try_acquire(name, credential):  # never queue a duplicate request behind other requests
+                        pending.add(start_attempt(call, name))
+                else:  # the fallback's own engine calls record their latencies, so this one isn't recorded separately
+                    pending.add(start_attempt(lambda: hedging.fallback(recognizer, audio_data), None))
+            if not pending:
+                raise first_error
+
+            wake_times = [t for t in (until, hedge_at) if t is not None]
+            done, pending = wait(pending, timeout=max(0, min(wake_times) - now) if wake_times else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                if first_error is None: first_error = future.exception()
+    finally:
+        for future, attempt in attempts.items():
+            attempt.cancelled = True
+            future.cancel()
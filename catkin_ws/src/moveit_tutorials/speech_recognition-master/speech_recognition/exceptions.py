@@ -10,6 +10,10 @@ class RequestError(Exception):
     pass
 
 
+class DeadlineExceeded(RequestError):
+    pass
+
+
 class UnknownValueError(Exception):
     pass
 
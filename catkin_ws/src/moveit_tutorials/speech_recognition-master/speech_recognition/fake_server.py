@@ -0,0 +1,298 @@
+"""Local stand-ins for the HTTP and gRPC speech recognition services, for measuring and testing the recognizers offline."""
+
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from .ratelimit import TokenBucket
+
+ENGINES = ("google", "wit", "azure", "bing", "houndify", "ibm")
+
+
+def _google_response(transcript, confidence):
+    # the real service sends an empty result first, followed by the actual result on the next line
+    return "application/json", '{"result":[]}\n' + json.dumps({"result": [{"alternative": [{"transcript": transcript, "confidence": confidence}], "final": True}], "result_index": 0}) + "\n"
+
+
+def _wit_response(transcript, confidence):
+    return "application/json", json.dumps({"_text": transcript, "entities": {}})
+
+
+def _azure_response(transcript, confidence):
+    return "application/json", json.dumps({"RecognitionStatus": "Success", "Offset": 0, "Duration": 0, "NBest": [{"Confidence": confidence, "Lexical": transcript.lower(), "Display": transcript}]})
+
+
+def _bing_response(transcript, confidence):
+    return "application/json", json.dumps({"RecognitionStatus": "Success", "DisplayText": transcript, "Offset": 0, "Duration": 0})
+
+
+def _houndify_response(transcript, confidence):
+    return "application/json", json.dumps({"Status": "OK", "Disambiguation": {"NumToShow": 1, "ChoiceData": [{"Transcription": transcript, "ConfidenceScore": confidence}]}})
+
+
+def _ibm_response(transcript, confidence):
+    return "application/json", json.dumps({"result_index": 0, "results": [{"final": True, "alternatives": [{"transcript": transcript, "confidence": confidence}]}]})
+
+
+def _token_response(transcript, confidence):
+    return "text/plain", "fake-access-token"
+
+
+_ROUTES = {  # request path to ``(engine name, response builder)``
+    "/speech-api/v2/recognize": ("google", _google_response),
+    "/speech": ("wit", _wit_response),
+    "/sts/v1.0/issueToken": ("token", _token_response),
+    "/speech/recognition/conversation/cognitiveservices/v1": ("azure", _azure_response),
+    "/speech/recognition/interactive/cognitiveservices/v1": ("bing", _bing_response),
+    "/v1/audio": ("houndify", _houndify_response),
+    "/speech-to-text/api/v1/recognize": ("ibm", _ibm_response),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server.fake
+        route = _ROUTES.get(urlsplit(self.path).path)
+        body = self._read_body()
+        if route is None:
+            self._respond(404, "text/plain", "unknown endpoint")
+            return
+        engine_name, build_response = route
+        within_quota = engine_name == "token" or server._within_quota(engine_name)  # counted when the request arrives, like the real services do
+        delay, fail = server._next_outcome()
+        if delay > 0: time.sleep(delay)
+        server._count(engine_name)
+        if not within_quota:
+            self._respond(429, "text/plain", "quota exceeded")
+        elif fail:
+            self._respond(503, "text/plain", "injected failure")
+        elif engine_name != "token" and not body.startswith((b"RIFF", b"fLaC")):
+            self._respond(400, "text/plain", "request body is not a WAV or FLAC file")
+        else:
+            self._respond(200, *build_response(server.transcript, server.confidence))
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            pieces = []
+            while True:
+                line = self.rfile.readline()
+                if not line: raise ConnectionAbortedError("client stopped in the middle of the body")  # for example, capturing the audio it was streaming failed
+                size = int(line.split(b";")[0], 16)
+                if size == 0:
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""): pass  # skip trailers
+                    return b"".join(pieces)
+                pieces.append(self.rfile.read(size))
+                self.server.fake._received(len(pieces[-1]))  # counted as it arrives, so that uploads still in progress show up
+                self.rfile.readline()  # CRLF after each chunk
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.fake._received(len(body))
+        return body
+
+    def _respond(self, status, content_type, text):
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "{}; charset=utf-8".format(content_type))
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # don't write a line to stderr for every request
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError): return  # the client gave up on the request (for example, its deadline passed)
+        super().handle_error(request, client_address)
+
+
+class FakeSpeechServer(object):
+    """
+    HTTP server on the loopback interface that answers requests in the formats expected by ``recognize_google``, ``recognize_wit``, ``recognize_azure``, ``recognize_bing``, ``recognize_houndify`` and ``recognize_ibm``, always with the transcript ``transcript`` and confidence ``confidence``.
+
+    Each request is answered after ``latency`` seconds, plus a uniformly random extra delay of up to ``jitter`` seconds. A fraction ``failure_rate`` of requests fail with HTTP status 503, which the recognizers report as ``speech_recognition.RequestError``. ``seed`` makes the delays and failures reproducible.
+
+    ``body_bytes`` counts the bytes of request bodies received so far, including those of requests that are still being uploaded.
+
+    If ``quota`` is given, each engine accepts at most ``quota`` recognition requests per second (with bursts of up to ``quota_burst`` requests, by default one second's worth), like a provider's rate limit, and answers the rest with HTTP status 429. ``request_counts["rejected"]`` counts these.
+
+    Use it as a context manager, and point a recognizer at it with ``server.configure(recognizer_instance)``::
+
+        with FakeSpeechServer(latency=0.2) as server:
+            server.configure(r)
+            r.recognize_google(audio)  # answered locally
+    """
+
+    def __init__(self, transcript="hello world", confidence=0.9, latency=0.0, jitter=0.0, failure_rate=0.0, seed=None, quota=None, quota_burst=None, host="127.0.0.1", port=0):
+        assert latency >= 0 and jitter >= 0, "``latency`` and ``jitter`` must be non-negative"
+        assert 0 <= failure_rate <= 1, "``failure_rate`` must be between 0 and 1 inclusive"
+        self.transcript = transcript
+        self.confidence = confidence
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.quota = quota
+        self.quota_burst = quota_burst
+        self._quota_buckets = {}
+        self.request_counts = {}  # engine name (or ``"token"`` for access token requests) to number of requests answered
+        self.body_bytes = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def endpoint_urls(self):
+        """
+        Returns a dictionary mapping each supported engine to this server, suitable for ``EngineClientRegistry.endpoint_urls``.
+        """
+        return {engine_name: self.url for engine_name in ENGINES}
+
+    def configure(self, recognizer):
+        """
+        Points the HTTP recognizers of ``recognizer`` at this server.
+        """
+        recognizer.engine_clients.endpoint_urls.update(self.endpoint_urls())
+
+    def start(self):
+        assert self._thread is None, "server is already running"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-speech-server")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None: return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _next_outcome(self):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter > 0 else 0)
+            return delay, self._random.random() < self.failure_rate
+
+    def _within_quota(self, engine_name):
+        if self.quota is None: return True
+        with self._lock:
+            bucket = self._quota_buckets.get(engine_name)
+            if bucket is None:
+                bucket = self._quota_buckets[engine_name] = TokenBucket(self.quota, self.quota_burst)
+            if bucket.try_take(time.monotonic()): return True
+            self.request_counts["rejected"] = self.request_counts.get("rejected", 0) + 1
+            return False
+
+    def _received(self, size):
+        with self._lock:
+            self.body_bytes += size
+
+    def _count(self, engine_name):
+        with self._lock:
+            self.request_counts[engine_name] = self.request_counts.get(engine_name, 0) + 1
+
+
+class FakeGoogleCloudSpeechServer(object):
+    """
+    gRPC server on the loopback interface that answers the ``Recognize`` and ``StreamingRecognize`` calls of the Google Cloud Speech API (v1), as used by ``recognize_google_cloud``, always with the transcript ``transcript`` and confidence ``confidence``. Requires the ``grpcio`` and ``google-cloud-speech`` packages.
+
+    Streaming calls get an interim result for every ``interim_interval`` seconds of audio received, with one more word of the transcript each time, and the final result once the client stops sending audio. ``streaming_configs`` holds the configuration of each streaming call, and ``audio_bytes`` counts the bytes of audio received so far.
+
+    Use it as a context manager, and point a recognizer at it with ``server.configure(recognizer_instance)``::
+
+        with FakeGoogleCloudSpeechServer() as server:
+            server.configure(r)
+            r.recognize_google_cloud(stream, credentials_json="unused.json", interim_callback=print)  # answered locally
+    """
+
+    def __init__(self, transcript="hello world", confidence=0.9, interim_interval=0.25, host="127.0.0.1", port=0):
+        import grpc
+        from google.cloud import speech
+        self.transcript = transcript
+        self.confidence = confidence
+        self.interim_interval = interim_interval
+        self.streaming_configs = []
+        self.audio_bytes = 0
+        self._lock = threading.Lock()
+        self._speech = speech
+        self._server = grpc.server(ThreadPoolExecutor(max_workers=4, thread_name_prefix="fake-google-cloud-speech"))
+        self._server.add_generic_rpc_handlers([grpc.method_handlers_generic_handler("google.cloud.speech.v1.Speech", {
+            "Recognize": grpc.unary_unary_rpc_method_handler(self._recognize, request_deserializer=speech.RecognizeRequest.deserialize, response_serializer=speech.RecognizeResponse.serialize),
+            "StreamingRecognize": grpc.stream_stream_rpc_method_handler(self._streaming_recognize, request_deserializer=speech.StreamingRecognizeRequest.deserialize, response_serializer=speech.StreamingRecognizeResponse.serialize),
+        })])
+        self.host = host
+        self.port = self._server.add_insecure_port("{}:{}".format(host, port))
+        self._started = False
+
+    @property
+    def url(self):
+        return "http://{}:{}".format(self.host, self.port)
+
+    def configure(self, recognizer):
+        """
+        Points ``recognizer_instance.recognize_google_cloud`` at this server.
+        """
+        recognizer.engine_clients.endpoint_urls["google-cloud-speech"] = self.url
+
+    def start(self):
+        assert not self._started, "server is already running"
+        self._server.start()
+        self._started = True
+        return self
+
+    def stop(self):
+        if not self._started: return
+        self._server.stop(grace=None).wait()
+        self._started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _result(self, transcript, **kwargs):
+        return dict(alternatives=[self._speech.SpeechRecognitionAlternative(transcript=transcript, confidence=self.confidence)], **kwargs)
+
+    def _recognize(self, request, context):
+        return self._speech.RecognizeResponse(results=[self._speech.SpeechRecognitionResult(**self._result(self.transcript))])
+
+    def _streaming_recognize(self, requests, context):
+        import grpc
+        speech = self._speech
+        config = next(requests, None)
+        if config is None or "streaming_config" not in config: context.abort(grpc.StatusCode.INVALID_ARGUMENT, "the first request must be the streaming configuration")
+        config = config.streaming_config
+        with self._lock: self.streaming_configs.append(config)
+        if config.config.encoding != speech.RecognitionConfig.AudioEncoding.LINEAR16: context.abort(grpc.StatusCode.INVALID_ARGUMENT, "only LINEAR16 audio is supported")
+
+        words, received, interims = self.transcript.split(), 0, 0
+        bytes_per_interim = max(1, int(self.interim_interval * config.config.sample_rate_hertz * 2))
+        for request in requests:
+            received += len(request.audio_content)
+            with self._lock: self.audio_bytes += len(request.audio_content)
+            while config.interim_results and received >= (interims + 1) * bytes_per_interim:
+                interims += 1
+                yield speech.StreamingRecognizeResponse(results=[speech.StreamingRecognitionResult(**self._result(" ".join(words[:interims]), is_final=False, stability=0.5))])
+        if received > 0:
+            yield speech.StreamingRecognizeResponse(results=[speech.StreamingRecognitionResult(**self._result(self.transcript, is_final=True, stability=1.0))])
@@ -0,0 +1,227 @@
+"""Acoustic features (spectrograms, mel spectrograms and MFCCs) computed with NumPy, shared by the engines and tools that need them."""
+
+import functools
+import threading
+import weakref
+
+from .audio import AudioData
+from .exceptions import RequestError
+from .streaming import LiveAudioStream, PCMConverter
+
+KINDS = ("spectrogram", "mel", "log_mel", "mfcc", "energy")
+
+DEFAULT_PARAMETERS = {
+    "sample_rate": 16000,  # the audio is resampled to this rate first
+    "frame_length": 0.025,  # seconds of audio in each analysis window
+    "frame_step": 0.01,  # seconds between the starts of consecutive windows
+    "fft_size": 512,
+    "window": "hamming",  # or ``"hann"``
+    "pre_emphasis": 0.97,  # first-order high-pass filter coefficient, or 0 to leave the audio as it is
+    "mel_bands": 40,
+    "coefficients": 13,  # number of MFCCs, starting with the zeroth
+}
+
+_STAGE_PARAMETERS = {  # the parameters that each kind of feature depends on, so that kinds computed from each other share cache entries
+    "spectrogram": ("sample_rate", "frame_length", "frame_step", "fft_size", "window", "pre_emphasis"),
+    "energy": ("sample_rate", "frame_length", "frame_step", "fft_size", "window", "pre_emphasis"),
+    "mel": ("sample_rate", "frame_length", "frame_step", "fft_size", "window", "pre_emphasis", "mel_bands"),
+    "log_mel": ("sample_rate", "frame_length", "frame_step", "fft_size", "window", "pre_emphasis", "mel_bands"),
+    "mfcc": ("sample_rate", "frame_length", "frame_step", "fft_size", "window", "pre_emphasis", "mel_bands", "coefficients"),
+}
+_SOURCE_KIND = {"energy": "spectrogram", "mel": "spectrogram", "log_mel": "mel", "mfcc": "log_mel"}
+
+_cache = weakref.WeakKeyDictionary()  # ``AudioData`` instance to a dictionary mapping ``(kind, parameters)`` to features
+_cache_lock = threading.Lock()
+
+
+def get_numpy():
+    """
+    Imports NumPy, which computing features requires. Raises a ``speech_recognition.RequestError`` exception if it isn't installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise RequestError("missing numpy module: ensure that numpy is set up correctly.")
+    return numpy
+
+
+def _parameters(params):
+    unknown = set(params) - set(DEFAULT_PARAMETERS)
+    assert not unknown, "unknown feature parameters: {}".format(", ".join(sorted(unknown)))
+    parameters = dict(DEFAULT_PARAMETERS, **params)
+    assert parameters["frame_length"] > 0 and parameters["frame_step"] > 0, "``frame_length`` and ``frame_step`` must be positive numbers"
+    assert parameters["fft_size"] >= int(parameters["frame_length"] * parameters["sample_rate"]), "``fft_size`` must be at least the number of samples in a frame"
+    return parameters
+
+
+def _frame_sizes(parameters):
+    return int(round(parameters["frame_length"] * parameters["sample_rate"])), int(round(parameters["frame_step"] * parameters["sample_rate"]))
+
+
+@functools.lru_cache(maxsize=16)
+def analysis_window(name, length):
+    """
+    Returns the analysis window ``name`` (``"hamming"`` or ``"hann"``) of ``length`` samples, as a read-only NumPy array.
+    """
+    np = get_numpy()
+    assert name in ("hamming", "hann"), "``window`` must be \"hamming\" or \"hann\""
+    window = np.hamming(length) if name == "hamming" else np.hanning(length)
+    window.flags.writeable = False
+    return window
+
+
+@functools.lru_cache(maxsize=16)
+def mel_filterbank(sample_rate, fft_size, mel_bands):
+    """
+    Returns a ``(fft_size // 2 + 1, mel_bands)`` matrix of triangular filters spaced evenly on the mel scale up to half of ``sample_rate``, which turns power spectra into mel spectra by matrix multiplication.
+    """
+    np = get_numpy()
+    def hz_to_mel(hz): return 2595 * np.log10(1 + hz / 700.0)
+    def mel_to_hz(mel): return 700 * (10 ** (mel / 2595.0) - 1)
+    bins = np.floor((fft_size + 1) * mel_to_hz(np.linspace(0, hz_to_mel(sample_rate / 2.0), mel_bands + 2)) / sample_rate).astype(int)
+    filterbank = np.zeros((mel_bands, fft_size // 2 + 1))
+    for band in range(mel_bands):
+        left, center, right = bins[band], bins[band + 1], bins[band + 2]
+        filterbank[band, left:center] = (np.arange(left, center) - left) / max(1, center - left)
+        filterbank[band, center:right] = (right - np.arange(center, right)) / max(1, right - center)
+    filterbank = filterbank.T.copy()
+    filterbank.flags.writeable = False
+    return filterbank
+
+
+@functools.lru_cache(maxsize=16)
+def dct_matrix(mel_bands, coefficients):
+    """
+    Returns a ``(mel_bands, coefficients)`` orthonormal DCT-II matrix, which turns log mel spectra into MFCCs by matrix multiplication.
+    """
+    np = get_numpy()
+    k = np.arange(coefficients)[None, :]
+    matrix = np.cos(np.pi * k * (np.arange(mel_bands)[:, None] + 0.5) / mel_bands) * np.sqrt(2.0 / mel_bands)
+    matrix[:, 0] /= np.sqrt(2)
+    matrix.flags.writeable = False
+    return matrix
+
+
+def _compute(kind, source, parameters):
+    # ``source`` is the features of kind ``_SOURCE_KIND[kind]``, or the windowed frames for spectrograms
+    np = get_numpy()
+    if kind == "spectrogram": return np.abs(np.fft.rfft(source, parameters["fft_size"])) ** 2
+    if kind == "energy": return 10 * np.log10(np.maximum(source.sum(axis=1), 1e-10))
+    if kind == "mel": return source @ mel_filterbank(parameters["sample_rate"], parameters["fft_size"], parameters["mel_bands"])
+    if kind == "log_mel": return np.log(np.maximum(source, 1e-10))
+    return source @ dct_matrix(parameters["mel_bands"], parameters["coefficients"])
+
+
+def _windowed_frames(samples, parameters):
+    np = get_numpy()
+    frame_length, frame_step = _frame_sizes(parameters)
+    frames = np.lib.stride_tricks.sliding_window_view(samples, frame_length)[::frame_step]
+    return frames * analysis_window(parameters["window"], frame_length)
+
+
+def _samples(frame_data, previous_sample, pre_emphasis):
+    # 16-bit PCM to floats between -1 and 1, with pre-emphasis continuing from ``previous_sample``
+    np = get_numpy()
+    samples = np.frombuffer(frame_data, dtype="<i2").astype(np.float64) / 32768
+    if pre_emphasis == 0 or len(samples) == 0: return samples
+    return samples - pre_emphasis * np.concatenate(([samples[0] if previous_sample is None else previous_sample], samples[:-1]))
+
+
+def audio_features(audio_data, kind="log_mel", **params):
+    """
+    Returns the acoustic features of kind ``kind`` for ``audio_data`` (an ``AudioData`` instance), as a read-only NumPy array with one row per analysis frame. This is also available as ``audio_data.features(kind, **params)``.
+
+    ``kind`` is one of:
+
+    * ``"spectrogram"``: the power spectrum of each frame.
+    * ``"mel"``: the power in each of ``mel_bands`` mel-spaced bands.
+    * ``"log_mel"``: the natural logarithm of that.
+    * ``"mfcc"``: the first ``coefficients`` mel-frequency cepstral coefficients.
+    * ``"energy"``: the total power of each frame in decibels (a one-dimensional array).
+
+    ``params`` override the analysis settings in ``DEFAULT_PARAMETERS``. Results are remembered for as long as ``audio_data`` exists, including the intermediate kinds they were computed from, so asking for MFCCs and then for log mel spectra of the same audio does the work once. The windows, filterbanks and DCT matrices are shared between all audio.
+
+    Audio shorter than one frame is padded with silence to one frame.
+    """
+    assert isinstance(audio_data, AudioData), "``audio_data`` must be audio data"
+    assert kind in KINDS, "``kind`` must be one of {}".format(", ".join(KINDS))
+    parameters = _parameters(params)
+    key = (kind, tuple(parameters[name] for name in _STAGE_PARAMETERS[kind]))
+    with _cache_lock:
+        cached = _cache.get(audio_data, {}).get(key)
+    if cached is not None: return cached
+
+    if kind == "spectrogram":
+        np = get_numpy()
+        samples = _samples(audio_data.get_raw_data(convert_rate=parameters["sample_rate"], convert_width=2), None, parameters["pre_emphasis"])
+        frame_length = _frame_sizes(parameters)[0]
+        if len(samples) < frame_length: samples = np.pad(samples, (0, frame_length - len(samples)))
+        features = _compute(kind, _windowed_frames(samples, parameters), parameters)
+    else:
+        features = _compute(kind, audio_features(audio_data, _SOURCE_KIND[kind], **params), parameters)
+    features.flags.writeable = False  # shared by every caller
+    with _cache_lock:
+        _cache.setdefault(audio_data, {})[key] = features
+    return features
+
+
+class FeatureStream(object):
+    """
+    Computes acoustic features incrementally from audio arriving in pieces, for example as ``listen`` captures it. The audio has sample rate ``sample_rate`` and sample width ``sample_width``; ``kind`` and ``params`` are as for ``audio_features``.
+
+    The frames produced are the same as ``audio_features`` would produce for all of the audio at once, except that audio shorter than one frame produces no frames rather than a padded one.
+    """
+
+    def __init__(self, sample_rate, sample_width, kind="log_mel", **params):
+        assert kind in KINDS, "``kind`` must be one of {}".format(", ".join(KINDS))
+        self.kind = kind
+        self.parameters = _parameters(params)
+        self.frame_count = 0
+        self._converter = PCMConverter(sample_rate, sample_width, self.parameters["sample_rate"], 2)
+        self._pending = None  # samples not yet covered by a whole frame
+        self._previous_sample = None
+
+    def write(self, frame_data):
+        """
+        Adds ``frame_data`` (laid out like ``AudioData.frame_data``) to the audio, and returns the features of the frames that are now complete.
+        """
+        np = get_numpy()
+        raw = self._converter.convert(frame_data)
+        raw_samples = np.frombuffer(raw, dtype="<i2")
+        samples = _samples(raw, self._previous_sample, self.parameters["pre_emphasis"])
+        if len(raw_samples): self._previous_sample = raw_samples[-1] / 32768.0
+        samples = samples if self._pending is None else np.concatenate((self._pending, samples))
+
+        frame_length, frame_step = _frame_sizes(self.parameters)
+        if len(samples) < frame_length:
+            self._pending = samples
+            return self._empty()
+        frame_count = 1 + (len(samples) - frame_length) // frame_step
+        self._pending = samples[frame_count * frame_step:]
+        self.frame_count += frame_count
+        features = _windowed_frames(samples[:(frame_count - 1) * frame_step + frame_length], self.parameters)
+        kinds = [self.kind]
+        while kinds[-1] in _SOURCE_KIND: kinds.append(_SOURCE_KIND[kinds[-1]])
+        for kind in reversed(kinds): features = _compute(kind, features, self.parameters)
+        return features
+
+    def _empty(self):
+        np = get_numpy()
+        width = {"spectrogram": self.parameters["fft_size"] // 2 + 1, "mfcc": self.parameters["coefficients"], "energy": None}.get(self.kind, self.parameters["mel_bands"])
+        return np.zeros((0,) if width is None else (0, width))
+
+
+def iter_features(audio, kind="log_mel", **params):
+    """
+    Lazily yields the acoustic features of ``audio`` (an ``AudioData`` or ``LiveAudioStream`` instance), as NumPy arrays of consecutive frames. ``kind`` and ``params`` are as for ``audio_features``.
+
+    A ``LiveAudioStream`` is processed as soon as audio arrives, so features of a phrase that ``listen`` is still capturing are available before it ends. ``AudioData`` is processed all at once, using the remembered features if there are any.
+    """
+    if isinstance(audio, LiveAudioStream):
+        audio.wait_started()
+        stream = FeatureStream(audio.sample_rate, audio.sample_width, kind, **params)
+        for frame_data in audio.read_chunks():
+            features = stream.write(frame_data)
+            if len(features): yield features
+    else:
+        yield audio_features(audio, kind, **params)
@@ -0,0 +1,123 @@
+"""Snowboy hotword detection, with detectors that are built once and reused across calls."""
+
+import collections
+import importlib
+import os
+import sys
+import threading
+
+from .streaming import PCMConverter
+
+_snowboy_modules = {}  # Snowboy root directory to its ``snowboydetect`` module
+_idle_detectors = {}  # detector configuration to detectors with that configuration that aren't in use
+_lock = threading.Lock()
+
+
+def _import_snowboy(snowboy_location):
+    with _lock:  # ``sys.path`` is only changed while holding the lock
+        module = _snowboy_modules.get(snowboy_location)
+        if module is None:
+            module = sys.modules.get("snowboydetect")
+            if module is not None:  # Snowboy's extension module can only be loaded once per process, so every location would get this one
+                loaded_location = os.path.dirname(os.path.realpath(getattr(module, "__file__", None) or ""))
+                if loaded_location != os.path.realpath(snowboy_location):
+                    raise ValueError("Snowboy was already loaded from {!r}, and can't be loaded from {!r} as well in the same process".format(loaded_location, snowboy_location))
+            else:
+                sys.path.append(snowboy_location)
+                try:
+                    module = importlib.import_module("snowboydetect")
+                finally:
+                    sys.path.remove(snowboy_location)
+            _snowboy_modules[snowboy_location] = module
+        return module
+
+
+class SnowboyDetector(object):
+    """
+    A ``snowboydetect.SnowboyDetect`` instance for the hotword model files ``hot_word_files``, loaded from the Snowboy root directory ``snowboy_location``. Building one loads the Snowboy resources and models, so use ``acquire_detector`` and ``release_detector`` to reuse them.
+    """
+
+    def __init__(self, snowboy_location, hot_word_files, sensitivity=0.4, audio_gain=1.0):
+        snowboydetect = _import_snowboy(snowboy_location)
+        self.configuration = (snowboy_location, tuple(hot_word_files), sensitivity, audio_gain)
+        self.detector = snowboydetect.SnowboyDetect(
+            resource_filename=os.path.join(snowboy_location, "resources", "common.res").encode(),
+            model_str=",".join(hot_word_files).encode()
+        )
+        self.detector.SetAudioGain(audio_gain)
+        self.detector.SetSensitivity(",".join([str(sensitivity)] * len(hot_word_files)).encode())
+        self.sample_rate = self.detector.SampleRate()
+
+    def detect(self, audio):
+        """
+        Runs detection on ``audio`` (16-bit mono audio at ``sample_rate``), continuing from the audio given to previous calls. Returns the index in ``hot_word_files`` of the hotword that was said, or ``None`` if none was.
+        """
+        result = self.detector.RunDetection(audio)
+        assert result != -1, "Error initializing streams or reading audio data"
+        return result - 1 if result > 0 else None
+
+    def reset(self):
+        self.detector.Reset()
+
+
+def acquire_detector(snowboy_location, hot_word_files, sensitivity=0.4, audio_gain=1.0):
+    """
+    Returns a ``SnowboyDetector`` with the given configuration for the caller's exclusive use, reusing an idle one if there is one. Every call must be matched by a call to ``release_detector``.
+    """
+    configuration = (snowboy_location, tuple(hot_word_files), sensitivity, audio_gain)
+    with _lock:
+        idle = _idle_detectors.get(configuration)
+        if idle: return idle.pop()
+    return SnowboyDetector(snowboy_location, hot_word_files, sensitivity, audio_gain)
+
+
+def release_detector(detector):
+    """
+    Resets ``detector`` and makes it available to ``acquire_detector`` again.
+    """
+    detector.reset()
+    with _lock:
+        _idle_detectors.setdefault(detector.configuration, []).append(detector)
+
+
+class HotwordScanner(object):
+    """
+    Feeds audio from a source with sample rate ``sample_rate`` and sample width ``sample_width`` to ``detector``, resampling it as needed, and keeps the last ``history_duration`` seconds of the original audio.
+
+    Detection runs whenever at least ``check_interval`` seconds of audio have arrived since it last ran, measured in audio time rather than wall-clock time, so it behaves the same for live and recorded sources.
+    """
+
+    def __init__(self, detector, sample_rate, sample_width, history_duration=5, check_interval=0.05):
+        self.detector = detector
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.history_size = int(history_duration * sample_rate) * sample_width
+        self.check_size = max(1, int(check_interval * detector.sample_rate)) * 2  # resampled audio is 16-bit
+        self._history = collections.deque()
+        self._history_bytes = 0
+        self._resampled = bytearray()
+        self._converter = PCMConverter(sample_rate, sample_width, detector.sample_rate, 2)  # Snowboy takes signed 16-bit audio
+
+    def feed(self, buffer):
+        """
+        Adds ``buffer`` to the audio being scanned. Returns the index of the hotword that was said, or ``None`` if none was yet.
+        """
+        self._history.append(buffer)
+        self._history_bytes += len(buffer)
+        while self._history_bytes - len(self._history[0]) >= self.history_size:
+            self._history_bytes -= len(self._history.popleft())
+
+        self._resampled += self._converter.convert(buffer)
+        if len(self._resampled) < self.check_size: return None
+        audio, self._resampled = bytes(self._resampled), bytearray()
+        return self.detector.detect(audio)
+
+    def history(self):
+        """
+        Returns the last ``history_duration`` seconds of original audio (somewhat more, since whole buffers are kept), up to and including the latest buffer.
+        """
+        return b"".join(self._history)
+
+    def clear_history(self):
+        self._history.clear()
+        self._history_bytes = 0
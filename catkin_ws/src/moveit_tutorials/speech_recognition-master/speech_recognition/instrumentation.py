@@ -0,0 +1,179 @@
+"""Timing spans and metrics reported by the recognition pipeline, for finding out where the time of a voice command goes."""
+
+import itertools
+import json
+import threading
+import time
+
+
+class Span(object):
+    """
+    A timed stage of the pipeline, such as ``"listen.endpointing"``, ``"convert"`` or ``"request"``. ``start`` and ``end`` are ``time.monotonic()`` timestamps; ``attributes`` holds extra details, such as the engine name or the number of bytes sent.
+
+    Used as a context manager, which times the code inside it. Spans started inside another span on the same thread record it as their parent.
+    """
+    __slots__ = ("instrumentation", "name", "attributes", "start", "end", "span_id", "parent_id", "thread_id")
+
+    def __init__(self, instrumentation, name, attributes, parent_id=None):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.attributes = attributes
+        self.start = self.end = None
+        self.span_id = next(instrumentation._ids)
+        self.parent_id = parent_id
+        self.thread_id = threading.get_ident()
+
+    @property
+    def duration(self):
+        return None if self.start is None or self.end is None else self.end - self.start
+
+    def set(self, **attributes):
+        """
+        Adds ``attributes`` to the span.
+        """
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        stack = self.instrumentation._stack()
+        if self.parent_id is None and stack: self.parent_id = stack[-1].span_id
+        stack.append(self)
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end = time.monotonic()
+        stack = self.instrumentation._stack()
+        if stack and stack[-1] is self: stack.pop()
+        if exc_type is not None: self.attributes["error"] = exc_type.__name__
+        self.instrumentation.on_span(self)
+
+
+class _NullSpan(object):
+    __slots__ = ()
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Instrumentation(object):
+    """
+    Receives the spans and metrics reported by a ``Recognizer``. Enable it by setting ``recognizer_instance.instrumentation`` to an instance of a subclass that overrides ``on_span`` and/or ``on_metric``, such as ``JSONLinesExporter``.
+
+    The recognizer reports these spans:
+
+    * ``"listen"``, with the children ``"listen.wait_for_speech"`` (waiting for the energy to rise above the threshold), ``"listen.phrase"`` (from the start of speech to the last buffer above the threshold; ``kept`` is false for phrases that were too short) and ``"listen.endpointing"`` (the trailing silence until ``pause_threshold`` was reached).
+    * ``"record"``.
+    * ``"recognize"`` for every ``recognize_*`` call, with the ``engine`` name and whether the ``cache`` was hit. Inside it: ``"queue"`` (waiting for the rate limiter), ``"attempt"`` (each attempt, when running with a deadline or hedging), ``"convert"`` (audio conversion, with the output ``format``), ``"request"`` (network requests) and ``"inference"`` (local models).
+    """
+    enabled = True
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+
+    def span(self, name, parent=None, **attributes):
+        """
+        Returns a new span named ``name``, to be used as a context manager. ``parent`` is the ID of the parent span, for spans started on a different thread than their parent.
+        """
+        return Span(self, name, attributes, parent)
+
+    def record_span(self, name, start, end, **attributes):
+        """
+        Reports a span that was timed manually, from ``start`` to ``end`` (``time.monotonic()`` timestamps), as a child of the current span.
+        """
+        span = Span(self, name, attributes, self.current_span_id())
+        span.start, span.end = start, end
+        self.on_span(span)
+
+    def metric(self, name, value, **attributes):
+        """
+        Reports the measurement ``value`` of ``name`` (for example, ``"upload_bytes"``).
+        """
+        self.on_metric(name, value, attributes, time.monotonic())
+
+    def current_span_id(self):
+        stack = self._stack()
+        return stack[-1].span_id if stack else None
+
+    def on_span(self, span):
+        """
+        Called with every finished ``Span``. Can be called from any thread.
+        """
+
+    def on_metric(self, name, value, attributes, timestamp):
+        """
+        Called with every reported metric, along with its ``time.monotonic()`` timestamp. Can be called from any thread.
+        """
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None: stack = self._local.stack = []
+        return stack
+
+
+class NullInstrumentation(Instrumentation):
+    """
+    Instrumentation that discards everything, used by default. Reporting to it costs next to nothing.
+    """
+    enabled = False
+
+    def span(self, name, parent=None, **attributes):
+        return _NULL_SPAN
+
+    def record_span(self, name, start, end, **attributes):
+        pass
+
+    def metric(self, name, value, **attributes):
+        pass
+
+    def current_span_id(self):
+        return None
+
+
+class JSONLinesExporter(Instrumentation):
+    """
+    Instrumentation that appends every span and metric to the file at ``path`` as one JSON object per line, for offline analysis.
+
+    The first line written is a ``{"type": "clock", ...}`` record with the ``time.monotonic()`` and ``time.time()`` values at that moment, for converting the monotonic timestamps of the following records to wall-clock time.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._file = open(path, "a", buffering=1)  # line buffered, so records are on disk even if the process dies
+        self._lock = threading.Lock()
+        self._write({"type": "clock", "monotonic": time.monotonic(), "time": time.time()})
+
+    def on_span(self, span):
+        self._write({
+            "type": "span", "name": span.name, "id": span.span_id, "parent": span.parent_id, "thread": span.thread_id,
+            "start": span.start, "end": span.end, "duration": span.duration, "attributes": span.attributes,
+        })
+
+    def on_metric(self, name, value, attributes, timestamp):
+        self._write({"type": "metric", "name": name, "value": value, "timestamp": timestamp, "attributes": attributes})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write(self, record):
+        line = json.dumps(record, default=repr) + "\n"
+        with self._lock:
+            if not self._file.closed: self._file.write(line)
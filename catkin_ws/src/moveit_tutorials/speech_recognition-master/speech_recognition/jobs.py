@@ -0,0 +1,239 @@
+"""Tracks many asynchronous transcription jobs (Amazon Transcribe, AssemblyAI) from a single scheduler thread."""
+
+import collections
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .exceptions import TranscriptionFailed, TranscriptionNotReady
+
+
+class AmazonTranscribeBackend(object):
+    """
+    Job backend that runs jobs through ``speech_recognition.recognizers.amazon.TranscribePipeline`` instances. The arguments are the same as for ``recognizer_instance.recognize_amazon``.
+
+    Job IDs are dictionaries holding the job name (``job_id``) and the ``bucket_name`` and ``file_key`` of its audio, so that a tracker resuming jobs from a state file cleans up the bucket the audio was uploaded to, even if that bucket's name was generated by another process.
+    """
+
+    def __init__(self, recognizer, bucket_name=None, access_key_id=None, secret_access_key=None, region=None):
+        from .recognizers.amazon import TranscribePipeline
+        self.pipeline = TranscribePipeline(recognizer, bucket_name, access_key_id, secret_access_key, region)
+        self._pipeline_arguments = (recognizer, access_key_id, secret_access_key, region)
+        self._pipelines = {self.pipeline.bucket_name: self.pipeline}  # bucket name to pipeline, including those of resumed jobs
+        self._lock = threading.Lock()
+
+    def submit(self, audio_data):
+        job = self.pipeline.submit(audio_data)
+        return {"job_id": job.job_name, "bucket_name": self.pipeline.bucket_name, "file_key": job.file_key}
+
+    def poll(self, job_id):
+        from .recognizers.amazon import TranscribeJob
+        try:
+            return self._bucket_pipeline(job_id["bucket_name"]).poll(TranscribeJob(job_id["job_id"], job_id["file_key"]))
+        except TranscriptionNotReady:  # the job no longer exists, so it will never finish
+            raise TranscriptionFailed("transcription job {} no longer exists".format(job_id["job_id"]))
+
+    def close(self):
+        with self._lock:
+            pipelines = list(self._pipelines.values())
+        for pipeline in pipelines: pipeline.close()
+
+    def _bucket_pipeline(self, bucket_name):
+        from .recognizers.amazon import TranscribePipeline
+        with self._lock:
+            pipeline = self._pipelines.get(bucket_name)
+            if pipeline is None:
+                recognizer, access_key_id, secret_access_key, region = self._pipeline_arguments
+                pipeline = self._pipelines[bucket_name] = TranscribePipeline(recognizer, bucket_name, access_key_id, secret_access_key, region)
+            return pipeline
+
+
+class AssemblyAIBackend(object):
+    """
+    Job backend for the AssemblyAI API, using the API token ``api_token``.
+    """
+
+    def __init__(self, api_token):
+        self.api_token = api_token
+
+    def submit(self, audio_data):
+        from .recognizers import assemblyai
+        return assemblyai.start_transcription(self.api_token, assemblyai.upload(self.api_token, assemblyai.audio_chunks(audio_data)))
+
+    def poll(self, job_id):
+        from .recognizers import assemblyai
+        return assemblyai.get_transcription(self.api_token, job_id)
+
+    def close(self):
+        pass
+
+
+class _TrackedJob(object):
+    def __init__(self, key, future, audio_data=None, job_id=None):
+        self.key = key
+        self.future = future
+        self.audio_data = audio_data
+        self.job_id = job_id
+        self.delay = None
+
+
+class JobTracker(object):
+    """
+    Submits audio to an asynchronous transcription ``backend`` and polls every outstanding job from one scheduler thread, resolving a ``concurrent.futures.Future`` for each clip as its transcript arrives.
+
+    ``backend`` is an object with a ``submit(audio_data)`` method that starts a job and returns its ID (any value that can be saved as JSON), and a ``poll(job_id)`` method that returns ``None`` while the job is running, returns the result once it's done, and raises an exception if it failed. ``AmazonTranscribeBackend`` and ``AssemblyAIBackend`` are provided.
+
+    At most ``max_concurrency`` jobs are outstanding at the provider at once; further clips wait in a queue until a slot frees up. Each job is first polled ``initial_delay`` seconds after it starts, and the wait between polls grows by ``backoff_factor`` up to ``max_delay`` seconds.
+
+    If ``state_file`` is given, the IDs of outstanding jobs are saved there as JSON whenever they change. A new tracker created with the same ``state_file`` (for example, after the process restarts) picks these jobs up again through ``resume``.
+    """
+
+    def __init__(self, backend, state_file=None, max_concurrency=4, initial_delay=1.0, max_delay=30.0, backoff_factor=2.0):
+        assert isinstance(max_concurrency, int) and max_concurrency > 0, "``max_concurrency`` must be a positive integer"
+        assert 0 < initial_delay <= max_delay, "``initial_delay`` must be positive and at most ``max_delay``"
+        assert backoff_factor >= 1, "``backoff_factor`` must be at least 1"
+        self.backend = backend
+        self.state_file = state_file
+        self.max_concurrency = max_concurrency
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+
+        self._condition = threading.Condition()
+        self._pending = collections.deque()  # jobs waiting for a free slot
+        self._polls = []  # heap of ``(due_time, sequence_number, job)`` entries
+        self._sequence = itertools.count()
+        self._active = 0  # jobs being submitted or waiting on the provider
+        self._outstanding = {}  # key to job ID, for every submitted job that hasn't resolved yet
+        self._saved = {}  # jobs from ``state_file`` that haven't been resumed, kept so that saving doesn't drop them
+        if state_file is not None and os.path.exists(state_file):
+            with open(state_file, "r") as f:
+                self._saved = json.load(f)
+        self._stopped = False
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="job-tracker")
+        self._scheduler = threading.Thread(target=self._run, name="job-tracker-scheduler")
+        self._scheduler.daemon = True
+        self._scheduler.start()
+
+    def submit(self, audio_data, key=None):
+        """
+        Queues ``audio_data`` for transcription and returns a ``Future`` for its result. ``key`` identifies the clip in the state file (for example, its file name); a random one is used if not given.
+        """
+        job = _TrackedJob(key if key is not None else uuid.uuid4().hex, Future(), audio_data=audio_data)
+        with self._condition:
+            assert not self._stopped, "job tracker has been closed"
+            self._pending.append(job)
+            self._condition.notify()
+        return job.future
+
+    def resume(self):
+        """
+        Starts polling the jobs recorded in ``state_file`` by a previous tracker. Returns a dictionary mapping each job's key to a ``Future`` for its result.
+        """
+        futures = {}
+        with self._condition:
+            saved_jobs, self._saved = self._saved, {}
+            for key, job_id in saved_jobs.items():
+                if key in self._outstanding: continue
+                job = _TrackedJob(key, Future(), job_id=job_id)
+                job.future.set_running_or_notify_cancel()
+                self._active += 1
+                self._outstanding[key] = job_id
+                self._schedule_poll(job, 0)
+                futures[key] = job.future
+            self._condition.notify()
+        return futures
+
+    def outstanding(self):
+        """
+        Returns a dictionary mapping the key of every submitted, unresolved job to its job ID.
+        """
+        with self._condition:
+            return dict(self._outstanding)
+
+    def close(self, wait=True):
+        """
+        Stops the scheduler and closes the backend. Outstanding jobs stay recorded in ``state_file``, so they can be resumed later.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if wait: self._scheduler.join()
+        self._executor.shutdown(wait=wait)
+        if hasattr(self.backend, "close"): self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self):
+        with self._condition:
+            while not self._stopped:
+                while self._pending and self._active < self.max_concurrency:
+                    job = self._pending.popleft()
+                    if not job.future.set_running_or_notify_cancel(): continue  # cancelled before it was submitted
+                    self._active += 1
+                    self._executor.submit(self._start, job)
+
+                now = time.monotonic()
+                while self._polls and self._polls[0][0] <= now:
+                    _, _, job = heapq.heappop(self._polls)
+                    self._executor.submit(self._poll, job)
+
+                timeout = self._polls[0][0] - now if self._polls else None
+                self._condition.wait(timeout)
+
+    def _start(self, job):
+        try:
+            job_id = self.backend.submit(job.audio_data)
+        except BaseException as exc:
+            self._resolve(job, exception=exc)
+            return
+        with self._condition:
+            job.job_id, job.audio_data = job_id, None
+            self._outstanding[job.key] = job_id
+            self._save_state()
+            self._schedule_poll(job, self.initial_delay)
+            self._condition.notify()
+
+    def _poll(self, job):
+        try:
+            result = self.backend.poll(job.job_id)
+        except BaseException as exc:
+            self._resolve(job, exception=exc)
+            return
+        if result is not None:
+            self._resolve(job, result=result)
+            return
+        with self._condition:
+            self._schedule_poll(job, min(job.delay * self.backoff_factor, self.max_delay))
+            self._condition.notify()
+
+    def _schedule_poll(self, job, delay):
+        job.delay = max(delay, self.initial_delay)
+        heapq.heappush(self._polls, (time.monotonic() + delay, next(self._sequence), job))
+
+    def _resolve(self, job, result=None, exception=None):
+        with self._condition:
+            self._active -= 1
+            if self._outstanding.pop(job.key, None) is not None:
+                self._save_state()
+            self._condition.notify()
+        if exception is not None:
+            job.future.set_exception(exception)
+        else:
+            job.future.set_result(result)
+
+    def _save_state(self):
+        if self.state_file is None: return
+        temporary_file = self.state_file + ".tmp"
+        with open(temporary_file, "w") as f:
+            json.dump(dict(self._saved, **self._outstanding), f)
+        os.replace(temporary_file, self.state_file)  # atomic, so a crash never leaves a half-written state file
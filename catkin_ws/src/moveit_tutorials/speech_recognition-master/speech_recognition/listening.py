@@ -0,0 +1,156 @@
+"""Listening state kept separately for each audio source, and listening to several sources at the same time from one thread."""
+
+import audioop
+import collections
+import contextlib
+import math
+import threading
+import time
+
+from .audio import AudioData
+
+
+class SourceState(object):
+    """
+    The listening state that ``listen`` adapts to one audio source as it runs, kept apart from the ``Recognizer`` so that one recognizer can listen to several sources at the same time without them disturbing each other's thresholds. Obtain it with ``recognizer_instance.source_state(source)``.
+    """
+
+    def __init__(self, energy_threshold):
+        self.energy_threshold = energy_threshold  # adjusted for this source's ambient noise when ``dynamic_energy_threshold`` is enabled
+
+
+class PhraseSegmenter(object):
+    """
+    Splits audio from ``source`` (an ``AudioSource`` instance), fed to it a frame of ``frame_size`` frames at a time, into phrases, following the same rules and ``recognizer`` settings as ``recognizer_instance.listen``. Unlike ``listen``, it never reads from the source itself, so one thread can drive many of them.
+
+    The threshold for ``source`` is kept in ``recognizer.source_state(source)``.
+    """
+
+    def __init__(self, recognizer, source, frame_size, phrase_time_limit=None):
+        self.recognizer = recognizer
+        self.source = source
+        self.state = recognizer.source_state(source)
+        self.phrase_time_limit = phrase_time_limit
+        self.seconds_per_buffer = float(frame_size) / source.SAMPLE_RATE
+        self.pause_buffer_count = int(math.ceil(recognizer.pause_threshold / self.seconds_per_buffer))
+        self.phrase_buffer_count = int(math.ceil(recognizer.phrase_threshold / self.seconds_per_buffer))
+        self.non_speaking_buffer_count = int(math.ceil(recognizer.non_speaking_duration / self.seconds_per_buffer))
+        self.elapsed_time = 0
+        self._reset()
+
+    def _reset(self):
+        self.frames = collections.deque()
+        self.in_phrase = False
+        self.phrase_start_time = None
+        self.pause_count = self.phrase_count = 0
+
+    def feed(self, buffer):
+        """
+        Processes the next frame of audio. Returns an ``AudioData`` instance if it completed a phrase, or ``None`` otherwise.
+        """
+        self.elapsed_time += self.seconds_per_buffer
+        if self.in_phrase and self.phrase_time_limit and self.elapsed_time - self.phrase_start_time > self.phrase_time_limit:
+            audio_data = self._end_phrase()  # ``listen`` would read this frame in its next call, so it starts the next phrase
+            self.elapsed_time -= self.seconds_per_buffer
+            self.feed(buffer)
+            return audio_data
+
+        energy = audioop.rms(buffer, self.source.SAMPLE_WIDTH)
+        self.frames.append(buffer)
+        if not self.in_phrase:
+            if len(self.frames) > self.non_speaking_buffer_count: self.frames.popleft()
+            if energy > self.state.energy_threshold:
+                self.in_phrase = True
+                self.phrase_start_time = self.elapsed_time
+            elif self.recognizer.dynamic_energy_threshold:
+                self.recognizer._adjust_energy_threshold(self.source, self.state, energy, self.seconds_per_buffer)
+            return None
+
+        self.phrase_count += 1
+        self.pause_count = 0 if energy > self.state.energy_threshold else self.pause_count + 1
+        if self.pause_count > self.pause_buffer_count: return self._end_phrase()
+        return None
+
+    def finish(self):
+        """
+        Ends the audio. Returns the phrase in progress as an ``AudioData`` instance if there is one, or ``None`` otherwise.
+        """
+        return self._end_phrase(end_of_stream=True) if self.in_phrase else None
+
+    def _end_phrase(self, end_of_stream=False):
+        kept = self.phrase_count - self.pause_count >= self.phrase_buffer_count or end_of_stream
+        for i in range(self.pause_count - self.non_speaking_buffer_count): self.frames.pop()  # remove extra non-speaking frames at the end
+        frame_data = b"".join(self.frames)
+        self._reset()
+        return AudioData(frame_data, self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH) if kept else None
+
+
+class MultiSourceListener(object):
+    """
+    Listens to several audio sources at once from a single scheduler thread, calling ``callback(recognizer, audio_data, source)`` with each phrase and the source it was heard on. Use ``recognizer_instance.listen_to_sources_in_background`` to start one.
+
+    The thread only reads audio that a source already has available (as reported by its stream's ``available()``, which microphone streams provide), so a quiet or stalled source never holds up the others. Sources whose streams can't report this, such as ``AudioFile``, are read a frame at a time. Each source gets its own ``SourceState``, so their thresholds adapt independently.
+    """
+
+    def __init__(self, recognizer, sources, callback, phrase_time_limit=None, poll_interval=0.005):
+        self.recognizer = recognizer
+        self.sources = list(sources)
+        self.callback = callback
+        self.phrase_time_limit = phrase_time_limit
+        self.poll_interval = poll_interval  # seconds to sleep when no source had any audio
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="multi-source-listener")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, wait_for_stop=True):
+        """
+        Requests that the scheduler thread stop, and waits for it to do so if ``wait_for_stop`` is true. Phrases still in progress are discarded.
+        """
+        self._running = False
+        if wait_for_stop and self._thread is not None: self._thread.join()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        with contextlib.ExitStack() as stack:
+            channels = []  # ``(source, segmenter, frame bytes, audio read but not yet fed)`` for each source that hasn't ended
+            for source in self.sources:
+                source = stack.enter_context(source)
+                frame_size = self.recognizer.chunking.frame_size(source.SAMPLE_RATE) if self.recognizer.chunking is not None else source.CHUNK
+                channels.append([source, PhraseSegmenter(self.recognizer, source, frame_size, self.phrase_time_limit), frame_size * source.SAMPLE_WIDTH, b""])
+
+            while self._running and channels:
+                idle = True
+                for channel in list(channels):
+                    source, segmenter, frame_bytes, pending = channel
+                    buffer = self._read_available(source, frame_bytes // source.SAMPLE_WIDTH)
+                    if buffer is None: continue  # nothing to read yet
+                    idle = False
+                    if len(buffer) == 0:  # reached end of the stream
+                        channels.remove(channel)
+                        self._emit(segmenter.finish(), source)
+                        continue
+                    pending += buffer
+                    while len(pending) >= frame_bytes and self._running:
+                        frame, pending = pending[:frame_bytes], pending[frame_bytes:]
+                        self._emit(segmenter.feed(frame), source)
+                    channel[3] = pending
+                if idle: time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _read_available(source, frame_size):
+        # returns whatever can be read without blocking (in whole frames), ``None`` if that's nothing, or an empty buffer if the stream ended
+        available = getattr(source.stream, "available", None)
+        if available is None: return source.stream.read(frame_size)
+        size = available() // frame_size * frame_size
+        return source.stream.read(size) if size > 0 else None
+
+    def _emit(self, audio_data, source):
+        if audio_data is not None and self._running: self.callback(self.recognizer, audio_data, source)
@@ -0,0 +1,115 @@
+"""Transcribing long recordings by splitting them at silences and recognizing the pieces concurrently."""
+
+import audioop
+import collections
+import threading
+
+from .audio import AudioData
+from .exceptions import UnknownValueError
+
+TranscribedSegment = collections.namedtuple("TranscribedSegment", ["start", "end", "text", "error"])  # seconds from the start of the recording, and the transcript or (with ``text`` set to ``None``) the exception raised instead
+TranscribedSegment.__new__.__defaults__ = (None,)
+
+
+class LongAudioTranscript(object):
+    """
+    The result of ``transcribe_long_audio``: the ``TranscribedSegment`` instances for each part of the recording, in order, and their ``text`` joined together.
+    """
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.text = _stitch([segment.text for segment in segments if segment.text])
+
+    @property
+    def errors(self):
+        """The segments that couldn't be transcribed."""
+        return [segment for segment in self.segments if segment.error is not None]
+
+
+def _stitch(texts):
+    # joins consecutive transcripts, leaving out words repeated at the start of a segment because of the overlap with the previous one
+    words = []
+    for text in texts:
+        new_words = text.split()
+        for count in range(min(3, len(words), len(new_words)), 0, -1):
+            if [word.lower() for word in words[-count:]] == [word.lower() for word in new_words[:count]]:
+                new_words = new_words[count:]
+                break
+        words.extend(new_words)
+    return " ".join(words)
+
+
+def split_at_silences(source, energy_threshold=300, max_segment=30, min_segment=5, min_silence=0.3, overlap=0.2, frame_duration=0.03):
+    """
+    Lazily yields the parts of the audio from ``source`` (an ``AudioSource`` instance, which must be entered), as ``(start time in seconds, AudioData instance)`` pairs, reading only as much audio as the part being built needs.
+
+    Once a part is at least ``min_segment`` seconds long, it ends in the middle of the next stretch of at least ``min_silence`` seconds of audio with energy no more than ``energy_threshold``. Parts are cut at ``max_segment`` seconds regardless, which can split a word, so every part after the first also starts with the last ``overlap`` seconds of the one before it. Parts without any audio above the threshold are left out.
+    """
+    assert max_segment > min_segment > 0, "``max_segment`` must be larger than ``min_segment``, which must be positive"
+    assert 0 <= overlap < min_segment, "``overlap`` must be shorter than ``min_segment``"
+    frame_size = max(1, int(frame_duration * source.SAMPLE_RATE))
+    seconds_per_frame = float(frame_size) / source.SAMPLE_RATE
+    overlap_frames = int(round(overlap / seconds_per_frame))
+    min_frames, max_frames = int(min_segment / seconds_per_frame), int(max_segment / seconds_per_frame)
+    min_silence_frames = max(1, int(min_silence / seconds_per_frame))
+
+    frames, loud = [], []  # the audio of the current part, and whether each frame of it is above the threshold
+    start_index = 0  # index of the first frame of ``frames`` in the recording
+    previous_tail = []  # the last frames of the previous part, for the overlap
+    silence_run = 0
+    while True:
+        buffer = source.stream.read(frame_size)
+        ended = len(buffer) == 0
+        if not ended:
+            frames.append(buffer)
+            loud.append(audioop.rms(buffer, source.SAMPLE_WIDTH) > energy_threshold)
+            silence_run = 0 if loud[-1] else silence_run + 1
+            if len(frames) >= min_frames and silence_run >= min_silence_frames:
+                cut = len(frames) - silence_run // 2  # in the middle of the silence
+            elif len(frames) >= max_frames:
+                cut = len(frames)
+            else:
+                continue
+        else:
+            cut = len(frames)
+
+        if any(loud[:cut]):
+            start_time = (start_index - len(previous_tail)) * seconds_per_frame
+            yield start_time, AudioData(b"".join(previous_tail + frames[:cut]), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        previous_tail = frames[max(0, cut - overlap_frames):cut] if overlap_frames else []
+        frames, loud = frames[cut:], loud[cut:]
+        start_index += cut
+        silence_run = min(silence_run, len(frames))
+        if ended: return
+
+
+def transcribe_long_audio(recognizer, source, recognize, max_workers=4, **split_options):
+    """
+    Transcribes a recording of any length from ``source`` (an ``AudioSource`` instance, which must be entered), such as an ``AudioFile``, by splitting it at silences with ``split_at_silences`` (``split_options`` are passed on to it; ``energy_threshold`` defaults to ``recognizer.energy_threshold``) and recognizing up to ``max_workers`` parts at the same time. This stays within the length limits of the engines, takes about as long as the longest few parts rather than the whole recording, and only holds a few parts in memory at a time rather than the whole recording.
+
+    ``recognize`` is called as ``recognize(recognizer, audio_data)`` for each part, and should return its transcript, for example ``lambda r, audio: r.recognize_google(audio)``. Parts in which it raises ``speech_recognition.UnknownValueError`` get an empty transcript; other exceptions are kept in the part's ``error``, and the other parts are still transcribed.
+
+    Returns a ``LongAudioTranscript``.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    split_options.setdefault("energy_threshold", recognizer.energy_threshold)
+    slots = threading.BoundedSemaphore(2 * max_workers)  # parts read but not transcribed yet, so that reading doesn't run far ahead
+
+    def transcribe(start_time, audio_data):
+        end_time = start_time + len(audio_data.frame_data) / float(audio_data.sample_rate * audio_data.sample_width)
+        try:
+            return TranscribedSegment(start_time, end_time, recognize(recognizer, audio_data))
+        except UnknownValueError:
+            return TranscribedSegment(start_time, end_time, "")
+        except Exception as exc:
+            return TranscribedSegment(start_time, end_time, None, exc)
+        finally:
+            slots.release()
+
+    futures = []
+    with recognizer.instrumentation.span("transcribe_long_audio") as span, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="long-audio") as executor:
+        for start_time, audio_data in split_at_silences(source, **split_options):
+            slots.acquire()
+            futures.append(executor.submit(transcribe, start_time, audio_data))
+        span.set(segments=len(futures))
+    return LongAudioTranscript([future.result() for future in futures])
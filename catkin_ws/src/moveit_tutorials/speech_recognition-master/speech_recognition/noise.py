@@ -0,0 +1,113 @@
+"""Ambient noise profiles: the energy threshold and noise statistics of each microphone, kept up to date while listening and saved across runs."""
+
+import json
+import math
+import os
+import threading
+import time
+from urllib.parse import quote
+
+
+def device_key(source):
+    """
+    Returns the name that ``source``'s noise profile is saved under, or ``None`` if it doesn't come from a device whose noise carries over between runs (such as an ``AudioFile``).
+
+    The key includes the sample rate, since energies measured at different rates aren't comparable.
+    """
+    name = getattr(source, "device_name", None)
+    if name is None: return None
+    return "{}@{}".format(name, source.SAMPLE_RATE)
+
+
+class NoiseProfile(object):
+    """
+    The energy threshold for one audio device, and statistics of the ambient noise it was derived from.
+
+    ``noise_energy`` is a moving average of the energy of audio without speech, and ``noise_deviation`` of how far it strays from that average, both over roughly the last ``averaging_time`` seconds of such audio. ``calibration_time`` is the total number of seconds of audio that went into them.
+    """
+
+    def __init__(self, energy_threshold=300, noise_energy=None, noise_deviation=0.0, calibration_time=0.0, updated=None, averaging_time=5):
+        self.energy_threshold = energy_threshold
+        self.noise_energy = noise_energy
+        self.noise_deviation = noise_deviation
+        self.calibration_time = calibration_time
+        self.updated = updated  # Unix time of the last update
+        self.averaging_time = averaging_time
+
+    def update(self, energy, seconds, energy_threshold):
+        """
+        Adds ``seconds`` of audio without speech, with energy ``energy``, to the statistics, and records ``energy_threshold`` as the threshold in use.
+        """
+        if self.noise_energy is None:
+            self.noise_energy = float(energy)
+        else:
+            weight = 1 - math.exp(-float(seconds) / self.averaging_time)
+            self.noise_deviation += (abs(energy - self.noise_energy) - self.noise_deviation) * weight
+            self.noise_energy += (energy - self.noise_energy) * weight
+        self.energy_threshold = energy_threshold
+        self.calibration_time += seconds
+        self.updated = time.time()
+
+    def to_dict(self):
+        return {
+            "energy_threshold": self.energy_threshold, "noise_energy": self.noise_energy, "noise_deviation": self.noise_deviation,
+            "calibration_time": self.calibration_time, "updated": self.updated,
+        }
+
+    @staticmethod
+    def from_dict(values):
+        return NoiseProfile(
+            float(values["energy_threshold"]), values.get("noise_energy"), float(values.get("noise_deviation", 0.0)),
+            float(values.get("calibration_time", 0.0)), values.get("updated"),
+        )
+
+
+class NoiseProfileStore(object):
+    """
+    Saves noise profiles in ``directory``, one JSON file per device, so that a program can start listening with the threshold it ended with last time rather than calibrating first. Enable it by setting ``recognizer_instance.noise_profiles`` to an instance of this class.
+
+    While listening, profiles are saved at most once every ``save_interval`` seconds.
+    """
+
+    def __init__(self, directory, save_interval=30):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.save_interval = save_interval
+        self._last_saved = {}  # device key to the ``time.monotonic()`` it was last saved at
+        self._lock = threading.Lock()
+
+    def load(self, key):
+        """
+        Returns the saved ``NoiseProfile`` for the device ``key``, or ``None`` if there is none (or it can't be read).
+        """
+        try:
+            with open(self._path(key), "r") as f:
+                return NoiseProfile.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, key, profile):
+        """
+        Saves ``profile`` as the profile of the device ``key``.
+        """
+        serialized = json.dumps(profile.to_dict())
+        with self._lock:
+            self._last_saved[key] = time.monotonic()
+        temporary_path = "{}.{}.tmp".format(self._path(key), threading.get_ident())
+        with open(temporary_path, "w") as f:
+            f.write(serialized)
+        os.replace(temporary_path, self._path(key))
+
+    def autosave(self, key, profile):
+        """
+        Saves ``profile`` as the profile of the device ``key`` if it wasn't saved within the last ``save_interval`` seconds. Returns whether it was saved.
+        """
+        with self._lock:
+            last_saved = self._last_saved.get(key)
+            if last_saved is not None and time.monotonic() - last_saved < self.save_interval: return False
+            self._last_saved[key] = time.monotonic()  # claimed, so that concurrent listeners don't all save
+        self.save(key, profile)
+        return True
+
+    def _path(self, key):
+        return os.path.join(self.directory, quote(key, safe="") + ".json")
@@ -0,0 +1,183 @@
+"""Token-bucket rate limiting for the ``recognize_*`` methods, with a priority queue for requests over the limit."""
+
+import contextlib
+import heapq
+import itertools
+import threading
+import time
+
+_state = threading.local()
+
+
+@contextlib.contextmanager
+def priority(level):
+    """
+    Context manager that sets the priority of every ``recognize_*`` call made inside it on the current thread, when a ``RateLimiter`` is in use. Calls with lower ``level`` values are let through first; the default level is 0.
+    """
+    previous = getattr(_state, "priority", 0)
+    _state.priority = level
+    try:
+        yield
+    finally:
+        _state.priority = previous
+
+
+def current_priority():
+    return getattr(_state, "priority", 0)
+
+
+class TokenBucket(object):
+    """
+    Allows ``rate`` operations per second on average, with bursts of up to ``burst`` operations. Not thread-safe on its own.
+    """
+
+    def __init__(self, rate, burst=None):
+        assert rate > 0, "``rate`` must be a positive number"
+        assert burst is None or burst >= 1, "``burst`` must be ``None`` or at least 1"
+        self.rate = rate
+        self.burst = max(1.0, rate) if burst is None else burst
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now):
+        self.refill(now)
+        if self.tokens < 1: return False
+        self.tokens -= 1
+        return True
+
+    def time_until_token(self, now):
+        self.refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class _QueueStats(object):
+    def __init__(self):
+        self.acquired = 0  # requests let through
+        self.queued = 0  # requests that had to wait for a token
+        self.timed_out = 0  # requests that gave up waiting
+        self.total_wait = 0.0  # seconds spent waiting, summed over all requests
+        self.max_wait = 0.0
+        self.waiting = 0  # requests currently waiting
+
+
+class RateLimiter(object):
+    """
+    Limits how often each engine is called, with a separate token bucket for each engine and credential (API key, token or client ID), so that bursts of requests are spread out instead of exceeding the provider's quota. Enable it by setting ``recognizer_instance.rate_limiter`` to an instance of this class; several recognizers can share one instance to share a quota.
+
+    ``limits`` maps an engine name (such as ``"google"`` or ``"azure"``) to either a number of requests per second, or a ``(requests_per_second, burst)`` pair. Engines without a limit are never delayed.
+
+    Requests over the limit wait in a queue rather than failing. Waiting requests are let through in order of priority (see ``speech_recognition.priority``), then in order of arrival. Waiting counts towards the deadline of the call, if it has one (see ``speech_recognition.deadline``).
+    """
+
+    def __init__(self, limits=None):
+        self._limits = {}
+        self._buckets = {}
+        self._waiters = {}  # bucket key to heap of ``[priority, sequence_number, cancelled]`` entries
+        self._stats = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        for engine_name, limit in (limits or {}).items():
+            rate, burst = limit if isinstance(limit, tuple) else (limit, None)
+            self.set_limit(engine_name, rate, burst)
+
+    def set_limit(self, engine_name, rate, burst=None):
+        """
+        Limits ``engine_name`` to ``rate`` requests per second per credential, allowing bursts of up to ``burst`` requests (by default, one second's worth). A ``rate`` of ``None`` removes the limit.
+        """
+        with self._condition:
+            if rate is None:
+                self._limits.pop(engine_name, None)
+            else:
+                assert rate > 0, "``rate`` must be a positive number"
+                self._limits[engine_name] = (rate, burst)
+            for bucket_key in [bucket_key for bucket_key in self._buckets if bucket_key[0] == engine_name]:
+                del self._buckets[bucket_key]  # rebuilt with the new limit on next use
+            self._condition.notify_all()
+
+    def acquire(self, engine_name, credential=None, level=None, timeout=None):
+        """
+        Waits until a request to ``engine_name`` with ``credential`` is allowed, letting higher-priority requests (lower ``level``, by default the level set with ``speech_recognition.priority``) through first. Returns ``True`` once the request may be sent, or ``False`` if ``timeout`` seconds pass first.
+        """
+        if level is None: level = current_priority()
+        with self._condition:
+            if engine_name not in self._limits: return True
+            bucket_key = (engine_name, credential)
+            stats = self._stats.setdefault(engine_name, _QueueStats())
+            waiters = self._waiters.setdefault(bucket_key, [])
+            now = time.monotonic()
+            if not waiters and self._bucket(bucket_key).try_take(now):
+                stats.acquired += 1
+                return True
+
+            entry = [level, next(self._sequence), False]
+            heapq.heappush(waiters, entry)
+            start, give_up_at = now, None if timeout is None else now + timeout
+            stats.queued += 1
+            stats.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if engine_name not in self._limits:  # the limit was removed while waiting
+                        entry[2] = True
+                        stats.acquired += 1
+                        return True
+                    while waiters and waiters[0][2]: heapq.heappop(waiters)  # drop entries of requests that gave up
+                    if waiters[0] is entry:
+                        bucket = self._bucket(bucket_key)
+                        if bucket.try_take(now):
+                            heapq.heappop(waiters)
+                            stats.acquired += 1
+                            waited = now - start
+                            stats.total_wait += waited
+                            stats.max_wait = max(stats.max_wait, waited)
+                            self._condition.notify_all()  # the next request in line can start waiting for its token
+                            return True
+                        wait_time = bucket.time_until_token(now)
+                    else:
+                        wait_time = None  # woken up when the requests ahead of this one are let through
+                    if give_up_at is not None:
+                        if now >= give_up_at:
+                            entry[2] = True
+                            stats.timed_out += 1
+                            self._condition.notify_all()
+                            return False
+                        wait_time = give_up_at - now if wait_time is None else min(wait_time, give_up_at - now)
+                    self._condition.wait(wait_time)
+            finally:
+                stats.waiting -= 1
+
+    def try_acquire(self, engine_name, credential=None):
+        """
+        Takes a token for a request to ``engine_name`` with ``credential`` if one is available right away and no other request is waiting, returning whether it did.
+        """
+        with self._condition:
+            if engine_name not in self._limits: return True
+            bucket_key = (engine_name, credential)
+            if self._waiters.get(bucket_key) or not self._bucket(bucket_key).try_take(time.monotonic()): return False
+            self._stats.setdefault(engine_name, _QueueStats()).acquired += 1
+            return True
+
+    def stats(self):
+        """
+        Returns a dictionary mapping each rate-limited engine name to a dictionary of queue statistics: ``acquired`` (requests let through), ``queued`` (requests that had to wait), ``timed_out`` (requests that gave up waiting), ``waiting`` (requests waiting right now), ``mean_wait`` and ``max_wait`` (seconds spent waiting by queued requests).
+        """
+        with self._condition:
+            return {engine_name: {
+                "acquired": stats.acquired,
+                "queued": stats.queued,
+                "timed_out": stats.timed_out,
+                "waiting": stats.waiting,
+                "mean_wait": stats.total_wait / stats.queued if stats.queued else 0.0,
+                "max_wait": stats.max_wait,
+            } for engine_name, stats in self._stats.items()}
+
+    def _bucket(self, bucket_key):
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            rate, burst = self._limits[bucket_key[0]]
+            bucket = self._buckets[bucket_key] = TokenBucket(rate, burst)
+        return bucket
@@ -0,0 +1,322 @@
+"""Amazon Transcribe pipeline that keeps its S3 bucket, clients and cleanup worker alive between jobs."""
+
+from __future__ import annotations
+
+import json
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+from speech_recognition.audio import AudioData
+from speech_recognition.clients import credential_digest
+from speech_recognition.engines import request_timeout
+from speech_recognition.exceptions import RequestError, TranscriptionFailed, TranscriptionNotReady, WaitTimeoutError
+from speech_recognition.streaming import LiveAudioStream, iter_pcm_data, wav_header
+
+
+def _transcription_exception(exception_class, job_name=None, file_key=None, bucket_name=None):
+    exc = exception_class()
+    exc.job_name = job_name
+    exc.file_key = file_key
+    exc.bucket_name = bucket_name
+    return exc
+
+
+class TranscribeJob(object):
+    """
+    A transcription job started by ``TranscribePipeline.submit``. ``job_name`` is the Amazon Transcribe job name, and ``file_key`` is the key of the uploaded audio in the pipeline's bucket.
+    """
+
+    def __init__(self, job_name: str, file_key: str):
+        self.job_name = job_name
+        self.file_key = file_key
+
+    def __repr__(self):
+        return "TranscribeJob({!r}, {!r})".format(self.job_name, self.file_key)
+
+
+class MultipartWavUpload(object):
+    """
+    Uploads PCM audio to S3 as a WAV file while it is still being captured. Audio is appended with ``write``, and the object is finalized with ``finish``.
+
+    Full parts are uploaded in the background as soon as they fill up. The first part, which holds the WAV header, is kept back until ``finish`` is called: only then is the total length known, and S3 allows parts to be uploaded in any order. Audio that ends up smaller than one part is sent with a single ``put_object`` call instead of a multipart upload.
+    """
+
+    MIN_PART_SIZE = 5 * 1024 * 1024  # S3 requires every part except the last to be at least 5 MiB
+
+    def __init__(self, s3, bucket_name: str, file_key: str, sample_rate: int, sample_width: int, executor: ThreadPoolExecutor, part_size: int = MIN_PART_SIZE):
+        assert part_size >= self.MIN_PART_SIZE, "``part_size`` must be at least 5 MiB"
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.file_key = file_key
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.part_size = part_size
+        self._executor = executor
+
+        self._first_part = bytearray()  # sent last, once the header can be filled in
+        self._pending = bytearray()  # audio that doesn't fill a whole part yet
+        self._frame_bytes = 0
+        self._upload_id = None
+        self._part_futures = []  # futures of ``(part_number, etag)`` pairs
+        self._finished = False
+
+    def write(self, frame_data: bytes):
+        """
+        Appends ``frame_data``, PCM audio laid out like ``AudioData.frame_data`` (little-endian, with unsigned samples for 8-bit audio, as in WAV files), to the upload.
+        """
+        assert not self._finished, "upload has already been finished"
+        self._frame_bytes += len(frame_data)
+
+        if len(self._first_part) < self.part_size:
+            taken = self.part_size - len(self._first_part)
+            self._first_part += frame_data[:taken]
+            frame_data = frame_data[taken:]
+        self._pending += frame_data
+        while len(self._pending) >= self.part_size:
+            self._upload_part(bytes(self._pending[:self.part_size]))
+            del self._pending[:self.part_size]
+
+    def finish(self) -> str:
+        """
+        Uploads the remaining audio and completes the upload, blocking until the object exists in S3. Returns the object's key.
+        """
+        assert not self._finished, "upload has already been finished"
+        self._finished = True
+        header = wav_header(self.sample_rate, self.sample_width, self._frame_bytes // self.sample_width)
+        try:
+            if self._upload_id is None:  # everything fits in a single request
+                self.s3.put_object(Bucket=self.bucket_name, Key=self.file_key, Body=header + bytes(self._first_part) + bytes(self._pending))
+                return self.file_key
+
+            if self._pending: self._upload_part(bytes(self._pending))
+            parts = [self._send_part(1, header + bytes(self._first_part))]
+            parts.extend(future.result() for future in self._part_futures)
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket_name, Key=self.file_key, UploadId=self._upload_id,
+                MultipartUpload={"Parts": [{"PartNumber": number, "ETag": etag} for number, etag in sorted(parts)]},
+            )
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._first_part, self._pending = bytearray(), bytearray()
+        return self.file_key
+
+    def abort(self):
+        """
+        Cancels the upload, discarding any parts that were already sent.
+        """
+        self._finished = True
+        if self._upload_id is not None:
+            upload_id, self._upload_id = self._upload_id, None
+            self._executor.submit(self.s3.abort_multipart_upload, Bucket=self.bucket_name, Key=self.file_key, UploadId=upload_id)
+
+    def _upload_part(self, data):
+        if self._upload_id is None:
+            self._upload_id = self.s3.create_multipart_upload(Bucket=self.bucket_name, Key=self.file_key, ContentType="audio/wav")["UploadId"]
+        part_number = len(self._part_futures) + 2  # part 1 is reserved for the header
+        self._part_futures.append(self._executor.submit(self._send_part, part_number, data))
+
+    def _send_part(self, part_number, data):
+        response = self.s3.upload_part(Bucket=self.bucket_name, Key=self.file_key, UploadId=self._upload_id, PartNumber=part_number, Body=data)
+        return part_number, response["ETag"]
+
+
+class TranscribePipeline(object):
+    """
+    Runs Amazon Transcribe jobs through a single S3 bucket, using clients from ``recognizer.engine_clients``.
+
+    The bucket is created (if necessary) the first time it's needed, and then reused for every job. If ``bucket_name`` is ``None``, a bucket name is generated once for this pipeline. Audio is uploaded without an object ACL: Transcribe reads the media through the caller's own IAM permissions, using an ``s3://`` URI.
+
+    Deleting finished jobs and their audio happens on a background thread, so it doesn't delay returning the transcript. Call ``close`` to wait for outstanding cleanup work.
+    """
+
+    def __init__(self, recognizer, bucket_name: str | None = None, access_key_id: str | None = None, secret_access_key: str | None = None, region: str | None = None, language_code: str = "en-US"):
+        self.recognizer = recognizer
+        self.transcribe = recognizer.engine_clients.aws_client("transcribe", access_key_id, secret_access_key, region)
+        self.s3 = recognizer.engine_clients.aws_client("s3", access_key_id, secret_access_key, region)
+        self.bucket_name = bucket_name or "speech-recognition-{}".format(uuid.uuid4())
+        self.region = region
+        self.language_code = language_code
+        self._bucket_ready = False
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="transcribe-pipeline")
+
+    def ensure_bucket(self):
+        """
+        Makes sure the pipeline's bucket exists. Only the first call talks to S3.
+        """
+        if self._bucket_ready: return
+        from botocore.exceptions import ClientError
+        try:
+            self.s3.head_bucket(Bucket=self.bucket_name)
+        except ClientError:
+            kwargs = {}
+            if self.region not in (None, "us-east-1"):  # us-east-1 is the only region that rejects an explicit location constraint
+                kwargs["CreateBucketConfiguration"] = {"LocationConstraint": self.region}
+            try:
+                self.s3.create_bucket(Bucket=self.bucket_name, **kwargs)
+            except ClientError as exc:
+                if exc.response["Error"]["Code"] != "BucketAlreadyOwnedByYou":  # ``BucketAlreadyExists`` means that another account owns it
+                    raise RequestError("could not create bucket {}: {}".format(self.bucket_name, exc))
+        self._bucket_ready = True
+
+    def start_upload(self, sample_rate: int, sample_width: int, job_name: str | None = None) -> MultipartWavUpload:
+        """
+        Starts uploading audio with the given format for a new job, returning a ``MultipartWavUpload`` that audio can be written to while it is being captured. Pass the upload to ``submit`` once it's complete.
+        """
+        self.ensure_bucket()
+        file_key = "{}.wav".format(job_name or uuid.uuid4())
+        return MultipartWavUpload(self.s3, self.bucket_name, file_key, sample_rate, sample_width, self._executor)
+
+    def submit(self, audio_data: AudioData | LiveAudioStream | MultipartWavUpload, job_name: str | None = None) -> TranscribeJob:
+        """
+        Uploads ``audio_data`` and starts transcribing it, returning a ``TranscribeJob``.
+
+        ``audio_data`` can be an ``AudioData`` instance, an upload returned by ``start_upload``, or a ``LiveAudioStream`` instance (see ``recognizer_instance.listen``), in which case parts are uploaded while the audio is still being captured.
+        """
+        from botocore.exceptions import ClientError
+
+        job_name = job_name or str(uuid.uuid4())
+        if isinstance(audio_data, (AudioData, LiveAudioStream)):
+            if isinstance(audio_data, LiveAudioStream): audio_data.wait_started()
+            upload = self.start_upload(audio_data.sample_rate, audio_data.sample_width, job_name)
+            try:
+                for frame_data in iter_pcm_data(audio_data):
+                    upload.write(frame_data)
+            except BaseException:
+                upload.abort()
+                raise
+        else:
+            upload = audio_data
+        file_key = upload.finish()
+
+        try:
+            self.transcribe.start_transcription_job(
+                TranscriptionJobName=job_name,
+                Media={"MediaFileUri": "s3://{}/{}".format(self.bucket_name, file_key)},
+                MediaFormat="wav",
+                MediaSampleRateHertz=upload.sample_rate,
+                LanguageCode=self.language_code,
+            )
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] == "LimitExceededException":
+                # could not start job, so cancel everything and let the caller try again later
+                self._executor.submit(self._delete_object, file_key)
+                raise _transcription_exception(TranscriptionNotReady)
+            raise
+        return TranscribeJob(job_name, file_key)
+
+    def poll(self, job: TranscribeJob):
+        """
+        Checks on ``job`` once. Returns ``None`` if it's still running, or a ``(transcript, confidence)`` pair once it has completed.
+
+        Raises a ``speech_recognition.TranscriptionFailed`` exception if the job failed. If the job no longer exists, raises a ``speech_recognition.TranscriptionNotReady`` exception with its ``job_name`` set to ``None``, to signal that the audio needs to be submitted again.
+        """
+        from botocore.exceptions import ClientError
+        try:
+            status = self.transcribe.get_transcription_job(TranscriptionJobName=job.job_name)
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] == "BadRequestException" and "The requested job couldn't be found" in str(exc):
+                # likely we were interrupted right after retrieving and deleting the job but before recording the transcript
+                raise _transcription_exception(TranscriptionNotReady)
+            raise
+
+        transcription_job = status["TranscriptionJob"]
+        if transcription_job["TranscriptionJobStatus"] == "COMPLETED" and "TranscriptFileUri" in transcription_job["Transcript"]:
+            with urlopen(transcription_job["Transcript"]["TranscriptFileUri"], timeout=request_timeout(self.recognizer.operation_timeout)) as json_data:
+                result = json.load(json_data)
+            self.cleanup(job)
+            confidences = [float(item["alternatives"][0]["confidence"]) for item in result["results"]["items"]]
+            confidence = sum(confidences) / len(confidences) if confidences else 0.5
+            return result["results"]["transcripts"][0]["transcript"], confidence
+        if transcription_job["TranscriptionJobStatus"] == "FAILED":
+            self.cleanup(job)
+            raise _transcription_exception(TranscriptionFailed)
+        return None
+
+    def wait(self, job: TranscribeJob, timeout: float | None = None, initial_delay: float = 0.5, max_delay: float = 5.0):
+        """
+        Polls ``job`` with exponential backoff until it completes, returning its ``(transcript, confidence)`` pair.
+
+        Raises a ``speech_recognition.WaitTimeoutError`` exception if ``timeout`` seconds pass first; its ``job_name``, ``file_key`` and ``bucket_name`` attributes can be used to keep waiting later.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = initial_delay
+        while True:
+            result = self.poll(job)
+            if result is not None: return result
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise _transcription_exception(WaitTimeoutError, job.job_name, job.file_key, self.bucket_name)
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+    def transcribe_audio(self, audio_data: AudioData, timeout: float | None = None):
+        """
+        Convenience method that submits ``audio_data`` and waits for its ``(transcript, confidence)`` pair.
+        """
+        return self.wait(self.submit(audio_data), timeout)
+
+    def cleanup(self, job: TranscribeJob):
+        """
+        Schedules deletion of ``job`` and its uploaded audio on the background cleanup thread.
+        """
+        self._executor.submit(self._delete_job, job)
+
+    def close(self, wait: bool = True):
+        """
+        Stops the background worker, waiting for outstanding uploads and cleanup if ``wait`` is true.
+        """
+        self._executor.shutdown(wait=wait)
+
+    def _delete_job(self, job):
+        try:
+            self.transcribe.delete_transcription_job(TranscriptionJobName=job.job_name)
+        except Exception as exc:
+            print("Warning, could not clean up transcription: %s" % exc)
+            traceback.print_exc()
+        self._delete_object(job.file_key)
+
+    def _delete_object(self, file_key):
+        try:
+            self.s3.delete_object(Bucket=self.bucket_name, Key=file_key)
+        except Exception as exc:
+            print("Warning, could not delete %s from bucket %s: %s" % (file_key, self.bucket_name, exc))
+
+
+def recognize_amazon(recognizer, audio_data, bucket_name=None, access_key_id=None, secret_access_key=None, region=None, job_name=None, file_key=None):
+    """
+    Performs speech recognition on ``audio_data`` (an ``AudioData`` instance) using Amazon Transcribe.
+    https://aws.amazon.com/transcribe/
+    If access_key_id or secret_access_key is not set it will go through the list in the link below
+    http://boto3.readthedocs.io/en/latest/guide/configuration.html#configuring-credentials
+
+    Transcription is asynchronous: the first call uploads the audio, starts a job and raises a ``speech_recognition.TranscriptionNotReady`` exception whose ``job_name``, ``file_key`` and ``bucket_name`` attributes identify the job. Call this again with ``audio_data=None`` and that ``job_name``, ``file_key`` and ``bucket_name`` to check on it (possibly from another process); it returns a ``(transcript, confidence)`` pair once the job is done.
+
+    Calls with the same ``bucket_name``, credentials and region share a ``speech_recognition.recognizers.amazon.TranscribePipeline``, so the S3 bucket is only created once (if ``bucket_name`` is not given, one is generated for the first call and then reused), and finished jobs and uploads are deleted in the background. The pipelines are closed by ``recognizer_instance.engine_clients.clear()``.
+    """
+    assert access_key_id is None or isinstance(access_key_id, str), "``access_key_id`` must be a string"
+    assert secret_access_key is None or isinstance(secret_access_key, str), "``secret_access_key`` must be a string"
+    assert region is None or isinstance(region, str), "``region`` must be a string"
+
+    check_existing = audio_data is None and job_name
+    if check_existing and bucket_name is None:
+        raise RequestError("``bucket_name`` must be given when checking on a job; it's the ``bucket_name`` attribute of the ``TranscriptionNotReady`` exception raised when the job was started")
+
+    pipeline = recognizer.engine_clients.get(
+        ("transcribe-pipeline", bucket_name, access_key_id, credential_digest(secret_access_key), region),
+        lambda: TranscribePipeline(recognizer, bucket_name, access_key_id, secret_access_key, region),
+        close=lambda pipeline: pipeline.close(wait=False),
+    )
+
+    if check_existing:
+        with recognizer.instrumentation.span("request", purpose="poll"):
+            result = pipeline.poll(TranscribeJob(job_name, file_key or "%s.wav" % job_name))
+        if result is not None: return result
+        raise _transcription_exception(TranscriptionNotReady, job_name, file_key, pipeline.bucket_name)
+
+    with recognizer.instrumentation.span("request", purpose="submit"):
+        job = pipeline.submit(audio_data, job_name)
+    raise _transcription_exception(TranscriptionNotReady, job.job_name, job.file_key, pipeline.bucket_name)
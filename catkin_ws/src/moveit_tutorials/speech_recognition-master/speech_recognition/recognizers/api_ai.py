@@ -0,0 +1,33 @@
+"""The ``recognize_api`` engine: the API.AI Speech Recognition API, kept for backwards compatibility (it is deprecated/not recommended as of 3.5.0, and currently is only optionally available for paid plans)."""
+
+import json
+import uuid
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from speech_recognition.audio import AudioData
+from speech_recognition.engines import request_timeout
+from speech_recognition.exceptions import RequestError, UnknownValueError
+
+
+def recognize_api(recognizer, audio_data, client_access_token, language="en", session_id=None, show_all=False):
+    assert isinstance(audio_data, AudioData), "Data must be audio data"
+    with recognizer.instrumentation.span("convert", format="wav"):
+        wav_data = audio_data.get_wav_data(convert_rate=16000, convert_width=2)
+    url = "https://api.api.ai/v1/query"
+    while True:
+        boundary = uuid.uuid4().hex
+        if boundary.encode("utf-8") not in wav_data: break
+    if session_id is None: session_id = uuid.uuid4().hex
+    data = b"--" + boundary.encode("utf-8") + b"\r\n" + b"Content-Disposition: form-data; name=\"request\"\r\n" + b"Content-Type: application/json\r\n" + b"\r\n" + b"{\"v\": \"20150910\", \"sessionId\": \"" + session_id.encode("utf-8") + b"\", \"lang\": \"" + language.encode("utf-8") + b"\"}\r\n" + b"--" + boundary.encode("utf-8") + b"\r\n" + b"Content-Disposition: form-data; name=\"voiceData\"; filename=\"audio.wav\"\r\n" + b"Content-Type: audio/wav\r\n" + b"\r\n" + wav_data + b"\r\n" + b"--" + boundary.encode("utf-8") + b"--\r\n"
+    request = Request(url, data=data, headers={"Authorization": "Bearer {}".format(client_access_token), "Content-Length": str(len(data)), "Expect": "100-continue", "Content-Type": "multipart/form-data; boundary={}".format(boundary)})
+    with recognizer.instrumentation.span("request"):
+        try: response = urlopen(request, timeout=request_timeout(10 if recognizer.operation_timeout is None else recognizer.operation_timeout))
+        except HTTPError as e: raise RequestError("recognition request failed: {}".format(e.reason))
+        except URLError as e: raise RequestError("recognition connection failed: {}".format(e.reason))
+        response_text = response.read().decode("utf-8")
+    result = json.loads(response_text)
+    if show_all: return result
+    if "status" not in result or "errorType" not in result["status"] or result["status"]["errorType"] != "success":
+        raise UnknownValueError()
+    return result["result"]["resolvedQuery"]
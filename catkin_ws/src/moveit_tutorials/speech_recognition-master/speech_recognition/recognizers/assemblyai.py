@@ -0,0 +1,107 @@
+"""Requests against the AssemblyAI transcription API, shared by ``recognize_assemblyai`` and the job tracker."""
+
+from __future__ import annotations
+
+from speech_recognition.engines import request_timeout
+from speech_recognition.exceptions import RequestError, TranscriptionFailed, TranscriptionNotReady
+from speech_recognition.streaming import DEFAULT_CHUNK_SIZE, iter_wav_data
+
+API_URL = "https://api.assemblyai.com/v2"
+
+
+def _requests():
+    try:
+        import requests
+    except ImportError:
+        raise RequestError("missing requests module: ensure that requests is set up correctly.")
+    return requests
+
+
+def read_file(filename: str, chunk_size: int = 5242880):
+    with open(filename, "rb") as _file:
+        while True:
+            data = _file.read(chunk_size)
+            if not data:
+                break
+            yield data
+
+
+def audio_chunks(audio, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Lazily yields the WAV file to upload for ``audio``, in chunks of ``chunk_size`` bytes. ``audio`` can be an ``AudioData`` instance, a ``LiveAudioStream`` instance that is still being captured, or the path of an audio file.
+    """
+    if isinstance(audio, str):
+        return read_file(audio, chunk_size)
+    return iter_wav_data(audio, chunk_size)
+
+
+def upload(api_token: str, data) -> str:
+    """
+    Uploads ``data`` (bytes, or an iterable of byte chunks that is sent with chunked transfer encoding) to AssemblyAI, returning the URL to transcribe it from.
+    """
+    response = _requests().post(API_URL + "/upload", headers={"authorization": api_token}, data=data, timeout=request_timeout())
+    return response.json()["upload_url"]
+
+
+def start_transcription(api_token: str, audio_url: str) -> str:
+    """
+    Queues the audio at ``audio_url`` for transcription, returning the transcription ID.
+    """
+    response = _requests().post(API_URL + "/transcript", json={"audio_url": audio_url}, headers={
+        "authorization": api_token,
+        "content-type": "application/json",
+    }, timeout=request_timeout())
+    return response.json()["id"]
+
+
+def get_transcription(api_token: str, transcription_id: str):
+    """
+    Checks on the transcription ``transcription_id`` once. Returns ``None`` if it's still queued or processing, or a ``(text, confidence)`` pair once it has completed.
+
+    Raises a ``speech_recognition.TranscriptionFailed`` exception if the transcription failed.
+    """
+    response = _requests().get("{}/transcript/{}".format(API_URL, transcription_id), headers={"authorization": api_token}, timeout=request_timeout())
+    data = response.json()
+    status = data["status"]
+    if status == "error":
+        exc = TranscriptionFailed(data.get("error"))
+        exc.job_name = None
+        exc.file_key = None
+        raise exc
+    elif status == "completed":
+        return data["text"], data["confidence"]
+    return None
+
+
+def recognize_assemblyai(recognizer, audio_data, api_token, job_name=None, **kwargs):
+    """
+    Wraps the AssemblyAI STT service.
+    https://www.assemblyai.com/
+
+    ``audio_data`` can be an ``AudioData`` instance, a ``LiveAudioStream`` instance (see ``recognizer_instance.listen``) whose audio is uploaded while it is still being captured, or the path of an audio file. The audio is uploaded as a WAV file that is generated lazily in fixed-size chunks, so no temporary file is needed and memory use doesn't grow with the length of the audio.
+
+    Transcription is asynchronous: the first call uploads the audio, queues it and raises a ``speech_recognition.TranscriptionNotReady`` exception whose ``job_name`` attribute is the transcription ID. Call this again with ``audio_data=None`` and that ``job_name`` to check on it; it returns a ``(text, confidence)`` pair once the transcription is done. To keep many transcriptions in flight without writing a polling loop, see ``speech_recognition.jobs.JobTracker``.
+    """
+    check_existing = audio_data is None and job_name
+    if check_existing:
+        # Query status.
+        with recognizer.instrumentation.span("request", purpose="poll"):
+            result = get_transcription(api_token, job_name)
+        if result is not None:
+            return result
+
+        # Otherwise keep waiting.
+        print('Keep waiting.')
+        exc = TranscriptionNotReady()
+        exc.job_name = job_name
+        exc.file_key = None
+        raise exc
+    else:
+        # Upload file and queue it for transcription.
+        with recognizer.instrumentation.span("request", purpose="upload"):
+            upload_url = upload(api_token, audio_chunks(audio_data))
+        exc = TranscriptionNotReady()
+        with recognizer.instrumentation.span("request", purpose="submit"):
+            exc.job_name = start_transcription(api_token, upload_url)
+        exc.file_key = None
+        raise exc
@@ -0,0 +1,109 @@
+"""The ``recognize_azure`` engine: the Microsoft Azure Speech API."""
+
+import io
+import json
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from speech_recognition.audio import AudioData
+from speech_recognition.engines import request_timeout
+from speech_recognition.exceptions import RequestError, UnknownValueError
+from speech_recognition.streaming import LiveAudioStream, iter_wav_data
+
+
+def recognize_azure(recognizer, audio_data, key, language="en-US", profanity="masked", location="westus", show_all=False):
+    """
+    Performs speech recognition on ``audio_data`` (an ``AudioData`` instance), using the Microsoft Azure Speech API.
+
+    The Microsoft Azure Speech API key is specified by ``key``. Unfortunately, these are not available without `signing up for an account <https://azure.microsoft.com/en-ca/pricing/details/cognitive-services/speech-api/>`__ with Microsoft Azure.
+
+    To get the API key, go to the `Microsoft Azure Portal Resources <https://portal.azure.com/>`__ page, go to "All Resources" > "Add" > "See All" > Search "Speech > "Create", and fill in the form to make a "Speech" resource. On the resulting page (which is also accessible from the "All Resources" page in the Azure Portal), go to the "Show Access Keys" page, which will have two API keys, either of which can be used for the `key` parameter. Microsoft Azure Speech API keys are 32-character lowercase hexadecimal strings.
+
+    The recognition language is determined by ``language``, a BCP-47 language tag like ``"en-US"`` (US English) or ``"fr-FR"`` (International French), defaulting to US English. A list of supported language values can be found in the `API documentation <https://docs.microsoft.com/en-us/azure/cognitive-services/speech/api-reference-rest/bingvoicerecognition#recognition-language>`__ under "Interactive and dictation mode".
+
+    ``audio_data`` can also be a ``LiveAudioStream`` instance (see ``recognizer_instance.listen``). Then the request is started as soon as the phrase starts, and its body (a WAV file with 16 kHz audio, whose header doesn't state a length) is sent in chunks as the phrase is captured, so the service is already decoding by the time the phrase ends.
+
+    Returns the most likely transcription if ``show_all`` is false (the default). Otherwise, returns the `raw API response <https://docs.microsoft.com/en-us/azure/cognitive-services/speech/api-reference-rest/bingvoicerecognition#sample-responses>`__ as a JSON dictionary.
+
+    Raises a ``speech_recognition.UnknownValueError`` exception if the speech is unintelligible. Raises a ``speech_recognition.RequestError`` exception if the speech recognition operation failed, if the key isn't valid, or if there is no internet connection.
+    """
+    assert isinstance(audio_data, (AudioData, LiveAudioStream)), "Data must be audio data or a live audio stream"
+    assert isinstance(key, str), "``key`` must be a string"
+    # assert isinstance(result_format, str), "``format`` must be a string" # simple|detailed
+    assert isinstance(language, str), "``language`` must be a string"
+
+    result_format = 'detailed'
+    access_token, expire_time = getattr(recognizer, "azure_cached_access_token", None), getattr(recognizer, "azure_cached_access_token_expiry", None)
+    allow_caching = True
+    try:
+        from time import monotonic  # we need monotonic time to avoid being affected by system clock changes, but this is only available in Python 3.3+
+    except ImportError:
+        expire_time = None  # monotonic time not available, don't cache access tokens
+        allow_caching = False  # don't allow caching, since monotonic time isn't available
+    if expire_time is None or monotonic() > expire_time:  # caching not enabled, first credential request, or the access token from the previous one expired
+        # get an access token using OAuth
+        credential_url = recognizer.engine_clients.url("azure", "https://" + location + ".api.cognitive.microsoft.com/sts/v1.0/issueToken")
+        credential_request = Request(credential_url, data=b"", headers={
+            "Content-type": "application/x-www-form-urlencoded",
+            "Content-Length": "0",
+            "Ocp-Apim-Subscription-Key": key,
+        })
+
+        if allow_caching:
+            start_time = monotonic()
+
+        with recognizer.instrumentation.span("request", purpose="credential"):
+            try:
+                credential_response = urlopen(credential_request, timeout=request_timeout(60))  # credential response can take longer, use longer timeout instead of default one
+            except HTTPError as e:
+                raise RequestError("credential request failed: {}".format(e.reason))
+            except URLError as e:
+                raise RequestError("credential connection failed: {}".format(e.reason))
+            access_token = credential_response.read().decode("utf-8")
+
+        if allow_caching:
+            # save the token for the duration it is valid for
+            recognizer.azure_cached_access_token = access_token
+            recognizer.azure_cached_access_token_expiry = start_time + 600  # according to https://docs.microsoft.com/en-us/azure/cognitive-services/Speech-Service/rest-apis#authentication, the token expires in exactly 10 minutes
+
+    if isinstance(audio_data, LiveAudioStream):
+        audio_data.wait_started()  # the request starts with the phrase
+        body = iter_wav_data(audio_data, convert_rate=16000, convert_width=2)  # converted and sent as it's captured
+    else:
+        with recognizer.instrumentation.span("convert", format="wav"):
+            wav_data = audio_data.get_wav_data(
+                convert_rate=16000,  # audio samples must be 8kHz or 16 kHz
+                convert_width=2  # audio samples should be 16-bit
+            )
+        body = io.BytesIO(wav_data)
+
+    url = recognizer.engine_clients.url("azure", "https://" + location + ".stt.speech.microsoft.com/speech/recognition/conversation/cognitiveservices/v1?{}".format(urlencode({
+        "language": language,
+        "format": result_format,
+        "profanity": profanity
+    })))
+
+    request = Request(url, data=body, headers={
+        "Authorization": "Bearer {}".format(access_token),
+        "Content-type": "audio/wav; codec=\"audio/pcm\"; samplerate=16000",
+        "Transfer-Encoding": "chunked",
+    })
+
+    with recognizer.instrumentation.span("request"):
+        try:
+            response = urlopen(request, timeout=request_timeout(recognizer.operation_timeout))
+        except HTTPError as e:
+            raise RequestError("recognition request failed: {}".format(e.reason))
+        except URLError as e:
+            if isinstance(audio_data, LiveAudioStream) and audio_data.error is not None: raise audio_data.error  # capturing the phrase failed, not the connection
+            raise RequestError("recognition connection failed: {}".format(e.reason))
+        response_text = response.read().decode("utf-8")
+    result = json.loads(response_text)
+
+    # return results
+    if show_all:
+        return result
+    if "RecognitionStatus" not in result or result["RecognitionStatus"] != "Success" or "NBest" not in result:
+        raise UnknownValueError()
+    return result['NBest'][0]["Display"], result['NBest'][0]["Confidence"]
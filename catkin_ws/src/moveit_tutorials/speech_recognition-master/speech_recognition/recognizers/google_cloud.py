@@ -0,0 +1,137 @@
+"""The ``recognize_google_cloud`` engine: the Google Cloud Speech API."""
+
+import os
+from urllib.error import URLError
+
+from speech_recognition.audio import AudioData
+from speech_recognition.engines import remaining_time, request_timeout
+from speech_recognition.exceptions import RequestError, UnknownValueError
+from speech_recognition.streaming import LiveAudioStream, iter_pcm_data
+
+STREAMING_CHUNK_SIZE = 16384  # bytes of audio per streaming request, well under the API's limit of 25 KB
+
+
+def _clamped_rate(sample_rate):
+    # audio sample rate must be between 8 kHz and 48 kHz inclusive - clamp sample rate into this range
+    return None if 8000 <= sample_rate <= 48000 else max(8000, min(sample_rate, 48000))
+
+
+def recognize_google_cloud(recognizer, audio_data, credentials_json=None, language="en-US", preferred_phrases=None, show_all=False, interim_callback=None):
+    """
+    Performs speech recognition on ``audio_data`` (an ``AudioData`` instance), using the Google Cloud Speech API.
+
+    This function requires a Google Cloud Platform account; see the `Google Cloud Speech API Quickstart <https://cloud.google.com/speech/docs/getting-started>`__ for details and instructions. Basically, create a project, enable billing for the project, enable the Google Cloud Speech API for the project, and set up Service Account Key credentials for the project. The result is a JSON file containing the API credentials. The text content of this JSON file is specified by ``credentials_json``. If not specified, the library will try to automatically `find the default API credentials JSON file <https://developers.google.com/identity/protocols/application-default-credentials>`__.
+
+    The recognition language is determined by ``language``, which is a BCP-47 language tag like ``"en-US"`` (US English). A list of supported language tags can be found in the `Google Cloud Speech API documentation <https://cloud.google.com/speech/docs/languages>`__.
+
+    If ``preferred_phrases`` is an iterable of phrase strings, those given phrases will be more likely to be recognized over similar-sounding alternatives. This is useful for things like keyword/command recognition or adding new phrases that aren't in Google's vocabulary. Note that the API imposes certain `restrictions on the list of phrase strings <https://cloud.google.com/speech/limits#content>`__.
+
+    ``audio_data`` can also be a ``LiveAudioStream`` instance (see ``recognizer_instance.listen``). Then a ``streaming_recognize`` call is opened as soon as the phrase starts, and the audio is sent in chunks as it is captured, so the service is already recognizing while the phrase is being spoken, and the result is available shortly after the phrase ends rather than after a whole upload and recognition. While the phrase is being spoken, ``interim_callback``, if given, is called with each interim transcript, from the thread that called this.
+
+    Returns the most likely transcription if ``show_all`` is False (the default). Otherwise, returns the raw API response as a JSON dictionary, or for a ``LiveAudioStream``, the list of ``StreamingRecognizeResponse`` messages received.
+
+    Raises a ``speech_recognition.UnknownValueError`` exception if the speech is unintelligible. Raises a ``speech_recognition.RequestError`` exception if the speech recognition operation failed, if the credentials aren't valid, or if there is no Internet connection.
+    """
+    assert isinstance(audio_data, (AudioData, LiveAudioStream)), "``audio_data`` must be audio data or a live audio stream"
+    if credentials_json is None:
+        assert os.environ.get('GOOGLE_APPLICATION_CREDENTIALS') is not None
+    assert isinstance(language, str), "``language`` must be a string"
+    assert preferred_phrases is None or all(isinstance(preferred_phrases, (type(""), type(u""))) for preferred_phrases in preferred_phrases), "``preferred_phrases`` must be a list of strings"
+
+    try:
+        import socket
+        from google.cloud import speech
+        from google.api_core.exceptions import GoogleAPICallError
+    except ImportError:
+        raise RequestError('missing google-cloud-speech module: ensure that google-cloud-speech is set up correctly.')
+
+    client = recognizer.engine_clients.google_speech_client(credentials_json)
+
+    if isinstance(audio_data, LiveAudioStream):
+        audio_data.wait_started()  # the phrase has started
+        convert_rate = _clamped_rate(audio_data.sample_rate)
+        config = {
+            'encoding': speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            'sample_rate_hertz': convert_rate or audio_data.sample_rate,
+            'language_code': language
+        }
+    else:
+        with recognizer.instrumentation.span("convert", format="flac"):
+            flac_data = audio_data.get_flac_data(
+                convert_rate=_clamped_rate(audio_data.sample_rate),
+                convert_width=2  # audio samples must be 16-bit
+            )
+        audio = speech.RecognitionAudio(content=flac_data)
+
+        config = {
+            'encoding': speech.RecognitionConfig.AudioEncoding.FLAC,
+            'sample_rate_hertz': audio_data.sample_rate,
+            'language_code': language
+        }
+    if preferred_phrases is not None:
+        config['speechContexts'] = [speech.SpeechContext(
+            phrases=preferred_phrases
+        )]
+    if show_all:
+        config['enableWordTimeOffsets'] = True  # some useful extra options for when we want all the output
+
+    opts = {}
+    timeout = request_timeout(recognizer.operation_timeout)
+    if timeout is not None and (socket.getdefaulttimeout() is None or remaining_time() is not None):
+        opts['timeout'] = timeout
+
+    config = speech.RecognitionConfig(**config)
+    if isinstance(audio_data, LiveAudioStream):
+        return _recognize_stream(recognizer, client, config, audio_data, convert_rate, opts, show_all, interim_callback)
+
+    with recognizer.instrumentation.span("request"):
+        try:
+            response = client.recognize(config=config, audio=audio, **opts)
+        except GoogleAPICallError as e:
+            raise RequestError(e)
+        except URLError as e:
+            raise RequestError("recognition connection failed: {0}".format(e.reason))
+
+    if show_all: return response
+    if len(response.results) == 0: raise UnknownValueError()
+
+    transcript = ''
+    for result in response.results:
+        transcript += result.alternatives[0].transcript.strip() + ' '
+    return transcript
+
+
+def _recognize_stream(recognizer, client, config, stream, convert_rate, opts, show_all, interim_callback):
+    from google.cloud import speech
+    from google.api_core.exceptions import GoogleAPICallError
+
+    capture_errors = []  # an exception raised while reading the stream ends the call, but is only seen by the gRPC thread sending the requests
+
+    def requests():
+        try:
+            for chunk in iter_pcm_data(stream, STREAMING_CHUNK_SIZE, convert_rate, 2):
+                yield speech.StreamingRecognizeRequest(audio_content=chunk)
+        except Exception as exc:
+            capture_errors.append(exc)
+            raise
+
+    streaming_config = speech.StreamingRecognitionConfig(config=config, interim_results=interim_callback is not None)
+    responses, transcript = [], ''
+    with recognizer.instrumentation.span("request", streaming=True):
+        try:
+            for response in client.streaming_recognize(config=streaming_config, requests=requests(), **opts):
+                responses.append(response)
+                for result in response.results:
+                    if result.is_final:
+                        transcript += result.alternatives[0].transcript.strip() + ' '
+                    elif interim_callback is not None and result.alternatives:
+                        interim_callback(result.alternatives[0].transcript)
+        except GoogleAPICallError as e:
+            if capture_errors: raise capture_errors[0]
+            raise RequestError(e)
+        except URLError as e:
+            raise RequestError("recognition connection failed: {0}".format(e.reason))
+
+    if show_all: return responses
+    if not transcript: raise UnknownValueError()
+    return transcript
@@ -0,0 +1,156 @@
+"""The ``recognize_keywords`` engine: offline matching of short commands against enrolled examples, using MFCC features and dynamic time warping."""
+
+import os
+import shutil
+import threading
+from urllib.parse import quote, unquote
+
+from speech_recognition.audio import AudioData
+from speech_recognition.exceptions import RequestError, UnknownValueError
+from speech_recognition.features import get_numpy
+
+FEATURE_PARAMETERS = {"sample_rate": 16000, "mel_bands": 26, "coefficients": 13}  # 25 ms frames every 10 ms, see ``speech_recognition.features``
+SPEECH_RANGE_DB = 30  # frames quieter than the loudest one by more than this are trimmed from both ends as silence
+
+_templates = {}  # directory to ``KeywordTemplates`` instance, for ``recognize_keywords`` calls given a directory
+_lock = threading.Lock()
+
+
+def extract_features(audio_data):
+    """
+    Returns the MFCC features of the speech in ``audio_data``, as a NumPy array with one row per 10 ms frame, after trimming silence from both ends and normalizing the mean of each coefficient to zero. The zeroth coefficient, which only reflects loudness, is left out. The array has no rows if there is no speech.
+    """
+    np = get_numpy()
+    energy_db = audio_data.features("energy", **FEATURE_PARAMETERS)
+    cepstra = audio_data.features("mfcc", **FEATURE_PARAMETERS)[:, 1:]
+    speech = np.flatnonzero(energy_db > energy_db.max() - SPEECH_RANGE_DB)
+    if energy_db.max() < -50 or len(speech) == 0: return np.zeros((0, cepstra.shape[1]))  # silence
+    cepstra = cepstra[speech[0]:speech[-1] + 1]
+    return cepstra - cepstra.mean(axis=0)
+
+
+def dtw_distances(features, templates):
+    """
+    Returns the dynamic time warping distance between ``features`` and each array in ``templates``, normalized by the combined length of both, as a NumPy array. All templates are aligned at the same time, so the cost is a few hundred vectorized steps regardless of how many there are.
+    """
+    np = get_numpy()
+    n, lengths = len(features), np.array([len(template) for template in templates])
+    m = lengths.max()
+    padded = np.zeros((len(templates), m, features.shape[1]))
+    for index, template in enumerate(templates): padded[index, :len(template)] = template
+    # template, feature frame, template frame; expanded as |a|^2 + |b|^2 - 2ab, so no array with a coefficient axis on top of these is built
+    squared = (features ** 2).sum(axis=1)[None, :, None] + (padded ** 2).sum(axis=2)[:, None, :] - 2 * (features @ padded.transpose(0, 2, 1))
+    cost = np.sqrt(np.maximum(squared, 0))  # rounding can leave tiny negative values
+
+    total = np.full((len(templates), n + 1, m + 1), np.inf)
+    total[:, 0, 0] = 0
+    for diagonal in range(2, n + m + 1):  # cells on the same anti-diagonal only depend on earlier ones
+        i = np.arange(max(1, diagonal - m), min(n, diagonal - 1) + 1)
+        j = diagonal - i
+        total[:, i, j] = cost[:, i - 1, j - 1] + np.minimum(np.minimum(total[:, i - 1, j], total[:, i - 1, j - 1]), total[:, i, j - 1])
+    return total[np.arange(len(templates)), n, lengths] / (n + lengths)
+
+
+class KeywordTemplates(object):
+    """
+    Enrolled examples of each phrase recognized by ``recognize_keywords``, stored in ``directory`` as the MFCC features of each example (a NumPy ``.npy`` file), in a subdirectory per phrase. A phrase is usually a single word or a short command such as ``"pick red"``.
+
+    A few examples of each phrase, recorded with the microphone and in the setting it will be used in, give the best results.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._loaded = (None, {})  # directory listing stamp, and the templates loaded at that point
+
+    def enroll(self, phrase, audio_data):
+        """
+        Adds ``audio_data`` (an ``AudioData`` instance) as an example of ``phrase``, and returns the path of the file it was stored in.
+
+        Raises a ``speech_recognition.UnknownValueError`` exception if there is no speech in ``audio_data``.
+        """
+        assert isinstance(audio_data, AudioData), "``audio_data`` must be audio data"
+        assert phrase.strip(), "``phrase`` must not be empty"
+        np = get_numpy()
+        features = extract_features(audio_data)
+        if len(features) < 5: raise UnknownValueError()
+        phrase_directory = os.path.join(self.directory, quote(phrase, safe=""))
+        with self._lock:
+            os.makedirs(phrase_directory, exist_ok=True)
+            index = len([name for name in os.listdir(phrase_directory) if name.endswith(".npy")])
+            while os.path.exists(os.path.join(phrase_directory, "{}.npy".format(index))): index += 1
+            path = os.path.join(phrase_directory, "{}.npy".format(index))
+            np.save(path, features.astype(np.float32))
+        return path
+
+    def remove(self, phrase):
+        """
+        Removes every example of ``phrase``.
+        """
+        shutil.rmtree(os.path.join(self.directory, quote(phrase, safe="")), ignore_errors=True)
+
+    def phrases(self):
+        return sorted(self.load())
+
+    def load(self):
+        """
+        Returns a dictionary mapping each enrolled phrase to a list of the features of its examples. The files are only read again after examples were added or removed.
+        """
+        np = get_numpy()
+        stamp = self._stamp()
+        with self._lock:
+            if self._loaded[0] == stamp: return self._loaded[1]
+            templates = {}
+            for name, _ in stamp:
+                phrase_directory = os.path.join(self.directory, name)
+                examples = [np.load(os.path.join(phrase_directory, file_name)).astype(np.float64) for file_name in sorted(os.listdir(phrase_directory)) if file_name.endswith(".npy")]
+                if examples: templates[unquote(name)] = examples
+            self._loaded = (stamp, templates)
+            return templates
+
+    def _stamp(self):
+        if not os.path.isdir(self.directory): return ()
+        stamp = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path): stamp.append((name, os.stat(path).st_mtime_ns))
+        return tuple(stamp)
+
+
+def recognize_keywords(recognizer, audio_data, templates, phrases=None, threshold=None, show_all=False):
+    """
+    Performs speech recognition on ``audio_data`` (an ``AudioData`` instance) offline, by finding which of a small set of enrolled phrases it sounds most like. This is much faster than a general speech recognizer (a few milliseconds per phrase), and works well for closed command sets such as colors and actions, but each phrase must first be enrolled with a few examples.
+
+    ``templates`` is a ``KeywordTemplates`` instance, or the path of its directory. Enroll examples with ``speech_recognition.recognizers.keywords.KeywordTemplates(directory).enroll(phrase, audio_data)``.
+
+    If ``phrases`` is given, only those enrolled phrases are considered. If ``threshold`` is given, matches with a distance above it are rejected; distances are typically below 5 for matching phrases, and the right value depends on the microphone and the phrases (use ``show_all`` to see them).
+
+    Returns the most likely phrase if ``show_all`` is false (the default). Otherwise, returns a list of ``(phrase, distance)`` pairs for every phrase considered, best match first.
+
+    Raises a ``speech_recognition.UnknownValueError`` exception if there is no speech in ``audio_data``, or no phrase is within ``threshold``. Raises a ``speech_recognition.RequestError`` exception if numpy is missing or no phrases are enrolled.
+    """
+    assert isinstance(audio_data, AudioData), "``audio_data`` must be audio data"
+    assert isinstance(templates, (KeywordTemplates, str)), "``templates`` must be a ``KeywordTemplates`` instance or a directory path"
+    if isinstance(templates, str):
+        with _lock:
+            templates = _templates.setdefault(os.path.abspath(templates), KeywordTemplates(templates))
+
+    enrolled = templates.load()
+    if phrases is not None: enrolled = {phrase: examples for phrase, examples in enrolled.items() if phrase in phrases}
+    if not enrolled: raise RequestError("no phrases enrolled in \"{}\"".format(templates.directory))
+
+    with recognizer.instrumentation.span("convert", format="mfcc"):
+        features = extract_features(audio_data)
+    if len(features) == 0: raise UnknownValueError()
+
+    with recognizer.instrumentation.span("inference"):
+        names = [phrase for phrase, examples in enrolled.items() for _ in examples]
+        distances = dtw_distances(features, [example for examples in enrolled.values() for example in examples])
+    best = {}
+    for phrase, distance in zip(names, distances):
+        best[phrase] = min(best.get(phrase, float("inf")), float(distance))
+    ranking = sorted(best.items(), key=lambda item: item[1])
+    if show_all: return ranking
+    phrase, distance = ranking[0]
+    if threshold is not None and distance > threshold: raise UnknownValueError()
+    return phrase
@@ -0,0 +1,51 @@
+"""The ``recognize_tensorflow`` engine: offline command recognition with a TensorFlow speech commands model."""
+
+from speech_recognition.audio import AudioData
+from speech_recognition.exceptions import RequestError
+
+
+def recognize_tensorflow(recognizer, audio_data, tensor_graph='tensorflow-data/conv_actions_frozen.pb', tensor_label='tensorflow-data/conv_actions_labels.txt'):
+    """
+    Performs speech recognition on ``audio_data`` (an ``AudioData`` instance).
+
+    Path to Tensor loaded from ``tensor_graph``. You can download a model here: http://download.tensorflow.org/models/speech_commands_v0.01.zip
+
+    Path to Tensor Labels file loaded from ``tensor_label``.
+    """
+    assert isinstance(audio_data, AudioData), "Data must be audio data"
+    assert isinstance(tensor_graph, str), "``tensor_graph`` must be a string"
+    assert isinstance(tensor_label, str), "``tensor_label`` must be a string"
+
+    try:
+        import tensorflow as tf
+    except ImportError:
+        raise RequestError("missing tensorflow module: ensure that tensorflow is set up correctly.")
+
+    if not (tensor_graph == recognizer.lasttfgraph):
+        recognizer.lasttfgraph = tensor_graph
+
+        # load graph
+        with tf.gfile.FastGFile(tensor_graph, 'rb') as f:
+            graph_def = tf.GraphDef()
+            graph_def.ParseFromString(f.read())
+            tf.import_graph_def(graph_def, name='')
+        # load labels
+        recognizer.tflabels = [line.rstrip() for line in tf.gfile.GFile(tensor_label)]
+
+    with recognizer.instrumentation.span("convert", format="wav"):
+        wav_data = audio_data.get_wav_data(
+            convert_rate=16000, convert_width=2
+        )
+
+    with tf.Session() as sess:
+        input_layer_name = 'wav_data:0'
+        output_layer_name = 'labels_softmax:0'
+        softmax_tensor = sess.graph.get_tensor_by_name(output_layer_name)
+        with recognizer.instrumentation.span("inference"):
+            predictions, = sess.run(softmax_tensor, {input_layer_name: wav_data})
+
+        # Sort labels in order of confidence
+        top_k = predictions.argsort()[-1:][::-1]
+        for node_id in top_k:
+            human_string = recognizer.tflabels[node_id]
+            return human_string
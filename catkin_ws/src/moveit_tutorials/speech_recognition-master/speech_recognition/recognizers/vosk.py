@@ -0,0 +1,27 @@
+"""The ``recognize_vosk`` engine: offline recognition with Vosk."""
+
+import os
+
+from speech_recognition.audio import AudioData
+
+
+def recognize_vosk(recognizer, audio_data, language='en'):
+    from vosk import Model, KaldiRecognizer
+    
+    assert isinstance(audio_data, AudioData), "Data must be audio data"
+    
+    if not hasattr(recognizer, 'vosk_model'):
+        if not os.path.exists("model"):
+            return "Please download the model from https://github.com/alphacep/vosk-api/blob/master/doc/models.md and unpack as 'model' in the current folder."
+            exit (1)
+        recognizer.vosk_model = Model("model")
+
+    rec = KaldiRecognizer(recognizer.vosk_model, 16000);
+    
+    with recognizer.instrumentation.span("convert", format="raw"):
+        raw_data = audio_data.get_raw_data(convert_rate=16000, convert_width=2)
+    with recognizer.instrumentation.span("inference"):
+        rec.AcceptWaveform(raw_data);
+        finalRecognition = rec.FinalResult()
+    
+    return finalRecognition
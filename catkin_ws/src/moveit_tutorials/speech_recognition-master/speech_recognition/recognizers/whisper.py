@@ -1,7 +1,7 @@
 from __future__ import annotations
 
+import io
 import os
-from io import BytesIO
 
 from speech_recognition.audio import AudioData
 from speech_recognition.exceptions import SetupError
@@ -35,8 +35,57 @@ def recognize_whisper_api(
             "missing openai module: ensure that openai is set up correctly."
         )
 
-    wav_data = BytesIO(audio_data.get_wav_data())
+    with recognizer.instrumentation.span("convert", format="wav"):
+        wav_data = io.BytesIO(audio_data.get_wav_data())
     wav_data.name = "SpeechRecognition_audio.wav"
 
-    transcript = openai.Audio.transcribe(model, wav_data, api_key=api_key)
+    with recognizer.instrumentation.span("request"):
+        transcript = openai.Audio.transcribe(model, wav_data, api_key=api_key)
     return transcript["text"]
+
+
+def recognize_whisper(recognizer, audio_data, model="base", show_dict=False, load_options=None, language=None, translate=False, **transcribe_options):
+    """
+    Performs speech recognition on ``audio_data`` (an ``AudioData`` instance), using Whisper.
+
+    The recognition language is determined by ``language``, an uncapitalized full language name like "english" or "chinese". See the full language list at https://github.com/openai/whisper/blob/main/whisper/tokenizer.py
+
+    model can be any of tiny, base, small, medium, large, tiny.en, base.en, small.en, medium.en. See https://github.com/openai/whisper for more details.
+
+    If show_dict is true, returns the full dict response from Whisper, including the detected language. Otherwise returns only the transcription.
+
+    You can translate the result to english with Whisper by passing translate=True
+
+    Other values are passed directly to whisper. See https://github.com/openai/whisper/blob/main/whisper/transcribe.py for all options
+    """
+
+    assert isinstance(audio_data, AudioData), "Data must be audio data"
+    import numpy as np
+    import soundfile as sf
+    import torch
+    import whisper
+
+    if load_options or not hasattr(recognizer, "whisper_model") or recognizer.whisper_model.get(model) is None:
+        recognizer.whisper_model = getattr(recognizer, "whisper_model", {})
+        recognizer.whisper_model[model] = whisper.load_model(model, **load_options or {})
+
+    # 16 kHz https://github.com/openai/whisper/blob/28769fcfe50755a817ab922a7bc83483159600a9/whisper/audio.py#L98-L99
+    with recognizer.instrumentation.span("convert", format="wav"):
+        wav_bytes = audio_data.get_wav_data(convert_rate=16000)
+    wav_stream = io.BytesIO(wav_bytes)
+    audio_array, sampling_rate = sf.read(wav_stream)
+    audio_array = audio_array.astype(np.float32)
+
+    with recognizer.instrumentation.span("inference"):
+        result = recognizer.whisper_model[model].transcribe(
+            audio_array,
+            language=language,
+            task="translate" if translate else None,
+            fp16=torch.cuda.is_available(),
+            **transcribe_options
+        )
+
+    if show_dict:
+        return result
+    else:
+        return result["text"]
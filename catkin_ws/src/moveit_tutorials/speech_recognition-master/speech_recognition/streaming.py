@@ -0,0 +1,176 @@
+"""Helpers for sending audio to recognition services in pieces, without building the whole file in memory first."""
+
+import audioop
+import collections
+import struct
+import threading
+
+from .audio import AudioData
+
+DEFAULT_CHUNK_SIZE = 262144  # bytes of audio per chunk when streaming ``AudioData`` instances
+
+
+def wav_header(sample_rate, sample_width, frame_count=None, channels=1):
+    """
+    Returns the 44-byte RIFF/WAVE header for PCM audio with the given format.
+
+    If ``frame_count`` is ``None``, the total length is not known yet (for example, because the audio is still being captured), and the size fields are set to their maximum value, which streaming decoders interpret as "read until the end of the stream".
+    """
+    block_align = channels * sample_width
+    if frame_count is None:
+        data_size = 0xFFFFFFFF - 36
+    else:
+        data_size = frame_count * block_align
+    return b"".join([
+        b"RIFF", struct.pack("<I", 36 + data_size), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8),
+        b"data", struct.pack("<I", data_size),
+    ])
+
+
+class PCMConverter(object):
+    """
+    Converts mono PCM audio, laid out like ``AudioData.frame_data`` (little-endian, with unsigned samples for 8-bit audio), to another sample rate and width one piece at a time. The resampling state is carried over between pieces, so converting audio piece by piece gives the same result as converting it all at once.
+    """
+
+    def __init__(self, sample_rate, sample_width, convert_rate=None, convert_width=None):
+        assert convert_rate is None or convert_rate > 0, "Sample rate to convert to must be a positive integer"
+        assert convert_width is None or (convert_width % 1 == 0 and 1 <= convert_width <= 4), "Sample width to convert to must be between 1 and 4 inclusive"
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.output_rate = sample_rate if convert_rate is None else convert_rate
+        self.output_width = sample_width if convert_width is None else convert_width
+        self._ratecv_state = None
+
+    def convert(self, frame_data):
+        if self.output_rate == self.sample_rate and self.output_width == self.sample_width: return bytes(frame_data)
+        if self.sample_width == 1:  # 8-bit samples are unsigned, make them act like the signed samples of the other widths
+            frame_data = audioop.bias(frame_data, 1, -128)
+        if self.output_rate != self.sample_rate:
+            frame_data, self._ratecv_state = audioop.ratecv(frame_data, self.sample_width, 1, self.sample_rate, self.output_rate, self._ratecv_state)
+        if self.output_width != self.sample_width:
+            frame_data = audioop.lin2lin(frame_data, self.sample_width, self.output_width)
+        if self.output_width == 1:
+            frame_data = audioop.bias(frame_data, 1, 128)
+        return frame_data
+
+
+class LiveAudioStream(object):
+    """
+    Audio that is still being captured, which can be consumed (for example, by an upload running on another thread) while it is being written.
+
+    Usually, this is passed as the ``audio_stream`` argument of ``recognizer_instance.listen``, which writes the phrase into it as it is being captured and closes it once the phrase is over. It can also be filled manually, using ``start``, ``write`` and ``close``.
+
+    Each stream is meant to be consumed once, by a single reader. Chunks are discarded as soon as they are read, so memory use stays proportional to how far the reader lags behind the writer.
+    """
+
+    def __init__(self, sample_rate=None, sample_width=None):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self._chunks = collections.deque()
+        self._condition = threading.Condition()
+        self._started = sample_rate is not None and sample_width is not None
+        self._closed = False
+        self._error = None
+
+    def start(self, sample_rate, sample_width):
+        """
+        Sets the format of the audio that will be written, which readers wait for before they can produce any output.
+        """
+        with self._condition:
+            self.sample_rate, self.sample_width = sample_rate, sample_width
+            self._started = True
+            self._condition.notify_all()
+
+    def write(self, frame_data):
+        """
+        Appends ``frame_data``, laid out like ``AudioData.frame_data``, to the stream.
+        """
+        with self._condition:
+            assert self._started, "``start`` must be called before writing audio"
+            assert not self._closed, "stream has already been closed"
+            self._chunks.append(frame_data)
+            self._condition.notify_all()
+
+    def close(self, error=None):
+        """
+        Marks the end of the audio. If ``error`` is an exception instance, readers raise it instead of finishing normally.
+        """
+        with self._condition:
+            self._closed = True
+            self._error = error
+            self._condition.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def error(self):
+        """The exception the stream was closed with, if any."""
+        return self._error
+
+    def wait_started(self, timeout=None):
+        """
+        Blocks until the audio format is known, returning ``False`` if ``timeout`` seconds pass first.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._started or self._closed, timeout) and self._raise_error()
+
+    def read_chunks(self, max_size=None):
+        """
+        Yields the audio as soon as it's written, joining chunks that arrived since the last read (up to ``max_size`` bytes, if given). Finishes once the stream is closed and all audio was read.
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._chunks or self._closed)
+                self._raise_error()
+                if not self._chunks: return
+                pieces, size = [], 0
+                while self._chunks and (max_size is None or size < max_size):
+                    pieces.append(self._chunks.popleft())
+                    size += len(pieces[-1])
+            yield b"".join(pieces)
+
+    def _raise_error(self):
+        if self._error is not None: raise self._error
+        return True
+
+
+def iter_pcm_data(audio, chunk_size=DEFAULT_CHUNK_SIZE, convert_rate=None, convert_width=None):
+    """
+    Lazily yields the samples of ``audio`` (an ``AudioData`` or ``LiveAudioStream`` instance), converted to ``convert_rate`` and ``convert_width`` if specified, a chunk at a time.
+
+    ``AudioData`` is read in pieces of ``chunk_size`` bytes without copying the whole recording; a ``LiveAudioStream`` is read as soon as audio arrives, in pieces of at most ``chunk_size`` bytes.
+    """
+    assert chunk_size > 0, "``chunk_size`` must be a positive integer"
+    if isinstance(audio, LiveAudioStream):
+        audio.wait_started()
+        converter = PCMConverter(audio.sample_rate, audio.sample_width, convert_rate, convert_width)
+        for frame_data in audio.read_chunks(chunk_size):
+            yield converter.convert(frame_data)
+    else:
+        assert isinstance(audio, AudioData), "``audio`` must be audio data or a live audio stream"
+        converter = PCMConverter(audio.sample_rate, audio.sample_width, convert_rate, convert_width)
+        chunk_size -= chunk_size % audio.sample_width  # never split a sample across chunks
+        frame_data = memoryview(audio.frame_data)
+        for offset in range(0, len(frame_data), chunk_size):
+            yield converter.convert(frame_data[offset:offset + chunk_size])
+
+
+def iter_wav_data(audio, chunk_size=DEFAULT_CHUNK_SIZE, convert_rate=None, convert_width=None):
+    """
+    Lazily yields a WAV file containing ``audio`` (an ``AudioData`` or ``LiveAudioStream`` instance): first the header, then the samples as produced by ``iter_pcm_data``. Memory use doesn't depend on the length of the audio, and no temporary file is needed.
+
+    The header only states the length of the audio if it's known upfront, which is the case for ``AudioData`` that isn't being resampled.
+    """
+    if isinstance(audio, LiveAudioStream):
+        audio.wait_started()
+    sample_rate = audio.sample_rate if convert_rate is None else convert_rate
+    sample_width = audio.sample_width if convert_width is None else convert_width
+    frame_count = None
+    if isinstance(audio, AudioData) and sample_rate == audio.sample_rate:
+        frame_count = len(audio.frame_data) // audio.sample_width
+    yield wav_header(sample_rate, sample_width, frame_count)
+    for frame_data in iter_pcm_data(audio, chunk_size, convert_rate, convert_width):
+        yield frame_data
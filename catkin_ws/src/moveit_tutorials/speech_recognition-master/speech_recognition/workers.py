@@ -0,0 +1,105 @@
+"""Running CPU-bound engines in worker processes, so that they don't hold the GIL in the process that's capturing audio."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .audio import AudioData
+from .engines import ENGINE_MODULES
+from .exceptions import UnknownValueError
+
+_worker_recognizer = None  # the ``Recognizer`` of the current worker process, which keeps the models it loads
+
+
+def _initialize_worker(preload):
+    global _worker_recognizer
+    from . import Recognizer
+    _worker_recognizer = Recognizer()
+    silence = AudioData(b"\x00\x00" * 8000, 16000, 2)
+    for engine_name, kwargs in preload:  # the first call of an engine loads its model
+        try:
+            getattr(_worker_recognizer, "recognize_" + engine_name)(silence, **kwargs)
+        except UnknownValueError:
+            pass
+
+
+def _attach(name):
+    # attaches to the shared memory block ``name``, which the parent process unlinks once the call is done
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # before Python 3.13 it's always registered, but with the resource tracker that workers share with the parent, so that's harmless
+        return shared_memory.SharedMemory(name=name)
+
+
+def _recognize(engine_name, block_name, size, sample_rate, sample_width, args, kwargs):
+    block = _attach(block_name)
+    try:
+        frame_data = bytes(block.buf[:size])
+    finally:
+        block.close()
+    return getattr(_worker_recognizer, "recognize_" + engine_name)(AudioData(frame_data, sample_rate, sample_width), *args, **kwargs)
+
+
+class EngineProcessPool(object):
+    """
+    Runs ``recognize_*`` calls in a pool of ``max_workers`` worker processes (by default, one per CPU), and returns a ``concurrent.futures.Future`` for each result. Meant for engines that do their work in Python or hold the GIL while they run (Sphinx, Vosk and Whisper on the CPU), which would otherwise starve the thread capturing audio, such as the one behind ``recognizer_instance.listen_in_background``::
+
+        pool = EngineProcessPool(preload=[("whisper", {"model": "base"})])  # from speech_recognition.workers
+        stop = r.listen_in_background(m, lambda r, audio: pool.recognize_whisper(audio, model="base").add_done_callback(show))
+
+    Each worker has its own ``Recognizer``, which keeps the models it loads between calls. ``preload`` is a list of ``(engine name, keyword arguments)`` pairs that each worker calls once on silence when it starts, so that the models are loaded before the first real call rather than during it.
+
+    The audio is handed to the worker through a ``multiprocessing.shared_memory`` block rather than pickled into the pool's pipe, and the block is removed once the call is done. The other arguments and the result are pickled, so they must be picklable.
+
+    Workers are started with ``mp_context`` (a ``multiprocessing`` context), by default one that spawns fresh processes, since forking a process whose other threads are using audio devices isn't safe.
+    """
+
+    def __init__(self, max_workers=None, preload=(), mp_context=None):
+        for engine_name, _ in preload:
+            assert engine_name in ENGINE_MODULES, "unknown engine {!r}".format(engine_name)
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=mp_context or multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker, initargs=(list(preload),),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, engine_name, audio_data, *args, **kwargs):
+        """
+        Starts ``recognizer_instance.recognize_<engine_name>(audio_data, *args, **kwargs)`` in a worker process, and returns a ``Future`` for its result. Exceptions raised by the engine are raised by the future's ``result()``.
+        """
+        assert engine_name in ENGINE_MODULES, "unknown engine {!r}".format(engine_name)
+        assert isinstance(audio_data, AudioData), "``audio_data`` must be audio data"
+        size = len(audio_data.frame_data)
+        block = shared_memory.SharedMemory(create=True, size=max(1, size))
+        try:
+            block.buf[:size] = audio_data.frame_data
+            future = self._executor.submit(_recognize, engine_name, block.name, size, audio_data.sample_rate, audio_data.sample_width, args, kwargs)
+        except BaseException:
+            block.close()
+            block.unlink()
+            raise
+
+        def release(future):
+            block.close()
+            block.unlink()
+        future.add_done_callback(release)
+        return future
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def _pool_method(engine_name):
+    def method(self, audio_data, *args, **kwargs):
+        return self.submit(engine_name, audio_data, *args, **kwargs)
+    method.__name__ = "recognize_" + engine_name
+    method.__doc__ = "Starts ``recognizer_instance.recognize_{}`` in a worker process, with the same arguments, and returns a ``Future`` for its result.".format(engine_name)
+    return method
+
+
+for _engine_name in ENGINE_MODULES: setattr(EngineProcessPool, "recognize_" + _engine_name, _pool_method(_engine_name))
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import unittest
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import speech_recognition as sr
+from speech_recognition.recognizers.amazon import MultipartWavUpload, TranscribeJob, TranscribePipeline
+
+try:
+    import botocore
+except ImportError:
+    botocore = None
+
+
+class FakeS3(object):
+    """Records uploads the way S3 would assemble them."""
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.buckets = set()
+
+    def head_bucket(self, Bucket):
+        from botocore.exceptions import ClientError
+        if Bucket not in self.buckets: raise ClientError({"Error": {"Code": "404"}}, "HeadBucket")
+
+    def create_bucket(self, Bucket):
+        self.buckets.add(Bucket)
+
+    def delete_object(self, Bucket, Key):
+        del self.objects[Bucket, Key]
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[Bucket, Key] = Body
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        upload_id = "upload-{}".format(len(self.uploads))
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": "etag-{}".format(PartNumber)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[Bucket, Key] = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+
+
+class TestMultipartWavUpload(unittest.TestCase):
+    def upload(self, audio, write_size):
+        s3 = FakeS3()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            upload = MultipartWavUpload(s3, "bucket", "key.wav", audio.sample_rate, audio.sample_width, executor)
+            raw_data = audio.frame_data
+            for i in range(0, len(raw_data), write_size):
+                upload.write(raw_data[i:i + write_size])
+            upload.finish()
+        return s3
+
+    def assertSameWav(self, wav_data, audio):
+        with wave.open(io.BytesIO(wav_data), "rb") as wav_reader:
+            self.assertEqual(wav_reader.getframerate(), audio.sample_rate)
+            self.assertEqual(wav_reader.getsampwidth(), audio.sample_width)
+            self.assertEqual(wav_reader.readframes(wav_reader.getnframes()), audio.frame_data)
+
+    def test_small_audio_uses_single_put(self):
+        audio = sr.AudioData(bytes(range(256)) * 64, 16000, 2)
+        s3 = self.upload(audio, 1000)
+        self.assertEqual(s3.uploads, {})
+        self.assertSameWav(s3.objects["bucket", "key.wav"], audio)
+
+    def test_8_bit_audio(self):
+        audio = sr.AudioData(bytes(range(256)) * 64, 16000, 1)
+        s3 = self.upload(audio, 1000)
+        self.assertSameWav(s3.objects["bucket", "key.wav"], audio)
+
+    def test_large_audio_uses_multipart_upload(self):
+        audio = sr.AudioData(bytes(range(256)) * (13 * 1024 * 4), 16000, 2)  # 13 MiB, so three parts
+        s3 = self.upload(audio, 1024 * 1024 - 2)
+        self.assertEqual(len(s3.objects), 1)
+        self.assertSameWav(s3.objects["bucket", "key.wav"], audio)
+
+
+class FakePipeline(object):
+    """Stands in for the ``TranscribePipeline`` that ``recognize_amazon`` would build."""
+    def __init__(self, bucket_name):
+        self.bucket_name = bucket_name
+        self.polled = []
+        self.closed = False
+
+    def submit(self, audio_data, job_name=None):
+        return TranscribeJob(job_name or "job-1", "job-1.wav")
+
+    def poll(self, job):
+        self.polled.append(job.job_name)
+        return None
+
+    def close(self, wait=True):
+        self.closed = True
+
+
+class TestRecognizeAmazon(unittest.TestCase):
+    def test_jobs_carry_their_bucket(self):
+        r = sr.Recognizer()
+        generated, named = FakePipeline("speech-recognition-generated"), FakePipeline("speech-recognition-generated")
+        r.engine_clients.get(("transcribe-pipeline", None, None, None, None), lambda: generated, close=lambda pipeline: pipeline.close())
+        r.engine_clients.get(("transcribe-pipeline", "speech-recognition-generated", None, None, None), lambda: named, close=lambda pipeline: pipeline.close())
+        with self.assertRaises(sr.TranscriptionNotReady) as context:
+            r.recognize_amazon(sr.AudioData(b"\x00\x00" * 1600, 16000, 2))
+        exc = context.exception
+        self.assertEqual((exc.job_name, exc.file_key, exc.bucket_name), ("job-1", "job-1.wav", "speech-recognition-generated"))
+
+        self.assertRaises(sr.RequestError, r.recognize_amazon, None, job_name=exc.job_name)  # another process wouldn't know the generated bucket
+        self.assertRaises(sr.TranscriptionNotReady, r.recognize_amazon, None, job_name=exc.job_name, file_key=exc.file_key, bucket_name=exc.bucket_name)
+        self.assertEqual(named.polled, ["job-1"])
+
+        r.engine_clients.clear()
+        self.assertTrue(generated.closed and named.closed)
+
+
+class CompletedTranscribe(object):
+    """Every job has already completed."""
+    def get_transcription_job(self, TranscriptionJobName):
+        return {"TranscriptionJob": {"TranscriptionJobStatus": "COMPLETED", "Transcript": {"TranscriptFileUri": "https://transcripts/" + TranscriptionJobName}}}
+
+    def delete_transcription_job(self, TranscriptionJobName):
+        pass
+
+
+@unittest.skipIf(botocore is None, "botocore is not installed")
+class TestTranscribePipeline(unittest.TestCase):
+    def pipeline(self, s3):
+        r = sr.Recognizer()
+        services = {"s3": s3, "transcribe": CompletedTranscribe()}
+        r.engine_clients.aws_client = lambda service_name, *args: services[service_name]
+        pipeline = TranscribePipeline(r, "bucket")
+        self.addCleanup(pipeline.close)
+        return pipeline
+
+    def test_bucket_of_another_account_is_rejected(self):
+        from botocore.exceptions import ClientError
+
+        class TakenS3(FakeS3):
+            def create_bucket(self, Bucket):
+                raise ClientError({"Error": {"Code": "BucketAlreadyExists"}}, "CreateBucket")
+        self.assertRaises(sr.RequestError, self.pipeline(TakenS3()).ensure_bucket)
+
+    def test_transcript_download_has_timeout(self):
+        s3 = FakeS3()
+        s3.objects["bucket", "job-1.wav"] = b""
+        pipeline = self.pipeline(s3)
+        pipeline.recognizer.operation_timeout = 7
+        timeouts = []
+
+        def urlopen(url, timeout=None):
+            timeouts.append(timeout)
+            return io.BytesIO(json.dumps({"results": {"transcripts": [{"transcript": "one two"}], "items": []}}).encode("utf-8"))
+        with mock.patch("speech_recognition.recognizers.amazon.urlopen", urlopen):
+            self.assertEqual(pipeline.poll(TranscribeJob("job-1", "job-1.wav")), ("one two", 0.5))
+        self.assertEqual(timeouts, [7])
+
+
+if __name__ == "__main__":
+    unittest.main()
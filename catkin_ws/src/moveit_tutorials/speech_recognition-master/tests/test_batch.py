@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import speech_recognition as sr
+from speech_recognition import batch
+from speech_recognition.recognizers.keywords import KeywordTemplates
+
+from tests.test_keywords import WORDS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+_transcribe_file = batch.transcribe_file
+
+
+def transcribe_or_fail(path, engine_name, options):
+    """Transcribes like ``batch.transcribe_file``, except that the worker dies on ``one.wav``, and the result for ``three.wav`` can't be sent back."""
+    if os.path.basename(path) == "one.wav": os._exit(1)
+    record = _transcribe_file(path, engine_name, options)
+    if os.path.basename(path) == "three.wav": record["transcript"] = threading.Lock()
+    return record
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            audio = sr.Recognizer().record(source)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.templates = os.path.join(self.directory, "templates")
+        for word, (start, end) in WORDS.items():
+            KeywordTemplates(self.templates).enroll(word, audio.get_segment(start, end))
+
+        self.logs = os.path.join(self.directory, "logs")
+        os.makedirs(os.path.join(self.logs, "day 2"))
+        for word, (start, end) in WORDS.items():
+            with open(os.path.join(self.logs, "day 2" if word == "three" else "", word + ".wav"), "wb") as f:
+                f.write(audio.get_segment(start - 40, end + 40).get_wav_data())
+        with open(os.path.join(self.logs, "silence.wav"), "wb") as f:
+            f.write(sr.AudioData(b"\x00\x00" * 8000, 16000, 2).get_wav_data())
+        with open(os.path.join(self.logs, "notes.txt"), "w") as f:
+            f.write("not audio")
+        self.output = os.path.join(self.directory, "results.jsonl")
+
+    def run_batch(self, *paths):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            batch.main(list(paths) + ["--engine", "keywords", "--option", "templates=" + self.templates, "--output", self.output, "--workers", "2"])
+        return stderr.getvalue()
+
+    def results(self):
+        results = []
+        with open(self.output) as f:
+            for line in f:
+                if line.startswith('{"file": "cut sho'): continue
+                results.append(json.loads(line))
+        return results
+
+    def test_find_audio_files(self):
+        expected = sorted(os.path.join(self.logs, name) for name in ("one.wav", "two.wav", "silence.wav", os.path.join("day 2", "three.wav")))
+        self.assertEqual(batch.find_audio_files([self.logs]), expected)
+        self.assertEqual(batch.find_audio_files([os.path.join(self.logs, "**", "t*.wav"), os.path.join(self.logs, "two.wav")]), [os.path.join(self.logs, "day 2", "three.wav"), os.path.join(self.logs, "two.wav")])
+
+    def test_transcribes_files_to_jsonl(self):
+        report = self.run_batch(self.logs)
+        results = {os.path.basename(record["file"]): record for record in self.results()}
+        self.assertEqual({name: record.get("transcript") for name, record in results.items()}, {"one.wav": "one", "two.wav": "two", "three.wav": "three", "silence.wav": None})
+        self.assertEqual(results["silence.wav"]["error"], "UnknownValueError")
+        self.assertAlmostEqual(results["two.wav"]["duration"], 0.58, delta=0.01)
+        self.assertIn("3 transcribed, 1 failed, 0 skipped", report)
+        self.assertIn("files/s", report)
+        self.assertIn("real-time factor", report)
+
+    def test_interrupted_runs_resume(self):
+        self.run_batch(os.path.join(self.logs, "one.wav"))
+        with open(self.output, "a") as f:
+            f.write('{"file": "cut sho')  # interrupted in the middle of a line
+        report = self.run_batch(self.logs)
+        self.assertIn("2 transcribed, 1 failed, 1 skipped", report)
+        self.assertEqual(sorted(os.path.basename(record["file"]) for record in self.results()[1:]), ["silence.wav", "three.wav", "two.wav"])
+
+        report = self.run_batch(self.logs)
+        self.assertIn("0 transcribed, 0 failed, 4 skipped", report)
+        self.assertEqual(batch.completed_files(self.output, retry_failed=True), set(batch.find_audio_files([self.logs])) - {os.path.join(self.logs, "silence.wav")})
+
+    def test_failed_workers_get_error_records(self):
+        copies = [os.path.join(self.logs, "two {}.wav".format(i)) for i in range(4)]
+        for copy in copies: shutil.copy(os.path.join(self.logs, "two.wav"), copy)
+        paths = [os.path.join(self.logs, "one.wav")] + copies + [os.path.join(self.logs, "day 2", "three.wav")]
+        with mock.patch.object(batch, "transcribe_file", transcribe_or_fail):
+            summary = batch.transcribe_files(paths, "keywords", self.output, {"templates": self.templates}, workers=1)
+        results = {os.path.basename(record["file"]): record for record in self.results()}
+        self.assertEqual(sorted(results), ["one.wav", "three.wav", "two 0.wav", "two 1.wav", "two 2.wav", "two 3.wav"])
+        for name in ("one.wav", "two 0.wav", "two 1.wav", "two 2.wav"):  # the files queued when the worker died
+            self.assertEqual(results[name]["error"], "BrokenProcessPool")
+        self.assertEqual(results["two 3.wav"]["transcript"], "two")  # by a new worker
+        self.assertEqual(results["three.wav"]["error"], "TypeError")
+        self.assertEqual((summary["transcribed"], summary["failed"]), (1, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import unittest
+
+import speech_recognition as sr
+
+ENGLISH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")
+
+
+class FailingSource(sr.AudioSource):
+    SAMPLE_RATE, SAMPLE_WIDTH, CHUNK = 16000, 2, 160
+
+    class Stream(object):
+        def __init__(self):
+            self.reads = 0
+
+        def read(self, size):
+            self.reads += 1
+            if self.reads > 3: raise IOError("device disconnected")
+            return b"\x01\x00" * size
+
+    def __init__(self):
+        self.stream = None
+
+    def __enter__(self):
+        self.stream = FailingSource.Stream()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+
+class TestAudioBus(unittest.TestCase):
+    def setUp(self):
+        with sr.AudioFile(ENGLISH) as source:
+            self.audio = sr.Recognizer().record(source)
+
+    def test_every_subscriber_gets_all_audio(self):
+        bus = sr.AudioBus(sr.AudioFile(ENGLISH))
+        subscriptions = [bus.subscribe(max_lag=60) for _ in range(3)]
+        with bus:
+            with subscriptions[0] as source: whole = sr.Recognizer().record(source)
+            with subscriptions[1] as source: odd_reads = b"".join(iter(lambda: source.stream.read(1000), b""))
+        self.assertEqual(whole.frame_data, self.audio.frame_data)
+        self.assertEqual(odd_reads, self.audio.frame_data)
+
+    def test_chunks_are_shared_not_copied(self):
+        bus = sr.AudioBus(sr.AudioFile(ENGLISH))
+        first, second = bus.subscribe(max_lag=60), bus.subscribe(max_lag=60)
+        with bus, first as a, second as b:
+            self.assertIs(a.stream.read(a.CHUNK), b.stream.read(b.CHUNK))
+
+    def test_slow_subscriber_is_limited_to_its_lag(self):
+        bus = sr.AudioBus(sr.AudioFile(ENGLISH))
+        fast, slow = bus.subscribe(max_lag=60), bus.subscribe(max_lag=0.5)
+        with bus:
+            with fast as source: audio = sr.Recognizer().record(source)  # the reader runs ahead of ``slow`` meanwhile
+            with slow as source: late = sr.Recognizer().record(source)
+        self.assertEqual(audio.frame_data, self.audio.frame_data)
+        self.assertGreater(slow.dropped_frames, 0)
+        self.assertLessEqual(len(late.frame_data), (0.5 * source.SAMPLE_RATE + source.CHUNK) * source.SAMPLE_WIDTH)
+        self.assertTrue(self.audio.frame_data.endswith(late.frame_data))
+
+    def test_listen_on_subscriptions_from_several_threads(self):
+        bus = sr.AudioBus(sr.AudioFile(ENGLISH))
+        subscriptions = [bus.subscribe(max_lag=60) for _ in range(2)]
+        results = []
+
+        def listen(subscription):
+            with subscription as source: results.append(sr.Recognizer().listen(source).frame_data)
+        threads = [threading.Thread(target=listen, args=(subscription,)) for subscription in subscriptions]
+        with bus:
+            for thread in threads: thread.start()
+            for thread in threads: thread.join()
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0], results[1])
+
+    def test_source_errors_reach_subscribers(self):
+        bus = sr.AudioBus(FailingSource())
+        subscription = bus.subscribe()
+        with bus, subscription as source:
+            self.assertEqual(len(source.stream.read(480)), 960)  # the audio before the failure
+            self.assertRaises(IOError, source.stream.read, 160)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.engines import engine
+
+
+class CountingRecognizer(sr.Recognizer):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.release = threading.Event()  # lets calls with the language "slow" finish
+
+    @engine("fake")
+    def recognize_fake(self, audio_data, language="en-US"):
+        self.calls += 1
+        if language == "slow": self.release.wait(5)
+        if audio_data.frame_data == b"\x00\x00":
+            raise sr.UnknownValueError()
+        return "{} ({})".format(len(audio_data.frame_data), language), 0.5
+
+
+class TestTranscriptCache(unittest.TestCase):
+    def setUp(self):
+        self.audio = sr.AudioData(b"\x01\x02" * 100, 16000, 2)
+
+    def test_key_depends_on_audio_engine_and_options(self):
+        key = sr.TranscriptCache.make_key("google", self.audio, (), {"language": "en-US"})
+        self.assertEqual(key, sr.TranscriptCache.make_key("google", sr.AudioData(b"\x01\x02" * 100, 16000, 2), (), {"language": "en-US"}))
+        self.assertNotEqual(key, sr.TranscriptCache.make_key("wit", self.audio, (), {"language": "en-US"}))
+        self.assertNotEqual(key, sr.TranscriptCache.make_key("google", self.audio, (), {"language": "fr-FR"}))
+        self.assertNotEqual(key, sr.TranscriptCache.make_key("google", sr.AudioData(b"\x01\x02" * 100, 8000, 2), (), {"language": "en-US"}))
+
+    def test_key_matches_arguments_to_parameters(self):
+        method = CountingRecognizer.recognize_fake.__wrapped__
+        key = sr.TranscriptCache.make_key("fake", self.audio, ("fr-FR",), {}, method)
+        self.assertEqual(key, sr.TranscriptCache.make_key("fake", self.audio, (), {"language": "fr-FR"}, method))
+        self.assertEqual(sr.TranscriptCache.make_key("fake", self.audio, (), {}, method), sr.TranscriptCache.make_key("fake", self.audio, ("en-US",), {}, method))
+        self.assertNotEqual(key, sr.TranscriptCache.make_key("fake", self.audio, (), {}, method))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = sr.TranscriptCache(max_entries=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: None)  # "a" is now the most recently used
+        cache.get_or_compute("c", lambda: 3)
+        self.assertEqual(cache.get_or_compute("a", lambda: "recomputed"), 1)
+        self.assertEqual(cache.get_or_compute("b", lambda: "recomputed"), "recomputed")
+
+    def test_disk_tier_survives_new_instances(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        sr.TranscriptCache(directory=directory).get_or_compute("key", lambda: ("hello", 0.9))
+        cache = sr.TranscriptCache(directory=directory)
+        self.assertEqual(cache.get_or_compute("key", lambda: None), ("hello", 0.9))
+        self.assertEqual(cache.hits, 1)
+
+    def test_concurrent_requests_are_sent_once(self):
+        cache = sr.TranscriptCache()
+        calls, results = [], []
+
+        def slow_compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "transcript"
+
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("key", slow_compute))) for _ in range(8)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["transcript"] * 8)
+        self.assertEqual((cache.misses, cache.deduplicated), (1, 7))
+
+    def test_waiting_for_identical_request_honours_deadline(self):
+        cache, release = sr.TranscriptCache(), threading.Event()
+        leader = threading.Thread(target=cache.get_or_compute, args=("key", lambda: release.wait(5)))
+        leader.start()
+        while not cache._in_flight: time.sleep(0.01)
+        start = time.monotonic()
+        self.assertRaises(sr.DeadlineExceeded, cache.get_or_compute, "key", lambda: None, 0.1)
+        self.assertLess(time.monotonic() - start, 1)
+        release.set()
+        leader.join()
+
+        r = CountingRecognizer()
+        r.transcript_cache = cache
+        leader = threading.Thread(target=r.recognize_fake, args=(self.audio, "slow"))
+        leader.start()
+        while not cache._in_flight: time.sleep(0.01)
+        with sr.deadline(0.1):
+            self.assertRaises(sr.DeadlineExceeded, r.recognize_fake, self.audio, language="slow")
+        r.release.set()
+        leader.join()
+        self.assertEqual(r.calls, 1)
+
+    def test_slow_disk_reads_only_hold_up_their_own_key(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cache, reading, release = sr.TranscriptCache(directory=directory), threading.Event(), threading.Event()
+        load = cache._load
+
+        def slow_load(key):
+            if key == "slow":
+                reading.set()
+                release.wait(5)
+            return load(key)
+        cache._load = slow_load
+        thread = threading.Thread(target=cache.get_or_compute, args=("slow", lambda: "slow result"))
+        thread.start()
+        reading.wait(5)
+        self.assertEqual(cache.get_or_compute("fast", lambda: "fast result"), "fast result")
+        self.assertFalse(release.is_set())  # answered while the other key was still being read
+        release.set()
+        thread.join()
+
+    def test_recognizer_uses_cache_when_enabled(self):
+        r = CountingRecognizer()
+        self.assertEqual(r.recognize_fake(self.audio), r.recognize_fake(self.audio))
+        self.assertEqual(r.calls, 2)
+
+        r.transcript_cache = sr.TranscriptCache()
+        self.assertEqual(r.recognize_fake(self.audio), ("200 (en-US)", 0.5))
+        self.assertEqual(r.recognize_fake(self.audio), ("200 (en-US)", 0.5))
+        self.assertEqual(r.calls, 3)
+        self.assertEqual(r.recognize_fake(self.audio, language="fr-FR"), ("200 (fr-FR)", 0.5))
+        self.assertEqual(r.calls, 4)
+        self.assertEqual(r.recognize_fake(self.audio, "fr-FR"), ("200 (fr-FR)", 0.5))
+        self.assertEqual(r.recognize_fake(self.audio, language="en-US"), ("200 (en-US)", 0.5))
+        self.assertEqual(r.calls, 4)
+
+    def test_failures_are_not_cached(self):
+        r = CountingRecognizer()
+        r.transcript_cache = sr.TranscriptCache()
+        silence = sr.AudioData(b"\x00\x00", 16000, 2)
+        for _ in range(2):
+            self.assertRaises(sr.UnknownValueError, r.recognize_fake, silence)
+        self.assertEqual(r.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
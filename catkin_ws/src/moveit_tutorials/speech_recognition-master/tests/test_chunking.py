@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import unittest
+
+import speech_recognition as sr
+
+ENGLISH_WAV = os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")
+
+
+class FakeSource(object):
+    SAMPLE_RATE = 1000
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+        self.reads = []
+        read = self.stream.read
+        self.stream.read = lambda size: self.reads.append(size) or read(size * self.SAMPLE_WIDTH)
+
+
+class TestAdaptiveChunking(unittest.TestCase):
+    def test_frames_are_independent_of_read_size(self):
+        chunking = sr.AdaptiveChunking(target_latency=0.05, frame_duration=0.01)
+        source = FakeSource(bytes(range(250)) * 2)
+        reader = chunking.reader(source)
+        frames = [reader.read() for _ in range(26)]
+        self.assertEqual(source.reads[0], 50)
+        self.assertTrue(all(len(frame) == 20 for frame in frames[:25]))
+        self.assertEqual(frames[25], b"")
+        self.assertEqual(b"".join(frames), bytes(range(250)) * 2)
+
+    def test_unused_audio_is_kept_for_next_reader(self):
+        chunking = sr.AdaptiveChunking(target_latency=0.05, frame_duration=0.01)
+        source = FakeSource(bytes(range(200)))
+        reader = chunking.reader(source)
+        first = reader.read()
+        reader.close()
+        rest = chunking.reader(source)
+        self.assertEqual(first + b"".join(iter(rest.read, b"")), bytes(range(200)))
+
+    def test_read_size_adapts_to_processing_cost(self):
+        chunking = sr.AdaptiveChunking(target_latency=0.05, frame_duration=0.01, max_load=0.5)
+        for _ in range(50): chunking.record(chunking.read_duration, 0.0001)  # cheap processing: read close to the target
+        self.assertAlmostEqual(chunking.read_duration, 0.05, places=2)
+        self.assertLess(chunking.effective_latency, 0.051)
+        for _ in range(50): chunking.record(chunking.read_duration, 0.04)  # expensive processing: read enough to keep up
+        self.assertGreaterEqual(chunking.read_duration, 0.079)
+        self.assertEqual(chunking.read_size(16000) % chunking.frame_size(16000), 0)
+
+    def test_listen_detects_speech_in_short_frames(self):
+        r = sr.Recognizer()
+        r.dynamic_energy_threshold = False
+        with sr.AudioFile(ENGLISH_WAV) as source:
+            chunked = r.listen(source)
+        r.chunking = sr.AdaptiveChunking(target_latency=0.03, frame_duration=0.01)
+        with sr.AudioFile(ENGLISH_WAV) as source:
+            framed = r.listen(source)
+        self.assertEqual(framed.sample_rate, chunked.sample_rate)
+        self.assertAlmostEqual(len(framed.frame_data), len(chunked.frame_data), delta=2 * 4096 * chunked.sample_width)
+
+    def test_audio_file_chunk_size(self):
+        with sr.AudioFile(ENGLISH_WAV, chunk_size=512) as source:
+            self.assertEqual(source.CHUNK, 512)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import importlib.util
+import threading
+import time
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.clients import EngineClientRegistry
+
+
+class TestEngineClientRegistry(unittest.TestCase):
+    def test_builds_each_client_once(self):
+        registry = EngineClientRegistry()
+        calls = []
+        first = registry.get(("svc", "key", "region"), lambda: calls.append(1) or object())
+        second = registry.get(("svc", "key", "region"), lambda: calls.append(1) or object())
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+
+        other_region = registry.get(("svc", "key", "other-region"), lambda: calls.append(1) or object())
+        self.assertIsNot(first, other_region)
+        self.assertEqual(len(calls), 2)
+
+    def test_concurrent_first_use_builds_once(self):
+        registry = EngineClientRegistry()
+        calls = []
+
+        def slow_factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("svc", slow_factory))) for _ in range(8)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(map(id, results))), 1)
+
+    def test_clear(self):
+        registry = EngineClientRegistry()
+        first = registry.get("svc", object)
+        registry.clear()
+        self.assertIsNot(first, registry.get("svc", object))
+
+    def test_clear_closes_clients(self):
+        registry = EngineClientRegistry()
+        closed = []
+        client = registry.get("pipeline", object, close=closed.append)
+        registry.get("plain", object)
+        registry.clear()
+        self.assertEqual(closed, [client])
+
+    def test_client_built_during_clear_is_rebuilt(self):
+        registry = EngineClientRegistry()
+        building, cleared = threading.Event(), threading.Event()
+        built, closed = [], []
+
+        def factory():
+            built.append("stale" if not built else "fresh")
+            if len(built) == 1:
+                building.set()
+                cleared.wait(5)
+            return built[-1]
+        results = []
+        thread = threading.Thread(target=lambda: results.append(registry.get("svc", factory, close=closed.append)))
+        thread.start()
+        building.wait(5)
+        registry.clear()
+        cleared.set()
+        thread.join()
+        self.assertEqual((results, closed), (["fresh"], ["stale"]))
+        self.assertEqual(registry.get("svc", lambda: "other"), "fresh")
+        registry.clear()
+        self.assertEqual(closed, ["stale", "fresh"])
+
+    def test_recognizer_has_registry(self):
+        self.assertIsInstance(sr.Recognizer().engine_clients, EngineClientRegistry)
+
+    @unittest.skipUnless(importlib.util.find_spec("boto3"), "requires boto3")
+    def test_aws_clients_use_local_endpoint(self):
+        registry = EngineClientRegistry(endpoint_urls={"lex-runtime": "http://127.0.0.1:4566"})
+        client = registry.aws_client("lex-runtime", "AKIDEXAMPLE", "secret", "us-east-1")
+        self.assertEqual(client.meta.endpoint_url, "http://127.0.0.1:4566")
+        self.assertIs(client, registry.aws_client("lex-runtime", "AKIDEXAMPLE", "secret", "us-east-1"))
+        self.assertIsNot(client, registry.aws_client("lex-runtime", "AKIDEXAMPLE", "secret", "eu-west-1"))
+        self.assertIsNot(client, registry.aws_client("lex-runtime", "AKIDEXAMPLE", "other secret", "us-east-1"))
+        self.assertNotIn("secret", repr(list(registry._clients)))  # only digests of the secrets are kept in the keys
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.daemon import RecognitionClient, RecognitionDaemon
+from speech_recognition.recognizers.keywords import KeywordTemplates
+
+from tests.test_keywords import WORDS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestRecognitionDaemon(unittest.TestCase):
+    def setUp(self):
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            self.audio = sr.Recognizer().record(source)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        templates = KeywordTemplates(os.path.join(self.directory, "templates"))
+        for word, (start, end) in WORDS.items():
+            templates.enroll(word, self.audio.get_segment(start, end))
+
+        self.daemon = RecognitionDaemon(os.path.join(self.directory, "daemon.sock"), batch_window=0.05).start()
+        self.addCleanup(self.daemon.stop)
+        self.client = RecognitionClient(self.daemon.path, operation_timeout=10)
+        self.addCleanup(self.client.close)
+
+    def test_same_results_as_local_recognizer(self):
+        templates = os.path.join(self.directory, "templates")
+        phrase = self.audio.get_segment(1000, 1600)
+        self.assertEqual(self.client.recognize_keywords(phrase, templates), sr.Recognizer().recognize_keywords(phrase, templates))
+        self.assertEqual(self.client.recognize_keywords(phrase, templates, show_all=True), [list(pair) for pair in sr.Recognizer().recognize_keywords(phrase, templates, show_all=True)])
+
+    def test_engine_exceptions_are_raised_by_client(self):
+        templates = os.path.join(self.directory, "templates")
+        self.assertRaises(sr.UnknownValueError, self.client.recognize_keywords, sr.AudioData(b"\x00\x00" * 16000, 16000, 2), templates)
+        self.assertRaises(sr.RequestError, self.client.recognize_keywords, self.audio, os.path.join(self.directory, "missing"))
+
+    def test_requests_from_several_clients_are_batched(self):
+        templates = os.path.join(self.directory, "templates")
+        results = {}
+
+        def recognize(word):
+            client = RecognitionClient(self.daemon.path)
+            try:
+                start, end = WORDS[word]
+                results[word] = client.recognize_keywords(self.audio.get_segment(start - 40, end + 40), templates)
+            finally:
+                client.close()
+        threads = [threading.Thread(target=recognize, args=(word,)) for word in WORDS]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(results, {word: word for word in WORDS})
+        self.assertEqual(self.daemon.requests, 3)
+        self.assertLess(self.daemon.batches, 3)
+
+    def test_unreachable_daemon(self):
+        client = RecognitionClient(os.path.join(self.directory, "nothing.sock"))
+        self.assertRaises(sr.RequestError, client.recognize_keywords, self.audio, "templates")
+
+    def test_socket_belongs_to_user(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.daemon.path).st_mode), 0o600)
+
+    def test_running_daemon_keeps_its_socket(self):
+        self.assertRaises(OSError, RecognitionDaemon(self.daemon.path, recognizer=self.daemon.recognizer).start)
+        self.assertEqual(self.client.recognize_keywords(self.audio.get_segment(*WORDS["one"]), os.path.join(self.directory, "templates")), "one")
+
+    def test_stale_socket_is_replaced(self):
+        path = os.path.join(self.directory, "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)  # never listened on, like the socket of a daemon that was killed
+        stale.close()
+        with RecognitionDaemon(path, recognizer=self.daemon.recognizer):
+            client = RecognitionClient(path, operation_timeout=10)
+            self.addCleanup(client.close)
+            self.assertEqual(client.recognize_keywords(self.audio.get_segment(*WORDS["two"]), os.path.join(self.directory, "templates")), "two")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+import contextlib
+import math
+import struct
+import threading
+import time
+import unittest
+
+from speech_recognition import devices
+
+
+def tone(frames):
+    return b"".join(struct.pack("<h", int(3000 * math.sin(i / 5.0))) for i in range(frames))
+
+
+class FakeStream(object):
+    def __init__(self, module, device):
+        self.module, self.device = module, device
+        self.ready_at = time.monotonic() + device.get("delay", 0)  # when the next chunk has been recorded
+
+    def get_read_available(self):
+        return 1024 if time.monotonic() >= self.ready_at else 0
+
+    def read(self, frames, exception_on_overflow=True):
+        time.sleep(max(0, self.ready_at - time.monotonic()))
+        self.ready_at += self.device.get("delay", 0)
+        if self.device.get("fail_reads", 0) > 0:
+            self.device["fail_reads"] -= 1
+            raise IOError("device disconnected")
+        if "counter" in self.device:  # consecutive sample values, for checking that no audio was lost
+            start = self.device["counter"]
+            self.device["counter"] += frames
+            return b"".join(struct.pack("<h", (start + i) % 32768) for i in range(frames))
+        return tone(frames) if self.device.get("sound") else b"\x00\x00" * frames
+
+    def is_stopped(self):
+        return True
+
+    def close(self):
+        with self.module.portaudio_call(): pass
+
+
+class FakePyAudioModule(object):
+    """Stands in for the ``pyaudio`` module, with the devices described by ``devices``."""
+    paInt16 = 8
+
+    @staticmethod
+    def get_sample_size(format):
+        return 2
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.instances = 0
+        self.open_instances = 0
+        self.calls, self.most_calls = 0, 0  # PortAudio calls in progress, and the most at once
+        self.calls_lock = threading.Lock()
+        module = self
+
+        class PyAudio(object):
+            def __init__(self):
+                module.instances += 1
+                module.open_instances += 1
+
+            def get_device_count(self):
+                with module.portaudio_call(): return len(module.devices)
+
+            def get_device_info_by_index(self, index):
+                with module.portaudio_call(): return {"name": module.devices[index]["name"], "defaultSampleRate": 16000.0, "maxInputChannels": module.devices[index].get("channels", 1)}
+
+            def get_default_input_device_info(self):
+                return self.get_device_info_by_index(0)
+
+            def open(self, input_device_index, **kwargs):
+                with module.portaudio_call():
+                    device = module.devices[input_device_index or 0]
+                    if device.get("broken"): raise IOError("device unavailable")
+                    return FakeStream(module, device)
+
+            def terminate(self):
+                module.open_instances -= 1
+
+        self.PyAudio = PyAudio
+
+    @contextlib.contextmanager
+    def portaudio_call(self):
+        with self.calls_lock:
+            self.calls += 1
+            self.most_calls = max(self.most_calls, self.calls)
+        try:
+            time.sleep(0.001)  # long enough for overlapping calls to be noticed
+            yield
+        finally:
+            with self.calls_lock: self.calls -= 1
+
+
+class TestPyAudioHost(unittest.TestCase):
+    def test_instance_is_shared_until_last_release(self):
+        module, host = FakePyAudioModule([]), devices.PyAudioHost()
+        first = host.acquire(module)
+        with host.borrow(module) as second:
+            self.assertIs(first, second)
+        self.assertEqual(module.open_instances, 1)
+        host.release()
+        self.assertEqual((module.instances, module.open_instances), (1, 0))
+        host.acquire(module)
+        self.assertEqual(module.instances, 2)
+        host.release()
+
+
+class TestFindWorkingMicrophones(unittest.TestCase):
+    def setUp(self):
+        devices._working_microphones = None
+
+    def tearDown(self):
+        give_up_at = time.monotonic() + 5
+        while devices.pyaudio_host.references > 0 and time.monotonic() < give_up_at:  # wait for probes that timed out
+            time.sleep(0.01)
+
+    def test_only_devices_hearing_sound_are_listed(self):
+        module = FakePyAudioModule([
+            {"name": "quiet"}, {"name": "loud", "sound": True}, {"name": "broken", "broken": True, "sound": True},
+            {"name": "speaker", "channels": 0, "sound": True},
+        ])
+        self.assertEqual(devices.find_working_microphones(module), {1: "loud"})
+        self.assertEqual(module.open_instances, 0)
+
+    def test_devices_are_probed_concurrently_with_timeout(self):
+        module = FakePyAudioModule([{"name": "slow {}".format(i), "sound": True, "delay": 0.2} for i in range(5)] + [{"name": "hung", "sound": True, "delay": 1.5}])
+        start = time.monotonic()
+        result = devices.find_working_microphones(module, timeout=0.5)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(sorted(result), [0, 1, 2, 3, 4])
+
+    def test_probes_that_time_out_let_go_of_portaudio(self):
+        module = FakePyAudioModule([{"name": "loud", "sound": True}, {"name": "hung", "sound": True, "delay": 60}])
+        self.assertEqual(devices.find_working_microphones(module, timeout=0.3), {0: "loud"})
+        give_up_at = time.monotonic() + 1
+        while module.open_instances > 0 and time.monotonic() < give_up_at:
+            time.sleep(0.01)
+        self.assertEqual((devices.pyaudio_host.references, module.open_instances), (0, 0))
+
+    def test_portaudio_calls_are_serialised(self):
+        module = FakePyAudioModule([{"name": "mic {}".format(i), "sound": True} for i in range(8)])
+        self.assertEqual(len(devices.find_working_microphones(module)), 8)
+        self.assertEqual(module.most_calls, 1)
+
+    def test_result_is_cached_until_device_count_changes(self):
+        module = FakePyAudioModule([{"name": "loud", "sound": True}])
+        self.assertEqual(devices.find_working_microphones(module), {0: "loud"})
+        module.devices[0] = {"name": "loud", "broken": True}
+        self.assertEqual(devices.find_working_microphones(module), {0: "loud"})
+        self.assertEqual(devices.find_working_microphones(module, refresh=True), {})
+        module.devices.append({"name": "new", "sound": True})
+        self.assertEqual(devices.find_working_microphones(module), {1: "new"})
+
+    def test_concurrent_searches(self):
+        module = FakePyAudioModule([{"name": "loud", "sound": True, "delay": 0.05}])
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(devices.find_working_microphones(module, refresh=True))) for _ in range(4)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(results, [{0: "loud"}] * 4)
+        self.assertEqual(module.open_instances, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
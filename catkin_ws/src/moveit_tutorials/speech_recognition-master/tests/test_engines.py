@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+import speech_recognition as sr
+from speech_recognition.engines import _credential, engine, request_timeout
+from speech_recognition.fake_server import FakeSpeechServer
+
+
+class SlowRecognizer(sr.Recognizer):
+    def __init__(self, delays):
+        super().__init__()
+        self.delays = list(delays)  # seconds taken by each successive call
+        self.lock = threading.Lock()
+
+    @engine("slow")
+    def recognize_slow(self, audio_data):
+        with self.lock: delay = self.delays.pop(0)
+        time.sleep(delay)
+        request_timeout()  # where a real engine would send its request
+        return "took {}".format(delay)
+
+    @engine("fast")
+    def recognize_fast(self, audio_data):
+        return "fallback"
+
+
+class TestDeadlines(unittest.TestCase):
+    def setUp(self):
+        self.audio = sr.AudioData(b"\x00\x00" * 100, 16000, 2)
+
+    def test_recognizer_deadline(self):
+        r = SlowRecognizer([0.5])
+        r.deadline = 0.1
+        start = time.monotonic()
+        self.assertRaises(sr.DeadlineExceeded, r.recognize_slow, self.audio)
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_deadline_context(self):
+        r = SlowRecognizer([0.5, 0.0])
+        with sr.deadline(0.1):
+            self.assertRaises(sr.DeadlineExceeded, r.recognize_slow, self.audio)
+        time.sleep(0.5)
+        self.assertEqual(r.recognize_slow(self.audio), "took 0.0")
+
+    def test_deadline_shortens_request_timeout(self):
+        self.assertEqual(request_timeout(5), 5)
+        with sr.deadline(1):
+            self.assertLessEqual(request_timeout(5), 1)
+            self.assertLessEqual(request_timeout(None), 1)
+        with sr.deadline(-1):
+            self.assertRaises(sr.DeadlineExceeded, request_timeout, 5)
+
+    def test_api_ai_uses_deadline_and_credential(self):
+        from speech_recognition.recognizers.api_ai import recognize_api
+        self.assertEqual(_credential(recognize_api, ("TOKEN",), {}), "TOKEN")
+        with sr.deadline(-1):  # raised before anything is sent
+            self.assertRaises(sr.DeadlineExceeded, sr.Recognizer().recognize_api, self.audio, client_access_token="TOKEN")
+
+        timeouts = []
+
+        def urlopen(request, timeout=None):
+            timeouts.append(timeout)
+            raise sr.RequestError("not sent")
+        r = sr.Recognizer()
+        with mock.patch("speech_recognition.recognizers.api_ai.urlopen", urlopen):
+            self.assertRaises(sr.RequestError, r.recognize_api, self.audio, client_access_token="TOKEN")
+            r.operation_timeout = 3
+            self.assertRaises(sr.RequestError, r.recognize_api, self.audio, client_access_token="TOKEN")
+        self.assertEqual(timeouts, [10, 3])
+
+    def test_deadline_covers_network_requests(self):
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            audio = sr.Recognizer().record(source)
+        with FakeSpeechServer(latency=1.0) as server:
+            r = sr.Recognizer()
+            server.configure(r)
+            r.deadline = 0.2
+            self.assertRaises(sr.DeadlineExceeded, r.recognize_wit, audio, key="FAKEKEY")
+
+
+class TestHedging(unittest.TestCase):
+    def setUp(self):
+        self.audio = sr.AudioData(b"\x00\x00" * 100, 16000, 2)
+
+    def test_duplicate_request_wins(self):
+        r = SlowRecognizer([1.0, 0.0])
+        r.hedging = sr.HedgePolicy(delay=0.05)
+        start = time.monotonic()
+        self.assertEqual(r.recognize_slow(self.audio), "took 0.0")
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_fast_request_is_not_hedged(self):
+        r = SlowRecognizer([0.0])
+        r.hedging = sr.HedgePolicy(delay=0.5)
+        self.assertEqual(r.recognize_slow(self.audio), "took 0.0")
+        self.assertEqual(r.delays, [])  # no second attempt was made
+
+    def test_fallback_engine(self):
+        r = SlowRecognizer([1.0])
+        r.hedging = sr.HedgePolicy(delay=0.05, fallback=lambda recognizer, audio: recognizer.recognize_fast(audio))
+        self.assertEqual(r.recognize_slow(self.audio), "fallback")
+
+    def test_hedges_after_observed_percentile(self):
+        r = SlowRecognizer([0.01] * 20 + [1.0, 0.0])
+        for _ in range(20): r.recognize_slow(self.audio)
+        self.assertEqual(r.engine_latencies.count("slow"), 20)
+        r.hedging = sr.HedgePolicy(min_samples=20)
+        start = time.monotonic()
+        self.assertEqual(r.recognize_slow(self.audio), "took 0.0")
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+class TestLazyEngines(unittest.TestCase):
+    def test_engines_are_imported_on_first_use(self):
+        code = "import sys, speech_recognition as sr\n" \
+               "print('speech_recognition.recognizers.google' in sys.modules, 'concurrent.futures' in sys.modules)\n" \
+               "method = sr.Recognizer.recognize_google\n" \
+               "print('speech_recognition.recognizers.google' in sys.modules, 'speech_recognition.recognizers.wit' in sys.modules, method.engine_name)"
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+        output = subprocess.run([sys.executable, "-c", code], env=environment, stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout.split()
+        self.assertEqual(output, ["False", "False", "True", "False", "google"])
+
+    def test_loaded_engine_replaces_placeholder(self):
+        r = sr.Recognizer()
+        self.assertEqual(r.recognize_wit.engine_name, "wit")
+        self.assertIs(sr.Recognizer.__dict__["recognize_wit"], sr.Recognizer.recognize_wit)
+
+
+if __name__ == "__main__":
+    unittest.main()
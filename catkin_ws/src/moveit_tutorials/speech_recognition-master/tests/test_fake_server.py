@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import importlib.util
+import os
+import threading
+import time
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.fake_server import FakeGoogleCloudSpeechServer, FakeSpeechServer
+
+
+class TestFakeSpeechServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.AUDIO_FILE_EN = os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")
+        with sr.AudioFile(cls.AUDIO_FILE_EN) as source:
+            cls.audio = sr.Recognizer().record(source)
+
+    def recognizer(self, server):
+        r = sr.Recognizer()
+        server.configure(r)
+        return r
+
+    def test_google(self):
+        with FakeSpeechServer(transcript="one two three") as server:
+            self.assertEqual(self.recognizer(server).recognize_google(self.audio), "one two three")
+
+    def test_wit(self):
+        with FakeSpeechServer(transcript="one two three") as server:
+            self.assertEqual(self.recognizer(server).recognize_wit(self.audio, key="FAKEKEY"), "one two three")
+
+    def test_azure(self):
+        with FakeSpeechServer(transcript="one two three", confidence=0.75) as server:
+            r = self.recognizer(server)
+            self.assertEqual(r.recognize_azure(self.audio, key="fakekey"), ("one two three", 0.75))
+            self.assertEqual(r.recognize_azure(self.audio, key="fakekey"), ("one two three", 0.75))
+            self.assertEqual(server.request_counts, {"token": 1, "azure": 2})  # the access token is reused
+
+    def test_bing(self):
+        with FakeSpeechServer(transcript="one two three") as server:
+            self.assertEqual(self.recognizer(server).recognize_bing(self.audio, key="fakekey"), "one two three")
+
+    def test_houndify(self):
+        with FakeSpeechServer(transcript="one two three", confidence=0.75) as server:
+            self.assertEqual(self.recognizer(server).recognize_houndify(self.audio, client_id="ZmFrZQ==", client_key="ZmFrZWtleQ=="), ("one two three", 0.75))
+
+    def test_ibm(self):
+        with FakeSpeechServer(transcript="one two three", confidence=0.75) as server:
+            self.assertEqual(self.recognizer(server).recognize_ibm(self.audio, key="fakekey"), ("one two three", 0.75))
+
+    def speak(self, stream, server, outcome, error=None):
+        stream.start(16000, 2)
+        for _ in range(10): stream.write(b"\x10\x00" * 1600)
+        give_up_at = time.monotonic() + 5
+        while server.body_bytes < 44 + 10 * 3200 and time.monotonic() < give_up_at: time.sleep(0.01)
+        outcome.append(server.body_bytes)  # what was uploaded before the phrase ended
+        for _ in range(10): stream.write(b"\x10\x00" * 1600)
+        stream.close(error)
+
+    def test_azure_and_bing_upload_while_speaking(self):
+        with FakeSpeechServer(transcript="one two three", confidence=0.75) as server:
+            r = self.recognizer(server)
+            for recognize, expected in ((r.recognize_azure, ("one two three", 0.75)), (r.recognize_bing, "one two three")):
+                server.body_bytes, stream, outcome = 0, sr.LiveAudioStream(), []
+                writer = threading.Thread(target=self.speak, args=(stream, server, outcome))
+                writer.start()
+                self.assertEqual(recognize(stream, key="fakekey"), expected)
+                writer.join()
+                self.assertEqual(outcome, [44 + 10 * 3200])
+                self.assertEqual(server.body_bytes, 44 + 20 * 3200)
+
+    def test_capture_error_while_uploading(self):
+        with FakeSpeechServer() as server:
+            stream, outcome = sr.LiveAudioStream(), []
+            writer = threading.Thread(target=self.speak, args=(stream, server, outcome, OSError("device unplugged")))
+            writer.start()
+            self.assertRaisesRegex(OSError, "device unplugged", self.recognizer(server).recognize_bing, stream, key="fakekey")
+            writer.join()
+
+    def test_injected_failures(self):
+        with FakeSpeechServer(failure_rate=1.0) as server:
+            self.assertRaises(sr.RequestError, self.recognizer(server).recognize_wit, self.audio, key="FAKEKEY")
+
+
+@unittest.skipUnless(importlib.util.find_spec("grpc") and importlib.util.find_spec("google.cloud.speech"), "requires grpcio and google-cloud-speech")
+class TestFakeGoogleCloudSpeechServer(unittest.TestCase):
+    def recognizer(self, server):
+        r = sr.Recognizer()
+        server.configure(r)
+        return r
+
+    def write_phrase(self, stream, chunks=20, error=None):
+        stream.start(16000, 2)
+        for _ in range(chunks):
+            stream.write(b"\x10\x00" * 1600)
+            time.sleep(0.02)
+        stream.close(error)
+
+    def test_recognize(self):
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            audio = sr.Recognizer().record(source)
+        with FakeGoogleCloudSpeechServer(transcript="one two three") as server:
+            self.assertEqual(self.recognizer(server).recognize_google_cloud(audio, credentials_json="unused.json").strip(), "one two three")
+
+    def test_streaming_while_phrase_is_spoken(self):
+        stream, interims = sr.LiveAudioStream(), []
+        writer = threading.Thread(target=self.write_phrase, args=(stream,))
+        with FakeGoogleCloudSpeechServer(transcript="one two three", interim_interval=0.1) as server:
+            writer.start()
+            transcript = self.recognizer(server).recognize_google_cloud(stream, credentials_json="unused.json", interim_callback=lambda text: interims.append((text, stream.closed)))
+            writer.join()
+            self.assertEqual(transcript.strip(), "one two three")
+            self.assertEqual(server.audio_bytes, 20 * 3200)
+            self.assertEqual(server.streaming_configs[0].config.sample_rate_hertz, 16000)
+        self.assertEqual(interims[:2], [("one", False), ("one two", False)])  # received before the phrase ended
+
+    def test_streaming_without_interim_results(self):
+        stream = sr.LiveAudioStream()
+        writer = threading.Thread(target=self.write_phrase, args=(stream, 5))
+        with FakeGoogleCloudSpeechServer(transcript="one two three") as server:
+            writer.start()
+            self.assertEqual(self.recognizer(server).recognize_google_cloud(stream, credentials_json="unused.json").strip(), "one two three")
+            writer.join()
+            self.assertFalse(server.streaming_configs[0].interim_results)
+
+    def test_streaming_capture_error(self):
+        stream = sr.LiveAudioStream()
+        writer = threading.Thread(target=self.write_phrase, args=(stream, 5, OSError("device unplugged")))
+        with FakeGoogleCloudSpeechServer() as server:
+            writer.start()
+            self.assertRaises(OSError, self.recognizer(server).recognize_google_cloud, stream, credentials_json="unused.json")
+            writer.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.features import FeatureStream, dct_matrix, iter_features
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestFeatures(unittest.TestCase):
+    def setUp(self):
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            self.audio = sr.Recognizer().record(source)
+
+    def test_shapes(self):
+        frames = 1 + (len(self.audio.get_raw_data(convert_rate=16000, convert_width=2)) // 2 - 400) // 160
+        self.assertEqual(self.audio.features("spectrogram").shape, (frames, 257))
+        self.assertEqual(self.audio.features("mel").shape, (frames, 40))
+        self.assertEqual(self.audio.features("log_mel", mel_bands=26).shape, (frames, 26))
+        self.assertEqual(self.audio.features("mfcc").shape, (frames, 13))
+        self.assertEqual(self.audio.features("energy").shape, (frames,))
+        self.assertEqual(sr.AudioData(b"\x00\x00" * 10, 16000, 2).features("mfcc").shape, (1, 13))
+
+    def test_results_are_cached_and_read_only(self):
+        mfcc = self.audio.features("mfcc")
+        self.assertIs(self.audio.features("mfcc"), mfcc)
+        self.assertIs(self.audio.features("mfcc", coefficients=13, window="hamming"), mfcc)
+        self.assertIsNot(self.audio.features("mfcc", coefficients=20), mfcc)
+        self.assertFalse(mfcc.flags.writeable)
+
+        log_mel = self.audio.features("log_mel")  # computed on the way to the MFCCs
+        numpy.testing.assert_allclose(log_mel @ dct_matrix(40, 13), mfcc)
+        self.assertIs(self.audio.features("log_mel", coefficients=20), log_mel)
+
+    def test_stream_matches_whole_audio(self):
+        stream = FeatureStream(self.audio.sample_rate, self.audio.sample_width, "mfcc")
+        data = self.audio.frame_data
+        pieces = [stream.write(data[start:start + 1234]) for start in range(0, len(data), 1234)]  # odd sizes, so frames span pieces
+        numpy.testing.assert_allclose(numpy.concatenate(pieces), self.audio.features("mfcc"), atol=1e-6)
+
+    def test_features_of_live_stream(self):
+        r = sr.Recognizer()
+        r.dynamic_energy_threshold = False
+        stream = sr.LiveAudioStream()
+        received = []
+        reader = threading.Thread(target=lambda: received.extend(iter_features(stream, "log_mel")))
+        reader.start()
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            audio = r.listen(source, audio_stream=stream)
+        reader.join(5)
+        features = numpy.concatenate(received)
+        self.assertGreaterEqual(len(features), len(audio.features("log_mel")) - 1)
+        self.assertEqual(features.shape[1], 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import os
+import struct
+import sys
+import threading
+import types
+import unittest
+
+import speech_recognition as sr
+from speech_recognition import hotword
+
+
+class FakeSnowboyDetect(object):
+    """Reports hotword 1 once it has heard a sample with the value 1000, like Snowboy would for a real model."""
+    instances = 0
+
+    def __init__(self, resource_filename, model_str):
+        FakeSnowboyDetect.instances += 1
+        self.runs = 0
+
+    def SetAudioGain(self, gain):
+        pass
+
+    def SetSensitivity(self, sensitivity):
+        pass
+
+    def SampleRate(self):
+        return 16000
+
+    def RunDetection(self, audio):
+        self.runs += 1
+        self.audio = audio
+        return 1 if 1000 in struct.unpack("<{}h".format(len(audio) // 2), audio) else 0
+
+    def Reset(self):
+        pass
+
+
+class FakeSource(sr.AudioSource):
+    def __init__(self, buffers, sample_rate=16000):
+        self.buffers = list(buffers)
+        self.SAMPLE_RATE, self.SAMPLE_WIDTH, self.CHUNK = sample_rate, 2, 160
+        self.stream = self
+
+    def read(self, size):
+        return self.buffers.pop(0) if self.buffers else b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+def silence():
+    return b"\x00\x00" * 160
+
+
+def hot_word():
+    return struct.pack("<h", 1000) * 160
+
+
+class TestHotword(unittest.TestCase):
+    def setUp(self):
+        hotword._snowboy_modules["fake-snowboy"] = types.SimpleNamespace(SnowboyDetect=FakeSnowboyDetect)
+        hotword._idle_detectors.clear()
+        FakeSnowboyDetect.instances = 0
+
+    def test_only_one_snowboy_location(self):
+        loaded = types.ModuleType("snowboydetect")
+        loaded.__file__ = os.path.join(os.sep, "opt", "snowboy-a", "snowboydetect.py")
+        sys.modules["snowboydetect"] = loaded
+        self.addCleanup(sys.modules.pop, "snowboydetect")
+        for location in (os.path.join(os.sep, "opt", "snowboy-a"), os.path.join(os.sep, "opt", "snowboy-b")): self.addCleanup(hotword._snowboy_modules.pop, location, None)
+        self.assertIs(hotword._import_snowboy(os.path.join(os.sep, "opt", "snowboy-a")), loaded)
+        self.assertRaises(ValueError, hotword._import_snowboy, os.path.join(os.sep, "opt", "snowboy-b"))
+
+    def test_detectors_are_reused(self):
+        r = sr.Recognizer()
+        for _ in range(3):
+            audio, elapsed = r.snowboy_wait_for_hot_word("fake-snowboy", ["hey.pmdl"], FakeSource([silence()] * 10 + [hot_word()]))
+            self.assertTrue(audio.endswith(hot_word()))
+        self.assertEqual(FakeSnowboyDetect.instances, 1)
+        r.snowboy_wait_for_hot_word("fake-snowboy", ["other.pmdl"], FakeSource([hot_word()]))
+        self.assertEqual(FakeSnowboyDetect.instances, 2)
+
+    def test_detection_runs_every_check_interval_of_audio(self):
+        detector = hotword.acquire_detector("fake-snowboy", ["hey.pmdl"])
+        scanner = hotword.HotwordScanner(detector, 8000, 2, check_interval=0.05)  # 160 frames at 8 kHz are 20 ms
+        for _ in range(10): self.assertIsNone(scanner.feed(b"\x00\x00" * 160))
+        self.assertEqual(detector.detector.runs, 3)  # after 60, 120 and 180 ms of audio
+        hotword.release_detector(detector)
+
+    def test_8_bit_audio_is_converted_to_signed_samples(self):
+        detector = hotword.acquire_detector("fake-snowboy", ["hey.pmdl"])
+        scanner = hotword.HotwordScanner(detector, 16000, 1, check_interval=0.01)  # 160 frames
+        scanner.feed(bytes([128]) * 160)  # silence
+        self.assertEqual(detector.detector.audio, b"\x00\x00" * 160)
+        scanner.feed(bytes([132]) * 160)
+        self.assertEqual(detector.detector.audio, struct.pack("<h", 1024) * 160)
+        hotword.release_detector(detector)
+
+    def test_history_is_limited(self):
+        detector = hotword.acquire_detector("fake-snowboy", ["hey.pmdl"])
+        scanner = hotword.HotwordScanner(detector, 16000, 2, history_duration=0.05)  # 800 frames
+        for i in range(20): scanner.feed(struct.pack("<h", i) * 160)
+        self.assertEqual(scanner.history(), b"".join(struct.pack("<h", i) * 160 for i in range(15, 20)))
+        hotword.release_detector(detector)
+
+    def test_continuous_detection(self):
+        r = sr.Recognizer()
+        detections, done = [], threading.Event()
+
+        def callback(recognizer, audio, index):
+            detections.append((len(audio.frame_data), hot_word() in audio.frame_data, index))
+            if len(detections) == 2: done.set()
+
+        source = FakeSource([silence()] * 200 + [hot_word()] + [silence()] * 60 + [hot_word()] + [silence()] * 10)
+        stop = r.snowboy_listen_in_background(source, callback, ("fake-snowboy", ["hey.pmdl"]), pre_roll=0.5)
+        self.assertTrue(done.wait(5))
+        stop()
+        self.assertEqual(detections, [(50 * 320, True, 0)] * 2)  # half a second of audio, including the hotword
+        self.assertEqual(FakeSnowboyDetect.instances, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
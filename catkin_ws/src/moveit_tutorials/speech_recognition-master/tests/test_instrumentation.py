@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.fake_server import FakeSpeechServer
+
+
+class SpanCollector(sr.Instrumentation):
+    def __init__(self):
+        super().__init__()
+        self.spans = []
+
+    def on_span(self, span):
+        self.spans.append(span)
+
+    def named(self, name):
+        return [span for span in self.spans if span.name == name]
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.AUDIO_FILE_EN = os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")
+
+    def test_disabled_by_default(self):
+        self.assertIsInstance(sr.Recognizer().instrumentation, sr.NullInstrumentation)
+
+    def test_listen_stages(self):
+        r = sr.Recognizer()
+        r.instrumentation = collector = SpanCollector()
+        with sr.AudioFile(self.AUDIO_FILE_EN) as source:
+            r.listen(source)
+        listen, = collector.named("listen")
+        self.assertGreaterEqual(listen.end, listen.start)
+        for name in ("listen.wait_for_speech", "listen.phrase", "listen.endpointing"):
+            spans = collector.named(name)
+            self.assertTrue(spans, name)
+            for span in spans:
+                self.assertEqual(span.parent_id, listen.span_id)
+                self.assertLessEqual(listen.start, span.start)
+                self.assertLessEqual(span.start, span.end)
+                self.assertLessEqual(span.end, listen.end)
+        self.assertTrue(collector.named("listen.phrase")[-1].attributes["kept"])
+
+    def test_record_and_recognize_stages(self):
+        r = sr.Recognizer()
+        r.instrumentation = collector = SpanCollector()
+        with sr.AudioFile(self.AUDIO_FILE_EN) as source:
+            audio = r.record(source)
+        self.assertGreater(collector.named("record")[0].attributes["audio_seconds"], 0)
+
+        with FakeSpeechServer() as server:
+            server.configure(r)
+            r.recognize_wit(audio, key="FAKEKEY")
+        recognize, = collector.named("recognize")
+        self.assertEqual(recognize.attributes["engine"], "wit")
+        convert, = collector.named("convert")
+        request, = collector.named("request")
+        self.assertEqual(convert.attributes["format"], "wav")
+        self.assertEqual((convert.parent_id, request.parent_id), (recognize.span_id, recognize.span_id))
+        self.assertLessEqual(convert.end, request.start)
+
+    def test_failed_stage_records_error(self):
+        r = sr.Recognizer()
+        r.instrumentation = collector = SpanCollector()
+        with sr.AudioFile(self.AUDIO_FILE_EN) as source:
+            audio = r.record(source)
+        with FakeSpeechServer(failure_rate=1.0) as server:
+            server.configure(r)
+            self.assertRaises(sr.RequestError, r.recognize_wit, audio, key="FAKEKEY")
+        self.assertEqual(collector.named("request")[0].attributes["error"], "RequestError")
+        self.assertEqual(collector.named("recognize")[0].attributes["error"], "RequestError")
+
+    def test_json_lines_exporter(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "spans.jsonl")
+        r = sr.Recognizer()
+        with sr.JSONLinesExporter(path) as exporter:
+            r.instrumentation = exporter
+            with sr.AudioFile(self.AUDIO_FILE_EN) as source:
+                r.record(source)
+            exporter.metric("upload_bytes", 1234, engine="wit")
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[0]["type"], "clock")
+        self.assertEqual([(record["type"], record["name"]) for record in records[1:]], [("span", "record"), ("metric", "upload_bytes")])
+        self.assertAlmostEqual(records[1]["duration"], records[1]["end"] - records[1]["start"])
+        self.assertEqual(records[2]["attributes"], {"engine": "wit"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import speech_recognition as sr
+from speech_recognition import TranscriptionFailed
+from speech_recognition.jobs import AmazonTranscribeBackend, JobTracker
+
+from tests.test_amazon import FakeS3
+
+try:
+    import botocore
+except ImportError:
+    botocore = None
+
+
+class FakeBackend(object):
+    """Each job finishes after ``polls_needed`` polls; audio ``"bad"`` fails."""
+    def __init__(self, polls_needed=2):
+        self.polls_needed = polls_needed
+        self.poll_counts = {}
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def submit(self, audio_data):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.poll_counts[audio_data] = 0
+        return audio_data
+
+    def poll(self, job_id):
+        with self.lock:
+            self.poll_counts[job_id] = self.poll_counts.get(job_id, 0) + 1
+            if self.poll_counts[job_id] < self.polls_needed: return None
+            self.running -= 1
+        if job_id == "bad": raise TranscriptionFailed()
+        return job_id.upper(), 0.9
+
+
+class FakeTranscribe(object):
+    """Jobs keep running until ``fail`` is set, and then fail."""
+    def __init__(self):
+        self.jobs = set()
+        self.fail = False
+
+    def start_transcription_job(self, TranscriptionJobName, **kwargs):
+        self.jobs.add(TranscriptionJobName)
+
+    def get_transcription_job(self, TranscriptionJobName):
+        return {"TranscriptionJob": {"TranscriptionJobStatus": "FAILED" if self.fail else "IN_PROGRESS", "Transcript": {}}}
+
+    def delete_transcription_job(self, TranscriptionJobName):
+        self.jobs.remove(TranscriptionJobName)
+
+
+class TestJobTracker(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.directory, "jobs.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_resolves_futures_with_concurrency_limit(self):
+        backend = FakeBackend()
+        with JobTracker(backend, max_concurrency=2, initial_delay=0.01, max_delay=0.02) as tracker:
+            futures = {clip: tracker.submit(clip) for clip in ["one", "two", "three", "four", "bad"]}
+            for clip in ["one", "two", "three", "four"]:
+                self.assertEqual(futures[clip].result(timeout=5), (clip.upper(), 0.9))
+            self.assertRaises(TranscriptionFailed, futures["bad"].result, 5)
+        self.assertLessEqual(backend.max_running, 2)
+        self.assertTrue(all(count == 2 for count in backend.poll_counts.values()))
+
+    def test_resume_from_state_file(self):
+        tracker = JobTracker(FakeBackend(polls_needed=1000), state_file=self.state_file, initial_delay=0.01)
+        tracker.submit("one", key="clip-1.wav")
+        tracker.submit("two", key="clip-2.wav")
+        while len(tracker.outstanding()) < 2: time.sleep(0.01)
+        tracker.close()
+
+        with JobTracker(FakeBackend(polls_needed=1), state_file=self.state_file, initial_delay=0.01) as tracker:
+            futures = tracker.resume()
+            self.assertEqual(sorted(futures), ["clip-1.wav", "clip-2.wav"])
+            self.assertEqual(futures["clip-2.wav"].result(timeout=5), ("TWO", 0.9))
+            futures["clip-1.wav"].result(timeout=5)
+            self.assertEqual(tracker.outstanding(), {})
+
+    @unittest.skipIf(botocore is None, "botocore is not installed")
+    def test_amazon_jobs_resume_with_their_bucket(self):
+        r = sr.Recognizer()
+        services = {"s3": FakeS3(), "transcribe": FakeTranscribe()}
+        r.engine_clients.aws_client = lambda service_name, *args: services[service_name]
+        with JobTracker(AmazonTranscribeBackend(r), state_file=self.state_file, initial_delay=0.01) as tracker:
+            tracker.submit(sr.AudioData(b"\x00\x00" * 1600, 16000, 2), key="clip.wav")
+            while not tracker.outstanding(): time.sleep(0.01)
+        self.assertEqual(len(services["s3"].objects), 1)
+
+        services["transcribe"].fail = True
+        backend = AmazonTranscribeBackend(r)  # generates a different bucket name
+        with JobTracker(backend, state_file=self.state_file, initial_delay=0.01) as tracker:
+            self.assertRaises(TranscriptionFailed, tracker.resume()["clip.wav"].result, 5)
+        self.assertNotIn(backend.pipeline.bucket_name, services["s3"].buckets)
+        self.assertEqual((services["s3"].objects, services["transcribe"].jobs), ({}, set()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.recognizers.keywords import KeywordTemplates, dtw_distances
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+WORDS = {"one": (50, 460), "two": (1050, 1550), "three": (1950, 2450)}  # milliseconds of each word in english.wav
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestKeywords(unittest.TestCase):
+    def setUp(self):
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            self.audio = sr.Recognizer().record(source)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.templates = KeywordTemplates(self.directory)
+        for word, (start, end) in WORDS.items():
+            self.templates.enroll(word, self.audio.get_segment(start, end))
+
+    def noisy(self, audio_data, snr_db):
+        samples = numpy.frombuffer(audio_data.get_raw_data(), dtype="<i2").astype(float)
+        noise = numpy.random.default_rng(0).normal(0, numpy.sqrt(numpy.mean(samples ** 2) / 10 ** (snr_db / 10.0)), len(samples))
+        return sr.AudioData(numpy.clip(samples + noise, -32768, 32767).astype("<i2").tobytes(), audio_data.sample_rate, 2)
+
+    def test_recognizes_enrolled_words(self):
+        r = sr.Recognizer()
+        for word, (start, end) in WORDS.items():
+            phrase = self.audio.get_segment(start - 40, end + 40)
+            self.assertEqual(r.recognize_keywords(self.noisy(phrase, 20), self.directory), word)
+            self.assertEqual(r.recognize_keywords(sr.AudioData(phrase.get_raw_data(convert_rate=8000), 8000, 2), self.templates), word)
+
+    def test_show_all_and_phrase_subset(self):
+        r = sr.Recognizer()
+        phrase = self.audio.get_segment(*WORDS["two"])
+        ranking = r.recognize_keywords(phrase, self.templates, show_all=True)
+        self.assertEqual([word for word, distance in ranking][0], "two")
+        self.assertEqual(sorted(word for word, distance in ranking), ["one", "three", "two"])
+        self.assertEqual(r.recognize_keywords(phrase, self.templates, phrases=["one", "three"]), "three")
+        self.assertRaises(sr.UnknownValueError, r.recognize_keywords, phrase, self.templates, phrases=["one"], threshold=1)
+
+    def test_enrollment_is_reloaded(self):
+        self.assertEqual(self.templates.phrases(), ["one", "three", "two"])
+        self.templates.enroll("one two", self.audio.get_segment(50, 1550))
+        self.assertEqual(KeywordTemplates(self.directory).phrases(), ["one", "one two", "three", "two"])
+        self.assertEqual(self.templates.phrases(), ["one", "one two", "three", "two"])
+        self.templates.remove("one two")
+        self.assertEqual(self.templates.phrases(), ["one", "three", "two"])
+
+    def test_silence_is_unknown(self):
+        r = sr.Recognizer()
+        self.assertRaises(sr.UnknownValueError, r.recognize_keywords, sr.AudioData(b"\x00\x00" * 16000, 16000, 2), self.templates)
+        self.assertRaises(sr.UnknownValueError, self.templates.enroll, "nothing", sr.AudioData(b"\x00\x00" * 16000, 16000, 2))
+
+    def test_dtw_distances(self):
+        rng = numpy.random.default_rng(0)
+        features, templates = rng.normal(size=(30, 12)), [rng.normal(size=(length, 12)) for length in (20, 35, 8)]
+        for template, distance in zip(templates, dtw_distances(features, templates)):
+            total = numpy.full((len(features) + 1, len(template) + 1), numpy.inf)
+            total[0, 0] = 0
+            for i in range(1, len(features) + 1):
+                for j in range(1, len(template) + 1):
+                    total[i, j] = numpy.linalg.norm(features[i - 1] - template[j - 1]) + min(total[i - 1, j], total[i - 1, j - 1], total[i, j - 1])
+            self.assertAlmostEqual(distance, total[-1, -1] / (len(features) + len(template)))
+
+    def test_latency(self):
+        r = sr.Recognizer()
+        phrase = self.audio.get_segment(*WORDS["three"])
+        r.recognize_keywords(phrase, self.templates)  # load the templates
+        start = time.perf_counter()
+        for _ in range(10): r.recognize_keywords(phrase, self.templates)
+        self.assertLess((time.perf_counter() - start) / 10, 0.05)  # aiming for well under 20 ms, with room for slow machines
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.listening import PhraseSegmenter
+
+from tests.test_noise import noise_wav
+
+ENGLISH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")
+
+
+class StalledSource(sr.AudioSource):
+    """A live source that never has any audio available."""
+    SAMPLE_RATE, SAMPLE_WIDTH, CHUNK = 16000, 2, 1024
+
+    class Stream(object):
+        def available(self):
+            return 0
+
+        def read(self, size):
+            raise AssertionError("read would block")
+
+    def __init__(self):
+        self.stream = None
+
+    def __enter__(self):
+        self.stream = StalledSource.Stream()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+
+class TestSourceState(unittest.TestCase):
+    def test_thresholds_adapt_per_source(self):
+        r = sr.Recognizer()
+        r.energy_threshold = 10000
+        quiet, loud = sr.AudioFile(noise_wav(4, 100)), sr.AudioFile(noise_wav(4, 3000))
+        with quiet as source: r.adjust_for_ambient_noise(source, duration=3)
+        with loud as source: r.adjust_for_ambient_noise(source, duration=3)
+        self.assertLess(r.source_state(quiet).energy_threshold, r.source_state(loud).energy_threshold / 10)
+        self.assertEqual(r.energy_threshold, r.source_state(loud).energy_threshold)
+
+        r.energy_threshold = 500  # applies to every source
+        self.assertEqual((r.source_state(quiet).energy_threshold, r.source_state(loud).energy_threshold), (500, 500))
+
+    def test_concurrent_listens_keep_separate_thresholds(self):
+        r = sr.Recognizer()
+        r.energy_threshold = 10000
+        quiet, loud = sr.AudioFile(noise_wav(3, 100)), sr.AudioFile(noise_wav(3, 3000))
+
+        timed_out = []
+
+        def listen(source):
+            with source as s:
+                try:
+                    r.listen(s, timeout=2)
+                except sr.WaitTimeoutError:
+                    timed_out.append(source)
+        threads = [threading.Thread(target=listen, args=(source,)) for source in (quiet, loud)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertEqual(len(timed_out), 2)  # neither heard the other's noise as speech
+        self.assertLess(r.source_state(quiet).energy_threshold, 500)
+        self.assertGreater(r.source_state(loud).energy_threshold, 2000)
+
+    def test_calibration_carries_over_to_new_sources(self):
+        r = sr.Recognizer()
+        with sr.AudioFile(noise_wav(2, 3000)) as source: r.adjust_for_ambient_noise(source, duration=1.5)
+        calibrated = r.energy_threshold
+        self.assertGreater(calibrated, 2000)
+
+        with sr.AudioFile(noise_wav(2, 3000)) as source:
+            self.assertEqual(r.source_state(source).energy_threshold, calibrated)
+            self.assertRaises(sr.WaitTimeoutError, r.listen, source, timeout=1)  # the noise isn't taken for speech
+
+    def test_listening_adjustments_stay_with_their_source(self):
+        r = sr.Recognizer()
+        r.energy_threshold = 10000
+        with sr.AudioFile(noise_wav(3, 100)) as source:
+            self.assertRaises(sr.WaitTimeoutError, r.listen, source, timeout=2)
+        self.assertLess(r.energy_threshold, 500)
+        self.assertEqual(r.source_state(sr.AudioFile(noise_wav(1, 100))).energy_threshold, 10000)
+
+
+class TestPhraseSegmenter(unittest.TestCase):
+    def test_matches_listen(self):
+        r = sr.Recognizer()
+        with sr.AudioFile(ENGLISH) as source:
+            expected = r.listen(source)
+
+        r = sr.Recognizer()
+        with sr.AudioFile(ENGLISH) as source:
+            segmenter = PhraseSegmenter(r, source, source.CHUNK)
+            phrases = []
+            while True:
+                buffer = source.stream.read(source.CHUNK)
+                if len(buffer) == 0: break
+                phrases.append(segmenter.feed(buffer))
+            phrases.append(segmenter.finish())
+        phrases = [phrase for phrase in phrases if phrase is not None]
+        self.assertEqual(phrases[0].frame_data, expected.frame_data)
+
+
+class TestMultiSourceListener(unittest.TestCase):
+    def test_phrases_are_tagged_with_their_source(self):
+        r = sr.Recognizer()
+        speech, noise, stalled = sr.AudioFile(ENGLISH), sr.AudioFile(noise_wav(3, 50)), StalledSource()
+        heard = []
+        stop = r.listen_to_sources_in_background([speech, noise, stalled], lambda recognizer, audio, source: heard.append((source, audio)))
+        give_up_at = time.monotonic() + 5
+        while not heard and time.monotonic() < give_up_at: time.sleep(0.01)
+        stop()
+        self.assertGreater(len(heard), 0)
+        self.assertTrue(all(source is speech for source, audio in heard))
+        self.assertGreater(len(heard[0][1].frame_data), 0)
+        self.assertIsNone(stalled.stream)  # sources are exited
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import io
+import random
+import struct
+import threading
+import time
+import unittest
+import wave
+
+import speech_recognition as sr
+from speech_recognition.long_audio import split_at_silences
+
+
+def sections_wav(sections, sample_rate=16000):
+    """A WAV file of noise, with each ``(seconds, amplitude)`` section in turn."""
+    generator = random.Random(0)
+    f = io.BytesIO()
+    with wave.open(f, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        for seconds, amplitude in sections:
+            w.writeframes(b"".join(struct.pack("<h", generator.randint(-amplitude, amplitude)) for _ in range(int(seconds * sample_rate))))
+    f.seek(0)
+    return f
+
+
+def duration(audio_data):
+    return len(audio_data.frame_data) / float(audio_data.sample_rate * audio_data.sample_width)
+
+
+class CountingFile(sr.AudioFile):
+    """An audio file that counts the bytes read from it."""
+    def __enter__(self):
+        super().__enter__()
+        read, self.bytes_read = self.stream.read, 0
+
+        def counting_read(size=-1):
+            buffer = read(size)
+            self.bytes_read += len(buffer)
+            return buffer
+        self.stream.read = counting_read
+        return self
+
+
+class TestLongAudio(unittest.TestCase):
+    SPEECH = [(2, 8000), (1, 20), (3, 8000), (1, 20), (2, 8000)]  # loud noise standing in for speech, separated by quiet
+
+    def test_splits_in_silences(self):
+        with sr.AudioFile(sections_wav(self.SPEECH)) as source:
+            parts = list(split_at_silences(source, min_segment=1, overlap=0))
+        self.assertEqual(len(parts), 3)
+        silences = [(2, 3), (6, 7)]
+        for (start_time, audio_data), (silence_start, silence_end) in zip(parts[1:], silences):
+            self.assertTrue(silence_start < start_time < silence_end, "part starts at {} s, outside of the silence".format(start_time))
+        self.assertAlmostEqual(parts[0][0], 0)
+        self.assertAlmostEqual(sum(duration(audio_data) for _, audio_data in parts), 9, delta=0.05)
+
+    def test_long_speech_is_cut_with_overlap(self):
+        with sr.AudioFile(sections_wav([(10, 8000)])) as source:
+            parts = list(split_at_silences(source, max_segment=3, min_segment=1, overlap=0.2))
+        self.assertEqual(len(parts), 4)
+        for (start_time, audio_data), (next_start_time, _) in zip(parts, parts[1:]):
+            self.assertLessEqual(duration(audio_data), 3.3)
+            self.assertAlmostEqual(start_time + duration(audio_data) - next_start_time, 0.2, delta=0.04)
+
+    def test_silent_parts_are_skipped(self):
+        with sr.AudioFile(sections_wav([(2, 8000), (8, 20), (2, 8000)])) as source:
+            parts = list(split_at_silences(source, max_segment=3, min_segment=1, overlap=0))
+        self.assertEqual(len(parts), 2)
+
+    def test_parts_are_transcribed_concurrently(self):
+        r = sr.Recognizer()
+        lock, running = threading.Lock(), [0, 0]  # current and most calls at once
+
+        def recognize(recognizer, audio_data):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.2)
+            with lock: running[0] -= 1
+            return "{:.2f} seconds".format(duration(audio_data))
+        with sr.AudioFile(sections_wav(self.SPEECH)) as source:
+            transcript = r.transcribe_long_audio(source, recognize, max_workers=3, min_segment=1, overlap=0)
+        self.assertEqual(running[1], 3)
+        self.assertEqual(transcript.text, " ".join("{:.2f} seconds".format(segment.end - segment.start) for segment in transcript.segments))
+        self.assertEqual([round(segment.start) for segment in transcript.segments], [0, 2, 6])
+        self.assertEqual([round(segment.end) for segment in transcript.segments], [2, 6, 9])
+
+    def test_reading_waits_for_transcription(self):
+        r = sr.Recognizer()
+        release = threading.Event()
+
+        def recognize(recognizer, audio_data):
+            release.wait(10)
+            return "speech"
+        source = CountingFile(sections_wav([(1, 8000), (1, 20)] * 30))
+        with source:
+            thread = threading.Thread(target=r.transcribe_long_audio, args=(source, recognize), kwargs={"max_workers": 1, "min_segment": 1})
+            thread.start()
+            time.sleep(0.5)
+            self.assertLess(source.bytes_read, 16000 * 2 * 60 / 4, "``bytes_read`` should stay small while parts wait to be transcribed")
+            release.set()
+            thread.join()
+        self.assertEqual(source.bytes_read, 16000 * 2 * 60)
+
+    def test_failures_and_overlap_in_text(self):
+        r = sr.Recognizer()
+        results = iter([["go", "to", "the"], ["the", "kitchen"], sr.UnknownValueError(), sr.RequestError("quota exceeded"), ["now"]])
+
+        def recognize(recognizer, audio_data):
+            result = next(results)
+            if isinstance(result, Exception): raise result
+            return " ".join(result)
+        with sr.AudioFile(sections_wav([(2, 8000), (1, 20)] * 5)) as source:
+            transcript = r.transcribe_long_audio(source, recognize, max_workers=1, min_segment=1)
+        self.assertEqual(transcript.text, "go to the kitchen now")
+        self.assertEqual(len(transcript.segments), 5)
+        self.assertEqual(transcript.segments[2].text, "")
+        self.assertEqual(len(transcript.errors), 1)
+        self.assertIsInstance(transcript.errors[0].error, sr.RequestError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import struct
+import time
+import unittest
+from unittest import mock
+
+import speech_recognition as sr
+from tests.test_devices import FakePyAudioModule
+
+
+def samples(buffer):
+    return list(struct.unpack("<{}h".format(len(buffer) // 2), buffer))
+
+
+class TestKeepOpenMicrophone(unittest.TestCase):
+    def make_microphone(self, device, **kwargs):
+        module = FakePyAudioModule([dict(device, name="mic")])
+        patcher = mock.patch.object(sr.Microphone, "get_pyaudio", staticmethod(lambda: module))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        microphone = sr.Microphone(chunk_size=160, keep_open=True, **kwargs)
+        self.addCleanup(microphone.close)
+        return module, microphone
+
+    def test_device_stays_open_between_phrases(self):
+        module, m = self.make_microphone({"counter": 0, "delay": 0.01})
+        with m as source: first = source.stream.read(320)
+        instances = module.instances
+        time.sleep(0.05)  # audio recorded here is kept for the next phrase
+        with m as source: second = source.stream.read(320)
+        self.assertEqual(module.instances, instances)
+        self.assertEqual(samples(first + second), list(range(640)))
+        self.assertIsNone(m.stream)
+        self.assertEqual(module.open_instances, 1)
+        m.close()
+        self.assertEqual(module.open_instances, 0)
+
+    def test_old_audio_is_dropped_when_buffer_is_full(self):
+        module, m = self.make_microphone({"counter": 0, "delay": 0.01}, buffer_duration=0.1)  # 1600 frames at 16 kHz, recorded in 0.1 seconds
+        with m as source:
+            time.sleep(0.3)
+            buffer = source.stream.read(1600)
+        self.assertGreater(m.session.dropped_frames, 0)
+        self.assertEqual(samples(buffer), list(range(samples(buffer)[0], samples(buffer)[0] + 1600)))
+
+    def test_device_is_reopened_after_failure(self):
+        module, m = self.make_microphone({"counter": 0, "delay": 0.01, "fail_reads": 2})
+        with m as source: source.stream.read(320)
+        self.assertEqual(m.session.reopen_count, 2)
+        self.assertEqual(module.open_instances, 1)
+
+    def test_listen_with_kept_open_microphone(self):
+        module, m = self.make_microphone({"sound": True, "delay": 0.001})
+        r = sr.Recognizer()
+        r.dynamic_energy_threshold = False
+        for _ in range(2):
+            with m as source: audio = r.listen(source, phrase_time_limit=0.5)
+            self.assertGreater(len(audio.frame_data), 0)
+        self.assertEqual(module.open_instances, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
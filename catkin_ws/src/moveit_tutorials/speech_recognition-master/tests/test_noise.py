@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import random
+import shutil
+import struct
+import tempfile
+import unittest
+import wave
+
+import speech_recognition as sr
+from speech_recognition.noise import NoiseProfile, NoiseProfileStore
+
+
+def noise_wav(seconds, amplitude, sample_rate=16000):
+    generator = random.Random(0)
+    f = io.BytesIO()
+    with wave.open(f, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(b"".join(struct.pack("<h", generator.randint(-amplitude, amplitude)) for _ in range(int(seconds * sample_rate))))
+    f.seek(0)
+    return f
+
+
+class DeviceFile(sr.AudioFile):
+    """An audio file standing in for a microphone called ``device_name``."""
+    def __init__(self, f, device_name):
+        super().__init__(f)
+        self.device_name = device_name
+
+
+class TestNoiseProfiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_statistics_follow_noise(self):
+        profile = NoiseProfile(averaging_time=1)
+        for _ in range(100): profile.update(100, 0.1, 150)
+        for _ in range(100): profile.update(400, 0.1, 600)
+        self.assertAlmostEqual(profile.noise_energy, 400, delta=1)
+        self.assertAlmostEqual(profile.calibration_time, 20)
+        self.assertEqual(profile.energy_threshold, 600)
+
+    def test_store_round_trip(self):
+        store = NoiseProfileStore(self.directory)
+        self.assertIsNone(store.load("mic/1@16000"))
+        store.save("mic/1@16000", NoiseProfile(450, 200.0, 20.0, 3.0))
+        self.assertEqual(NoiseProfileStore(self.directory).load("mic/1@16000").to_dict(), NoiseProfile(450, 200.0, 20.0, 3.0).to_dict())
+
+    def test_autosave_is_rate_limited(self):
+        store = NoiseProfileStore(self.directory, save_interval=60)
+        self.assertTrue(store.autosave("mic", NoiseProfile(100)))
+        self.assertFalse(store.autosave("mic", NoiseProfile(200)))
+        self.assertEqual(store.load("mic").energy_threshold, 100)
+
+    def test_calibration_is_reused_by_next_run(self):
+        r = sr.Recognizer()
+        r.noise_profiles = NoiseProfileStore(self.directory)
+        with DeviceFile(noise_wav(1, 2000), "cell mic") as source:
+            r.adjust_for_ambient_noise(source)
+        calibrated = r.energy_threshold
+
+        r = sr.Recognizer()
+        r.noise_profiles = NoiseProfileStore(self.directory)
+        with DeviceFile(noise_wav(0.1, 2000), "cell mic") as source:
+            self.assertTrue(r.load_noise_profile(source))
+        self.assertEqual(r.energy_threshold, calibrated)
+        with DeviceFile(noise_wav(0.1, 2000), "operator mic") as source:
+            self.assertFalse(r.load_noise_profile(source))
+        with sr.AudioFile(noise_wav(0.1, 2000)) as source:
+            self.assertFalse(r.load_noise_profile(source))
+
+    def test_listening_keeps_profile_current(self):
+        r = sr.Recognizer()
+        r.noise_profiles = NoiseProfileStore(self.directory, save_interval=0)
+        r.energy_threshold = 10000
+        with DeviceFile(noise_wav(3, 3000), "cell mic") as source:
+            self.assertRaises(sr.WaitTimeoutError, r.listen, source, timeout=2)
+            profile = r.noise_profile(source)
+        self.assertAlmostEqual(profile.calibration_time, 2, delta=0.3)  # whole 4096 frame chunks
+        self.assertLess(r.energy_threshold, 10000)
+
+        r = sr.Recognizer()
+        r.noise_profiles = NoiseProfileStore(self.directory)
+        with DeviceFile(noise_wav(0.1, 3000), "cell mic") as source:
+            self.assertTrue(r.load_noise_profile(source))
+        self.assertAlmostEqual(r.energy_threshold, profile.energy_threshold, delta=1)
+
+    def test_profiles_need_a_store_and_a_device(self):
+        r = sr.Recognizer()
+        r.energy_threshold = 10000
+        with DeviceFile(noise_wav(2, 3000), "cell mic") as source:
+            self.assertRaises(sr.WaitTimeoutError, r.listen, source, timeout=1)
+            self.assertEqual(r.noise_profile(source).calibration_time, 0)  # nothing to save it to, so it isn't measured
+
+        r.noise_profiles = NoiseProfileStore(self.directory, save_interval=0)
+        first, second = sr.AudioFile(noise_wav(2, 3000)), sr.AudioFile(noise_wav(2, 100))
+        with first as source: r.adjust_for_ambient_noise(source, duration=1)
+        with second as source:
+            self.assertEqual(r.noise_profile(source).calibration_time, 0)  # not mixed up with ``first``
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import speech_recognition as sr
+from speech_recognition.fake_server import FakeSpeechServer
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_unlimited_engines_are_not_delayed(self):
+        limiter = sr.RateLimiter({"google": 1})
+        for _ in range(100):
+            self.assertTrue(limiter.acquire("wit", "key"))
+
+    def test_requests_over_the_limit_wait(self):
+        limiter = sr.RateLimiter({"google": (20, 2)})
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire("google", "key")
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)  # 2 immediately, then 4 more at 20 per second
+        stats = limiter.stats()["google"]
+        self.assertEqual((stats["acquired"], stats["queued"], stats["waiting"]), (6, 4, 0))
+        self.assertGreater(stats["max_wait"], 0)
+
+    def test_credentials_have_separate_buckets(self):
+        limiter = sr.RateLimiter({"google": (1, 1)})
+        self.assertTrue(limiter.try_acquire("google", "key1"))
+        self.assertFalse(limiter.try_acquire("google", "key1"))
+        self.assertTrue(limiter.try_acquire("google", "key2"))
+
+    def test_timeout(self):
+        limiter = sr.RateLimiter({"google": (1, 1)})
+        limiter.acquire("google")
+        self.assertFalse(limiter.acquire("google", timeout=0.05))
+        self.assertEqual(limiter.stats()["google"]["timed_out"], 1)
+
+    def test_higher_priority_goes_first(self):
+        limiter = sr.RateLimiter({"google": (10, 1)})
+        limiter.acquire("google")
+        order, threads = [], []
+        for level in (5, 5, 0):
+            threads.append(threading.Thread(target=lambda level=level: limiter.acquire("google", level=level) and order.append(level)))
+            threads[-1].start()
+            time.sleep(0.01)  # all three are queued before the next token arrives
+        for thread in threads: thread.join()
+        self.assertEqual(order, [0, 5, 5])
+
+
+class TestRecognizerRateLimiting(unittest.TestCase):
+    def test_limiter_avoids_quota_errors(self):
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            audio = sr.Recognizer().record(source)
+        with FakeSpeechServer(quota=20, quota_burst=2) as server:
+            r = sr.Recognizer()
+            server.configure(r)
+            r.rate_limiter = sr.RateLimiter({"wit": (15, 2)})
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: r.recognize_wit(audio, key="FAKEKEY"), range(12)))
+            self.assertEqual(results, ["hello world"] * 12)
+            self.assertNotIn("rejected", server.request_counts)
+            self.assertEqual(r.rate_limiter.stats()["wit"]["acquired"], 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
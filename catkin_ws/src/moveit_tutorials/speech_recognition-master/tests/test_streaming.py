@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import unittest
+
+import speech_recognition as sr
+from speech_recognition.streaming import iter_pcm_data, iter_wav_data
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            self.audio = sr.Recognizer().record(source)
+
+    def test_wav_data_matches_get_wav_data(self):
+        self.assertEqual(b"".join(iter_wav_data(self.audio, chunk_size=1001)), self.audio.get_wav_data())
+
+    def test_chunked_conversion_matches_get_raw_data(self):
+        converted = b"".join(iter_pcm_data(self.audio, chunk_size=4096, convert_rate=16000, convert_width=2))
+        self.assertEqual(converted, self.audio.get_raw_data(convert_rate=16000, convert_width=2))
+
+    def test_chunk_size_is_fixed(self):
+        chunks = list(iter_pcm_data(self.audio, chunk_size=4096))
+        self.assertTrue(all(len(chunk) == 4096 for chunk in chunks[:-1]))
+
+    def test_live_stream_from_listen(self):
+        r = sr.Recognizer()
+        r.dynamic_energy_threshold = False
+        stream = sr.LiveAudioStream()
+        received = []
+        reader = threading.Thread(target=lambda: received.extend(iter_pcm_data(stream)))
+        reader.start()
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            audio = r.listen(source, audio_stream=stream)
+        reader.join(5)
+        self.assertTrue(stream.closed)
+        self.assertTrue(b"".join(received).startswith(audio.frame_data))
+
+    def test_live_stream_passes_on_errors(self):
+        stream = sr.LiveAudioStream(16000, 2)
+        stream.write(b"\x00\x00" * 10)
+        stream.close(sr.WaitTimeoutError("listening timed out"))
+        self.assertRaises(sr.WaitTimeoutError, list, iter_pcm_data(stream))
+
+
+if __name__ == "__main__":
+    unittest.main()
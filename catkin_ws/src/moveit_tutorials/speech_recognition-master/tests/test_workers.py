@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+import unittest
+from multiprocessing import shared_memory
+
+import speech_recognition as sr
+from speech_recognition.recognizers.keywords import KeywordTemplates
+from speech_recognition.workers import EngineProcessPool
+
+from tests.test_keywords import WORDS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestEngineProcessPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with sr.AudioFile(os.path.join(os.path.dirname(os.path.realpath(__file__)), "english.wav")) as source:
+            cls.audio = sr.Recognizer().record(source)
+        cls.directory = tempfile.mkdtemp()
+        templates = KeywordTemplates(cls.directory)
+        for word, (start, end) in WORDS.items():
+            templates.enroll(word, cls.audio.get_segment(start, end))
+        cls.pool = EngineProcessPool(max_workers=2, preload=[("keywords", {"templates": cls.directory})])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        shutil.rmtree(cls.directory)
+
+    def test_results_match_local_recognizer(self):
+        segments = [self.audio.get_segment(start - 40, end + 40) for start, end in WORDS.values()]
+        futures = [self.pool.recognize_keywords(segment, self.directory) for segment in segments]
+        self.assertEqual([future.result(30) for future in futures], list(WORDS))
+        self.assertEqual(self.pool.submit("keywords", segments[0], self.directory, show_all=True).result(30), sr.Recognizer().recognize_keywords(segments[0], self.directory, show_all=True))
+
+    def test_exceptions_are_raised_by_future(self):
+        future = self.pool.recognize_keywords(sr.AudioData(b"\x00\x00" * 16000, 16000, 2), self.directory)
+        self.assertRaises(sr.UnknownValueError, future.result, 30)
+
+    def test_shared_memory_is_released(self):
+        names = []
+        original = shared_memory.SharedMemory
+
+        def recording(*args, **kwargs):
+            block = original(*args, **kwargs)
+            names.append(block.name)
+            return block
+        shared_memory.SharedMemory = recording
+        try:
+            future = self.pool.recognize_keywords(self.audio.get_segment(1000, 1600), self.directory)
+        finally:
+            shared_memory.SharedMemory = original
+        future.result(30)
+        self.assertEqual(len(names), 1)
+        self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=names[0])
+
+
+if __name__ == "__main__":
+    unittest.main()